@@ -0,0 +1 @@
+from .cache_ import * 
\ No newline at end of file
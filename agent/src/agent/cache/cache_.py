@@ -0,0 +1,140 @@
+import re
+import json
+import time
+import hashlib
+
+from collections import Counter , OrderedDict
+
+NAME_PLACEHOLDER : str = '<<user_name>>'
+
+def canonical_key(fields : dict) -> str :
+    '''
+    Stable hash of the fields a persona reply depends on (sorted keys , normalised strings).
+    '''
+
+    def canonical(value) :
+
+        if isinstance(value , str) : return ' '.join(value.lower().split())
+        if isinstance(value , dict) : return {key : canonical(item) for key , item in sorted(value.items())}
+        if isinstance(value , (list , tuple)) : return [canonical(item) for item in value]
+
+        return value
+
+    return hashlib.sha256(json.dumps(canonical(fields) , sort_keys = True , ensure_ascii = False).encode('utf-8')).hexdigest()
+
+def mentions(response : str , value) -> bool :
+
+    value = str(value).strip().lower()
+
+    if not value : return False
+
+    # "Jaipur, Rajasthan" is mentioned as soon as "jaipur" is
+    head : str = value.split(',')[0].strip()
+
+    return re.search(rf'(?<!\w){re.escape(head)}(?!\w)' , response.lower()) is not None
+
+class PersonaResponseCache :
+    '''
+    Opt-in , in-process cache of persona replies across calls.
+
+    Replies are keyed on the canonicalised inputs the persona prompt is built
+    from (rephrased query , retrieved chunk ids , language , program level ,
+    course , flags and instruction) , not on who is asking. To keep that safe :
+
+    - the caller bypasses the cache for turns that extracted new slots , the
+      reply acknowledges them
+    - a reply that mentions a personal slot value (city , percentage ,
+      preference) is never stored
+    - the user's name is stored as a placeholder and filled back in on a hit
+
+    Entries expire after `ttl` seconds , the least recently used entry is
+    evicted above `max_entries`.
+
+    Args:
+        - max_entries (int): Entry limit.
+        - ttl (float): Seconds an entry is served for.
+    '''
+
+    def __init__(self , max_entries : int = 512 , ttl : float = 900) -> None :
+
+        self.max_entries : int = max_entries
+        self.ttl : float = ttl
+
+        self.entries : OrderedDict[str , tuple[float , str]] = OrderedDict()
+
+        self.hits : int = 0
+        self.misses : int = 0
+        self.stored : int = 0
+        self.expired : int = 0
+        self.evicted : int = 0
+        self.bypassed : Counter = Counter()
+
+    def bypass(self , reason : str) -> None :
+
+        self.bypassed[reason] += 1
+
+    def get(self , key : str , user_name : str) -> str | None :
+
+        entry : tuple[float , str] | None = self.entries.get(key)
+
+        if entry is not None and entry[0] < time.monotonic() :
+
+            del self.entries[key]
+            self.expired += 1
+            entry = None
+
+        if entry is None :
+
+            self.misses += 1
+
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+
+        return entry[1].replace(NAME_PLACEHOLDER , user_name)
+
+    def put(self , key : str , response : str , user_name : str | None , personal_values : list) -> bool :
+        '''
+        Store `response` unless it mentions one of `personal_values`. Returns whether it was stored.
+        '''
+
+        if not response.strip() : self.bypass('empty_response') ; return False
+
+        if any(mentions(response , value) for value in personal_values if value not in (None , '' , 'null')) :
+
+            self.bypass('personal_response')
+
+            return False
+
+        if user_name :
+
+            # full name first , then the first name on its own
+            for part in dict.fromkeys((user_name , user_name.split()[0])) :
+                response = re.sub(rf'(?<!\w){re.escape(part)}(?!\w)' , NAME_PLACEHOLDER , response , flags = re.IGNORECASE)
+
+        self.entries[key] = (time.monotonic() + self.ttl , response)
+        self.entries.move_to_end(key)
+        self.stored += 1
+
+        while len(self.entries) > self.max_entries :
+
+            self.entries.popitem(last = False)
+            self.evicted += 1
+
+        return True
+
+    def snapshot(self) -> dict :
+
+        lookups : int = self.hits + self.misses
+
+        return {
+            'entries' : len(self.entries) ,
+            'hits' : self.hits ,
+            'misses' : self.misses ,
+            'hit_rate' : round(self.hits / lookups , 4) if lookups else None ,
+            'stored' : self.stored ,
+            'expired' : self.expired ,
+            'evicted' : self.evicted ,
+            'bypassed' : dict(self.bypassed)
+        }
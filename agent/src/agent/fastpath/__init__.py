@@ -0,0 +1 @@
+from .fastpath_ import * 
\ No newline at end of file
@@ -0,0 +1,405 @@
+import re
+import math
+import unicodedata
+
+from collections import Counter , deque
+
+SLOT_NAMES : tuple[str , ...] = ('Name' , 'Course' , 'Percentage' , 'City' , 'Preference')
+
+# Intent exemplars for the character n-gram model , only intents whose manager
+# output is fully determined by the intent itself
+INTENT_EXEMPLARS : dict[str , list[str]] = {
+    'closing' : [
+        'bye' , 'bye bye' , 'ok bye' , 'goodbye' , 'thank you' , 'thanks' , 'thank you so much' ,
+        'ok thank you' , 'thanks bye' , 'thank you bye' , 'that is all' , 'thats all' ,
+        'no more questions' , 'nothing else' , 'no thank you' , 'that is all thank you'
+    ] ,
+    'counselor' : [
+        'i want to talk to a counselor' , 'i want to talk to a counsellor' , 'connect me to a counselor' ,
+        'connect me to a counsellor' , 'can i speak to a counselor' , 'please connect me with a counsellor' ,
+        'i want to speak to a counsellor' , 'i need a counselor call'
+    ] ,
+    'acknowledge' : [
+        'ok' , 'okay' , 'ok sir' , 'ok maam' , 'alright' , 'fine' , 'sure' , 'hmm' , 'yes' , 'yeah' ,
+        'got it' , 'i see' , 'okay fine' , 'yes please' , 'ok go ahead'
+    ]
+}
+
+CITIES : dict[str , str] = {
+    'jaipur' : 'Jaipur, Rajasthan' , 'jodhpur' : 'Jodhpur, Rajasthan' , 'udaipur' : 'Udaipur, Rajasthan' ,
+    'kota' : 'Kota, Rajasthan' , 'ajmer' : 'Ajmer, Rajasthan' , 'bikaner' : 'Bikaner, Rajasthan' ,
+    'alwar' : 'Alwar, Rajasthan' , 'bhilwara' : 'Bhilwara, Rajasthan' , 'sikar' : 'Sikar, Rajasthan' ,
+    'bharatpur' : 'Bharatpur, Rajasthan' , 'jhunjhunu' : 'Jhunjhunu, Rajasthan' , 'tonk' : 'Tonk, Rajasthan' ,
+    'pali' : 'Pali, Rajasthan' , 'barmer' : 'Barmer, Rajasthan' , 'chittorgarh' : 'Chittorgarh, Rajasthan' ,
+    'sri ganganagar' : 'Sri Ganganagar, Rajasthan' , 'delhi' : 'Delhi' , 'new delhi' : 'New Delhi' ,
+    'gurgaon' : 'Gurgaon, Haryana' , 'gurugram' : 'Gurugram, Haryana' , 'noida' : 'Noida, Uttar Pradesh' ,
+    'agra' : 'Agra, Uttar Pradesh' , 'lucknow' : 'Lucknow, Uttar Pradesh' , 'kanpur' : 'Kanpur, Uttar Pradesh' ,
+    'indore' : 'Indore, Madhya Pradesh' , 'bhopal' : 'Bhopal, Madhya Pradesh' , 'neemuch' : 'Neemuch, Madhya Pradesh' ,
+    'gwalior' : 'Gwalior, Madhya Pradesh' , 'ujjain' : 'Ujjain, Madhya Pradesh' , 'ahmedabad' : 'Ahmedabad, Gujarat' ,
+    'surat' : 'Surat, Gujarat' , 'mumbai' : 'Mumbai, Maharashtra' , 'pune' : 'Pune, Maharashtra' ,
+    'patna' : 'Patna, Bihar' , 'chandigarh' : 'Chandigarh' , 'dehradun' : 'Dehradun, Uttarakhand' ,
+    'kolkata' : 'Kolkata, West Bengal' , 'hyderabad' : 'Hyderabad, Telangana' , 'bangalore' : 'Bangalore, Karnataka' ,
+    'chennai' : 'Chennai, Tamil Nadu'
+}
+
+STATES : dict[str , str] = {
+    'rajasthan' : 'Rajasthan' , 'mp' : 'Madhya Pradesh' , 'madhya pradesh' : 'Madhya Pradesh' ,
+    'up' : 'Uttar Pradesh' , 'uttar pradesh' : 'Uttar Pradesh' , 'haryana' : 'Haryana' , 'gujarat' : 'Gujarat' ,
+    'maharashtra' : 'Maharashtra' , 'bihar' : 'Bihar' , 'punjab' : 'Punjab' , 'uttarakhand' : 'Uttarakhand' ,
+    'west bengal' : 'West Bengal' , 'jharkhand' : 'Jharkhand' , 'himachal' : 'Himachal Pradesh'
+}
+
+# spoken course name -> (canonical name , program level)
+COURSES : dict[str , tuple[str , str]] = {
+    'btech' : ('B.Tech' , 'UG') , 'b tech' : ('B.Tech' , 'UG') , 'bca' : ('BCA' , 'UG') , 'bba' : ('BBA' , 'UG') ,
+    'bcom' : ('B.Com' , 'UG') , 'b com' : ('B.Com' , 'UG') , 'bsc' : ('B.Sc' , 'UG') , 'b sc' : ('B.Sc' , 'UG') ,
+    'bdes' : ('B.Des' , 'UG') , 'b des' : ('B.Des' , 'UG') , 'llb' : ('LLB' , 'UG') ,
+    'mtech' : ('M.Tech' , 'PG') , 'm tech' : ('M.Tech' , 'PG') , 'mba' : ('MBA' , 'PG') , 'mca' : ('MCA' , 'PG') ,
+    'msc' : ('M.Sc' , 'PG') , 'm sc' : ('M.Sc' , 'PG') , 'mcom' : ('M.Com' , 'PG') , 'm com' : ('M.Com' , 'PG') ,
+    'llm' : ('LLM' , 'PG') , 'phd' : ('PhD' , 'PhD')
+}
+
+BRANCHES : dict[str , str] = {
+    'cse' : 'CSE' , 'computer science' : 'CSE' , 'it' : 'IT' , 'ai' : 'AI' , 'artificial intelligence' : 'AI' ,
+    'data science' : 'Data Science' , 'ece' : 'ECE' , 'electronics' : 'ECE' , 'mechanical' : 'Mechanical' ,
+    'civil' : 'Civil' , 'electrical' : 'Electrical' , 'finance' : 'Finance' , 'marketing' : 'Marketing' , 'hr' : 'HR'
+}
+
+QUESTION_WORDS : set[str] = {
+    'what' , 'how' , 'when' , 'where' , 'which' , 'who' , 'why' , 'is' , 'are' , 'can' , 'could' , 'do' , 'does' ,
+    'will' , 'should' , 'tell' , 'kya' , 'kab' , 'kitna' , 'kitni' , 'kaise' , 'kahan'
+}
+
+# Latin script Hindi , the manager decides the language of these turns
+HINGLISH_MARKERS : set[str] = {
+    'haan' , 'han' , 'nahi' , 'nahin' , 'mera' , 'meri' , 'mujhe' , 'hai' , 'hoon' , 'hu' , 'ji' , 'aap' , 'kya' ,
+    'karna' , 'chahiye' , 'theek' , 'accha' , 'acha' , 'batao' , 'bataiye'
+}
+
+NEGATIONS : set[str] = {'not' , 'no' , 'dont' , "don't" , 'never' , 'haven' , 'havent' , 'cannot' , 'cant'}
+
+NAME_STOPWORDS : set[str] = {
+    'interested' , 'looking' , 'from' , 'fine' , 'good' , 'here' , 'student' , 'calling' , 'okay' , 'ok' , 'sure' ,
+    'yes' , 'no' , 'not' , 'the' , 'a' , 'an' , 'in' , 'for' , 'done' , 'ready' , 'sorry' , 'busy'
+}
+
+# admission vocabulary and greetings , never taken as a bare name
+DOMAIN_WORDS : set[str] = {
+    'fee' , 'fees' , 'hostel' , 'scholarship' , 'admission' , 'admissions' , 'placement' , 'placements' , 'campus' ,
+    'bus' , 'transport' , 'course' , 'courses' , 'program' , 'programme' , 'gap' , 'year' , 'loan' , 'form' , 'exam' ,
+    'result' , 'marks' , 'percentage' , 'college' , 'university' , 'jecrc' , 'eligibility' , 'deadline' , 'date' ,
+    'seat' , 'seats' , 'hello' , 'hi' , 'hey' , 'sir' , 'madam' , 'maam' , 'please' , 'thanks' , 'counselor' ,
+    'counsellor' , 'engineering' , 'management' , 'law' , 'lateral' , 'entry' , 'diploma' , 'facilities' , 'library'
+}
+
+CITY_PREFIX : re.Pattern = re.compile(r'^(?:i am from|i m from|im from|i live in|i stay in|from|my city is|city is|it is|its)\s+')
+NAME_PREFIX : re.Pattern = re.compile(r'^(?:my name is|name is|i am|i m|im|this is|myself|it is|its)\s+')
+COURSE_PREFIX : re.Pattern = re.compile(r'^(?:i want|i am interested in|i m interested in|im interested in|interested in|i am looking for|looking for|i want to do|i want to pursue|i want admission in)\s+(?:in\s+|for\s+|a\s+)?')
+PERCENTAGE : re.Pattern = re.compile(
+    r'^(?:i (?:got|scored|have|secured)\s+|my percentage is\s+|percentage is\s+|it is\s+|its\s+)?'
+    r'(\d{2,3}(?:\.\d{1,2})?)\s*(?:%|percent|percentage)?\s*(?:marks)?'
+    r'(?:\s+in\s+(?:12th|class 12|twelfth|graduation|ug))?$'
+)
+
+def normalize_message(text : str) -> str :
+    '''
+    Lowercased , punctuation free and whitespace normalised text (% is kept).
+    '''
+
+    text = unicodedata.normalize('NFKC' , text).lower().replace("'" , '')
+
+    return ' '.join(re.sub(r'[^\w%.\s]' , ' ' , text).replace('. ' , ' ').strip(' .').split())
+
+def char_ngrams(text : str , n : int = 3) -> Counter :
+
+    padded : str = f' {text} '
+
+    return Counter(padded[i : i + n] for i in range(len(padded) - n + 1))
+
+def cosine(a : Counter , b : Counter) -> float :
+
+    dot : float = sum(count * b[gram] for gram , count in a.items() if gram in b)
+    norm : float = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+
+    return dot / norm if norm else 0.0
+
+def has_devanagari(text : str) -> bool : return any('ऀ' <= char <= 'ॿ' for char in text)
+
+def manager_decision(intent : str , **fields) -> dict :
+    '''
+    Manager shaped decision (see MANAGER_SYSTEM_PROMPT) with every field at its default.
+    '''
+
+    extracted_slots : dict = {slot : None for slot in SLOT_NAMES}
+    extracted_slots.update(fields.pop('extracted_slots' , {}))
+
+    return {
+        'language' : 'English' ,
+        'extracted_slots' : extracted_slots ,
+        'program_level' : None ,
+        'is_scholarship_eligible' : False ,
+        'conversation_ended' : False ,
+        'user_intent' : 'inquiry' ,
+        'requesting_counselor_call' : False ,
+        'non_admission_query' : False ,
+        'hangup_reason' : None ,
+        'hangup_type' : None ,
+        'soft_redirect' : None ,
+        'user_cannot_provide' : {} ,
+        'already_provided' : False ,
+        'course_change_after_registration' : False ,
+        **fields ,
+        'fast_path' : intent
+    }
+
+def decisions_agree(fast : dict , llm : dict) -> bool :
+    '''
+    True when the manager LLM reached the same decision as the fast path on the
+    fields the turn acts on : extracted slots , hangups , counselor request ,
+    non admission queries and scholarship eligibility.
+    '''
+
+    def slot_values(decision : dict) -> dict :
+
+        return {
+            slot : normalize_message(str(value))
+            for slot , value in (decision.get('extracted_slots') or {}).items()
+            if value not in (None , '' , 'null')
+        }
+
+    # the llm may repeat slots it already knew , only the ones the fast path extracted are compared
+    fast_slots : dict = slot_values(fast)
+    llm_slots : dict = slot_values(llm)
+
+    if any(llm_slots.get(slot) != value for slot , value in fast_slots.items()) : return False
+
+    return all(
+        bool(fast.get(field)) == bool(llm.get(field))
+        for field in ('hangup_type' , 'requesting_counselor_call' , 'non_admission_query' , 'is_scholarship_eligible')
+    )
+
+class FastPathStats :
+    '''
+    Coverage of the fast path (turns it decided / all turns) , fallbacks by reason ,
+    and the agreement rate with the manager LLM on the shadow-checked sample.
+    '''
+
+    def __init__(self , max_disagreements : int = 20) -> None :
+
+        self.turns : int = 0
+        self.decided : Counter = Counter()
+        self.fallbacks : Counter = Counter()
+
+        self.compared : int = 0
+        self.agreed : int = 0
+        self.disagreements : deque = deque(maxlen = max_disagreements)
+
+    def record_comparison(self , message : str , fast : dict , llm : dict) -> bool :
+
+        agreed : bool = decisions_agree(fast , llm)
+
+        self.compared += 1
+        self.agreed += agreed
+
+        if not agreed : self.disagreements.append({'message' : message , 'fast_path' : fast , 'llm' : llm})
+
+        return agreed
+
+    def snapshot(self) -> dict :
+
+        decided : int = sum(self.decided.values())
+
+        return {
+            'turns' : self.turns ,
+            'decided' : decided ,
+            'coverage' : round(decided / self.turns , 4) if self.turns else None ,
+            'by_intent' : dict(self.decided) ,
+            'fallbacks' : dict(self.fallbacks) ,
+            'compared' : self.compared ,
+            'agreement_rate' : round(self.agreed / self.compared , 4) if self.compared else None ,
+            'recent_disagreements' : list(self.disagreements)
+        }
+
+class FastPathClassifier :
+    '''
+    Local , CPU only classifier for the trivial turns the manager LLM handles :
+    closings , acknowledgements , counselor requests and bare slot answers
+    (name , city , course) to the question the bot just asked.
+
+    Slots are matched by rules against small gazetteers , conversational intents
+    by character trigram cosine similarity to a handful of exemplars. Anything
+    it is not confident about (questions , Hindi / Hinglish , negations , mixed
+    answers) returns None and goes to the manager LLM. So do percentages , they
+    decide scholarship eligibility and the low_percentage hangup , which only
+    the manager knows how to judge.
+
+    Args:
+        - threshold (float): Minimum n-gram similarity for an intent.
+        - margin (float): Minimum lead of the best intent over the runner up.
+        - max_words (int): Longer messages always go to the manager.
+    '''
+
+    def __init__(self , threshold : float = 0.8 , margin : float = 0.1 , max_words : int = 8) -> None :
+
+        self.threshold : float = threshold
+        self.margin : float = margin
+        self.max_words : int = max_words
+
+        self.exemplars : list[tuple[str , Counter]] = [
+            (intent , char_ngrams(normalize_message(text)))
+            for intent , texts in INTENT_EXEMPLARS.items()
+            for text in texts
+        ]
+
+        self.stats : FastPathStats = FastPathStats()
+
+    def intent(self , message : str) -> str | None :
+        '''
+        Nearest exemplar intent , None unless it clears the threshold and the margin to any other intent.
+        '''
+
+        grams : Counter = char_ngrams(message)
+
+        best : dict[str , float] = {}
+
+        for intent , exemplar in self.exemplars : best[intent] = max(best.get(intent , 0.0) , cosine(grams , exemplar))
+
+        ranked : list[tuple[str , float]] = sorted(best.items() , key = lambda item : item[1] , reverse = True)
+
+        (top , score) , (_ , runner_up) = ranked[0] , ranked[1]
+
+        return top if score >= self.threshold and score - runner_up >= self.margin else None
+
+    @staticmethod
+    def city(message : str) -> str | None :
+
+        text : str = CITY_PREFIX.sub('' , message)
+
+        if text in CITIES : return CITIES[text]
+
+        # "neemuch mp" , "kota rajasthan"
+        for state , state_name in STATES.items() :
+
+            if text.endswith(f' {state}') :
+
+                city : str = text[: -len(state) - 1].strip()
+
+                if city in CITIES : return CITIES[city]
+                if city and len(city.split()) <= 2 and city.replace(' ' , '').isalpha() : return f'{city.title()}, {state_name}'
+
+        return None
+
+    @staticmethod
+    def course(message : str) -> tuple[str , str] | None :
+
+        text : str = COURSE_PREFIX.sub('' , message).replace('.' , '').replace('-' , ' ')
+
+        for spoken in sorted(COURSES , key = len , reverse = True) :
+
+            if text == spoken or text.startswith(f'{spoken} ') :
+
+                name , level = COURSES[spoken]
+                branch : str = text[len(spoken) :].strip().removeprefix('in ').strip()
+
+                if not branch : return name , level
+                if branch in BRANCHES : return f'{name} {BRANCHES[branch]}' , level
+
+                return None
+
+        return None
+
+    @staticmethod
+    def percentage(message : str , asked : bool) -> str | None :
+
+        match : re.Match | None = PERCENTAGE.match(message)
+
+        if match is None : return None
+
+        # a bare number is only a percentage when the bot just asked for one
+        if not asked and not any(unit in message for unit in ('%' , 'percent' , 'scored' , 'got' , 'secured')) : return None
+
+        return match.group(1)
+
+    @staticmethod
+    def name(message : str , asked : bool) -> str | None :
+
+        text : str = NAME_PREFIX.sub('' , message)
+
+        # a bare name is only accepted as the answer to the name question
+        if text == message and not asked : return None
+
+        words : list[str] = text.split()
+
+        if not 1 <= len(words) <= 3 or not all(word.isalpha() for word in words) : return None
+        if any(word in NAME_STOPWORDS or word in QUESTION_WORDS or word in DOMAIN_WORDS or word in BRANCHES for word in words) : return None
+        if text in CITIES or any(word in COURSES for word in words) : return None
+
+        return ' '.join(word.capitalize() for word in words)
+
+    def fallback(self , reason : str) -> None :
+
+        self.stats.fallbacks[reason] += 1
+
+        return None
+
+    def classify(self , message : str , last_bot_message : str , slots : dict , user_cannot_provide : dict) -> dict | None :
+        '''
+        Manager shaped decision for `message` , or None when the manager LLM should decide.
+
+        Args:
+            - message (str): User message.
+            - last_bot_message (str): What the bot said last , tells which slot a bare answer fills.
+            - slots (dict): Slots collected so far.
+            - user_cannot_provide (dict): Slots the user said they cannot provide.
+        '''
+
+        self.stats.turns += 1
+
+        text : str = normalize_message(message)
+        words : list[str] = text.split()
+
+        if not words : return self.fallback('empty')
+        if len(words) > self.max_words : return self.fallback('long')
+
+        if has_devanagari(message) or has_devanagari(last_bot_message) : return self.fallback('hindi')
+        if HINGLISH_MARKERS.intersection(words) or HINGLISH_MARKERS.intersection(normalize_message(last_bot_message).split()) : return self.fallback('hinglish')
+
+        intent : str | None = self.intent(text)
+
+        if intent == 'closing' : decision : dict = manager_decision(intent , conversation_ended = True , user_intent = 'closing')
+        elif intent == 'counselor' : decision = manager_decision(intent , requesting_counselor_call = True , hangup_reason = 'counselor_requested')
+        elif intent == 'acknowledge' : decision = manager_decision(intent)
+
+        else :
+
+            if '?' in message or words[0] in QUESTION_WORDS : return self.fallback('question')
+            if NEGATIONS.intersection(words) : return self.fallback('negation')
+
+            asked : str = normalize_message(last_bot_message)
+
+            # the manager sets is_scholarship_eligible and the low_percentage hangup from the marks
+            if self.percentage(text , asked = 'percent' in asked) is not None : return self.fallback('percentage')
+
+            candidates : list[tuple[str , dict]] = []
+
+            if (city := self.city(text)) is not None :
+                candidates.append(('city' , {'extracted_slots' : {'City' : city}}))
+
+            if (course := self.course(text)) is not None :
+                candidates.append(('course' , {'extracted_slots' : {'Course' : course[0]} , 'program_level' : course[1]}))
+
+            if not candidates and not slots.get('Name') and (name := self.name(text , asked = 'name' in asked.split())) is not None :
+                candidates.append(('name' , {'extracted_slots' : {'Name' : name}}))
+
+            if len(candidates) != 1 : return self.fallback('ambiguous' if candidates else 'no_match')
+
+            intent , fields = candidates[0]
+            slot : str = next(iter(fields['extracted_slots']))
+
+            if user_cannot_provide.get(slot , False) : return self.fallback('cannot_provide')
+
+            decision = manager_decision(intent , **fields)
+
+        self.stats.decided[intent] += 1
+
+        return decision
@@ -1 +1,2 @@
-from .helpers_ import * 
\ No newline at end of file
+from .helpers_ import * 
+from .http_ import * 
\ No newline at end of file
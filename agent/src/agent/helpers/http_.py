@@ -0,0 +1,118 @@
+import time
+import asyncio
+
+from contextlib import asynccontextmanager
+from httpx import AsyncClient , Limits , Timeout , PoolTimeout
+
+def load_http_client(config : dict) -> AsyncClient : 
+
+    http_client : AsyncClient = AsyncClient(
+        http2 = config['http2'] , 
+        limits = Limits(
+            max_connections = config['max-connections'] , 
+            max_keepalive_connections = config['max-keepalive-connections'] , 
+            keepalive_expiry = config['keepalive-expiry']
+        ) , 
+        timeout = Timeout(**config['timeout'])
+    )
+
+    return http_client
+
+class HTTPPoolMetrics : 
+    '''
+    Saturation metrics for a shared , pooled AsyncClient.
+
+    Requests are counted while in flight , alongside the pool's open / idle
+    connections and the requests queued for a connection (read from the httpcore
+    pool when available). Pool timeouts mean the pool was saturated for longer
+    than the pool deadline , deadline misses mean the whole request ran over its budget.
+
+    Args:
+        - max_connections (int): Pool size the client was built with.
+    '''
+
+    def __init__(self , max_connections : int) -> None : 
+
+        self.max_connections : int = max_connections
+
+        self.in_flight : int = 0
+        self.max_in_flight : int = 0
+
+        self.requests : int = 0
+        self.errors : int = 0
+        self.pool_timeouts : int = 0
+        self.deadline_misses : int = 0
+        self.total_ms : float = 0.0
+        self.max_ms : float = 0.0
+
+    @asynccontextmanager
+    async def track(self) : 
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight , self.in_flight)
+
+        start_time : float = time.perf_counter()
+
+        try : yield
+
+        except PoolTimeout : 
+
+            self.pool_timeouts += 1
+            self.errors += 1
+
+            raise
+
+        except asyncio.TimeoutError : 
+
+            self.deadline_misses += 1
+            self.errors += 1
+
+            raise
+
+        except Exception : 
+
+            self.errors += 1
+
+            raise
+
+        finally : 
+
+            elapsed_ms : float = (time.perf_counter() - start_time) * 1000
+
+            self.in_flight -= 1
+            self.requests += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms , elapsed_ms)
+
+    @staticmethod
+    def pool_state(http_client : AsyncClient) -> dict : 
+
+        # httpcore keeps these on the transport's pool , not part of the httpx api
+        pool = getattr(getattr(http_client , '_transport' , None) , '_pool' , None)
+
+        if pool is None : return {}
+
+        connections : list = list(getattr(pool , 'connections' , []))
+
+        return {
+            'connections' : len(connections) , 
+            'idle_connections' : sum(1 for connection in connections if connection.is_idle()) , 
+            # requests waiting for a connection , non zero means the pool is saturated
+            'queued_requests' : sum(1 for request in getattr(pool , '_requests' , []) if request.is_queued())
+        }
+
+    def snapshot(self , http_client : AsyncClient | None = None) -> dict : 
+
+        return {
+            'max_connections' : self.max_connections , 
+            'in_flight' : self.in_flight , 
+            'max_in_flight' : self.max_in_flight , 
+            'saturation' : round(self.in_flight / self.max_connections , 4) , 
+            'requests' : self.requests , 
+            'errors' : self.errors , 
+            'pool_timeouts' : self.pool_timeouts , 
+            'deadline_misses' : self.deadline_misses , 
+            'mean_ms' : round(self.total_ms / self.requests , 3) if self.requests else None , 
+            'max_ms' : round(self.max_ms , 3) , 
+            **(self.pool_state(http_client) if http_client is not None else {})
+        }
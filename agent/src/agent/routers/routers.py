@@ -285,32 +285,32 @@ async def rephrase_query(
 
         return user_input
 
-async def search_vector_db(query : str , config : dict) -> str : 
+async def search_vector_db(query : str , config : dict , http_client : AsyncClient) -> str : 
 
     if not query : 
         return ''
 
-    async with AsyncClient() as client:
-        try:
-            resp = await client.get(
-                url = config['url'] , 
-                params = {'query' : query} , 
-                timeout = 2
-            )
+    # the app's shared , pooled client , a client per call paid a TCP setup per lookup
+    try:
+        resp = await http_client.get(
+            url = config['url'] , 
+            params = {'query' : query} , 
+            timeout = config.get('timeout' , 2)
+        )
 
-            if resp.status_code == 200 : 
+        if resp.status_code == 200 : 
 
-                result = resp.json()
+            result = resp.json()
 
-                return result
+            return result
 
-            return ''
+        return ''
 
-        except Exception as e : 
+    except Exception as e : 
 
-            print('Vector DB Error:', e)
+        print('Vector DB Error:', e)
 
-            return ''
+        return ''
 
 async def check_for_pre_response(
     hangup_type : bool | str , 
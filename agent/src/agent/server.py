@@ -1,14 +1,22 @@
 import asyncio
+import hashlib
 import json
-import httpx
+import random
+import time
 import uvicorn
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from redis.asyncio import Redis
 from groq import AsyncGroq
 
+from .cache import PersonaResponseCache, canonical_key
+from .fastpath import FastPathClassifier
+from .helpers import HTTPPoolMetrics, load_http_client
+
 # =========================
 # CONFIGURATION
 # =========================
@@ -25,7 +33,54 @@ PERSONA_MODEL = "moonshotai/kimi-k2-instruct-0905"
 CRITICAL_SLOTS = ["Name", "Course", "Percentage", "City"]
 OPTIONAL_SLOTS = ["Preference"]
 
-app = FastAPI(title="JECRC Riya AI Pipeline")
+# Seconds a speculative turn's staged state waits for /chat/commit
+SPECULATIVE_TURN_TTL = 120
+
+# Conversation state: expiry, history messages kept, compare-and-set attempts per turn
+STATE_TTL = 3600
+HISTORY_LIMIT = 10
+MAX_STATE_RETRIES = 5
+
+# Shared keep-alive client for RAG: pool limits, per-phase timeouts, and the
+# deadline on a whole vector search
+RAG_HTTP_CLIENT = {
+    "http2": True,
+    "max-connections": 100,
+    "max-keepalive-connections": 20,
+    "keepalive-expiry": 30,
+    "timeout": {
+        "connect": 0.5,
+        "read": 2,
+        "write": 1,
+        "pool": 0.5
+    }
+}
+VECTOR_DB_DEADLINE = 2.0
+# chunks per lookup, /search fuses BM25 with dense retrieval so the top 3 carry the exact fee/course rows
+VECTOR_DB_TOP_K = 3
+
+# Opt-in cross-call cache of persona replies (PERSONA_CACHE=1): entry limit and TTL in seconds
+PERSONA_CACHE_ENABLED = os.getenv("PERSONA_CACHE", "0") == "1"
+PERSONA_CACHE_SIZE = 512
+PERSONA_CACHE_TTL = 900
+
+# Share of fast-path turns also sent to the manager LLM in the background to measure agreement
+FAST_PATH_SHADOW_RATE = 0.1
+
+@asynccontextmanager
+async def lifespan(app):
+    # built per worker, after the fork, so workers never share sockets
+    app.state.rag_client = load_http_client(RAG_HTTP_CLIENT)
+
+    yield
+
+    await app.state.rag_client.aclose()
+
+app = FastAPI(title="JECRC Riya AI Pipeline", lifespan=lifespan)
+rag_http_metrics = HTTPPoolMetrics(RAG_HTTP_CLIENT["max-connections"])
+fast_path = FastPathClassifier()
+persona_cache = PersonaResponseCache(max_entries=PERSONA_CACHE_SIZE, ttl=PERSONA_CACHE_TTL)
+shadow_tasks = set()
 groq_client = AsyncGroq(api_key=os.environ["GROQ_API_KEY"])
 redis_conn = Redis(
     host=os.environ['REDIS_HOST'],
@@ -551,6 +606,11 @@ HANGUP_RESPONSES = {
     }
 }
 
+# Said when the rephraser flags a bye / abusive hangup
+INITIAL_GREETING = "Good day! I am Riya, an admission counselor at J-E-C-R-C University. I would be happy to assist you with your admission queries. May I have your name, please?"
+
+CLOSING_RESPONSE = "Thank you for your time. Our counsellors will reach out to you soon! You can also reach our helpdesk between ten A-M and six P-M from Monday to Saturday. Thank you for calling J-E-C-R-C University"
+
 # =========================
 # MODELS
 # =========================
@@ -558,6 +618,12 @@ HANGUP_RESPONSES = {
 class ChatRequest(BaseModel):
     user_id: str
     message: str
+    # set for speculative turns: state is staged until /chat/commit
+    turn_id: str | None = None
+
+class CommitRequest(BaseModel):
+    user_id: str
+    turn_id: str
 
 class ChatResponse(BaseModel):
     response: str
@@ -622,13 +688,15 @@ def get_hangup_response(hangup_type, language):
 # LLM FUNCTIONS
 # =========================
 
-async def get_manager_decision(history, slots, user_msg):
-    """Enhanced manager with conversation history context"""
-    last_bot = "None"
+def last_bot_message(history):
     for h in reversed(history):
         if h["role"] == "assistant":
-            last_bot = h["content"]
-            break
+            return h["content"]
+    return "None"
+
+async def get_manager_decision(history, slots, user_msg):
+    """Enhanced manager with conversation history context"""
+    last_bot = last_bot_message(history)
 
     conv_history = "\n".join(
         f"{h['role']}: {h['content']}" for h in history[-6:]
@@ -655,6 +723,28 @@ async def get_manager_decision(history, slots, user_msg):
         print("Manager Error:", e)
         return {}
 
+async def shadow_manager_decision(history, slots, user_msg, decision):
+    """Ask the manager LLM about a fast-path turn and record whether it agreed"""
+    llm_decision = await get_manager_decision(history, slots, user_msg)
+
+    # an empty decision is a manager error, not a disagreement
+    if llm_decision:
+        fast_path.stats.record_comparison(user_msg, decision, llm_decision)
+
+async def get_turn_decision(history, slots, user_cannot_provide, user_msg):
+    """Fast-path decision when the local classifier is confident, otherwise the manager LLM"""
+    decision = fast_path.classify(user_msg, last_bot_message(history), slots, user_cannot_provide)
+
+    if decision is None:
+        return await get_manager_decision(history, slots, user_msg)
+
+    if random.random() < FAST_PATH_SHADOW_RATE:
+        task = asyncio.create_task(shadow_manager_decision(list(history), dict(slots), user_msg, decision))
+        shadow_tasks.add(task)
+        task.add_done_callback(shadow_tasks.discard)
+
+    return decision
+
 async def rephrase_query(history, user_msg, query_count):
     """Rephrase query with query count tracking and hangup detection"""
     history_text = "\n".join(
@@ -685,21 +775,20 @@ async def search_vector_db(query):
     if not query:
         return ""
 
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(
-                VECTOR_DB_URL,
-                params={"query": query},
-                timeout=2
+    try:
+        async with rag_http_metrics.track():
+            resp = await asyncio.wait_for(
+                app.state.rag_client.get(VECTOR_DB_URL, params={"query": query, "top_k": VECTOR_DB_TOP_K}),
+                VECTOR_DB_DEADLINE
             )
-            if resp.status_code == 200:
-                result = resp.json()
-                print(f"Vector DB Result: {result}")
-                return result
-            return ""
-        except Exception as e:
-            print("Vector DB Error:", e)
-            return ""
+        if resp.status_code == 200:
+            result = resp.json()
+            print(f"Vector DB Result: {result}")
+            return result
+        return ""
+    except Exception as e:
+        print("Vector DB Error:", repr(e))
+        return ""
 
 def check_counselor_mentioned(history):
     """Check if counselor was already mentioned"""
@@ -719,42 +808,269 @@ def check_facility_mentioned(history):
                 return True
     return False
 
+def hard_hangup_message(manager, language):
+    """Reply ending the call when the manager decided on a hard hangup, else None"""
+    hangup_type = manager.get("hangup_type")
+
+    if hangup_type:
+        bot_msg = get_hangup_response(hangup_type, language)
+
+        if bot_msg:
+            return bot_msg
+
+    # Check for counselor request hangup
+    if manager.get("requesting_counselor_call", False) and manager.get("hangup_reason") == "counselor_requested":
+        return "I have documented your information. Our admission counselor will reach out to you at the earliest. Thank you for your interest in J-E-C-R-C University!"
+
+    # Check for non-admission query hangup
+    if manager.get("non_admission_query", False) and manager.get("hangup_reason") == "non_admission_intent":
+        return "I apologize, but I can only assist with admission queries related to J-E-C-R-C University. For other inquiries, please contact the appropriate department. Thank you for your understanding."
+
+    return None
+
+# =========================
+# TURN STAGES
+# =========================
+
+async def timed(timings, stage, awaitable):
+    """Await one pipeline stage and record its duration in ms under timings[stage]"""
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[stage] = round((time.perf_counter() - start) * 1000, 1)
+
+async def retrieve_context(history, user_input, query_count, timings):
+    """
+    Rephraser + vector search branch of a turn, run alongside the manager.
+
+    Neither stage needs the manager's output, so on a normal turn both finish
+    while the manager is still deciding. The search is skipped when the
+    rephraser itself asks for a hangup.
+    """
+    vector_query = await timed(timings, "rephrase", rephrase_query(history, user_input, query_count))
+
+    if "<hangup>" in vector_query.lower():
+        return vector_query, ""
+
+    return vector_query, await timed(timings, "vector_search", search_vector_db(vector_query))
+
+def context_chunk_ids(context_data):
+    """IDs of the retrieved chunks, the hashed text for results without one"""
+    results = context_data.get("results", []) if isinstance(context_data, dict) else []
+    return [r.get("id") or hashlib.sha1(r.get("text", "").encode("utf-8")).hexdigest() for r in results]
+
+def persona_cache_key(manager, vector_query, context_data, course, prompt_fields):
+    """Persona cache key of a turn, or None when the turn has to reach the persona model"""
+    if not PERSONA_CACHE_ENABLED:
+        return None
+
+    # the reply acknowledges what the user just told us
+    if any(v not in (None, "", "null") for v in manager.get("extracted_slots", {}).values()):
+        persona_cache.bypass("new_slots")
+        return None
+
+    chunk_ids = context_chunk_ids(context_data)
+
+    if not chunk_ids:
+        persona_cache.bypass("no_context")
+        return None
+
+    return canonical_key({"query": vector_query, "chunks": chunk_ids, "course": course, **prompt_fields})
+
+def store_persona_response(persona_turn, bot_msg):
+    if persona_turn["cache_key"]:
+        persona_cache.put(persona_turn["cache_key"], bot_msg, persona_turn["user_name"], persona_turn["personal_values"])
+
+def log_timings(user_id, timings, outcome):
+    print(f"Turn Timings [{user_id}] {outcome}: {json.dumps(timings)}")
+
 # =========================
 # MAIN ENDPOINT
 # =========================
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    user_id = request.user_id
-    user_input = request.message
-
-    hist_key = f"hist:{user_id}"
-    slot_key = f"slots:{user_id}"
-    cannot_provide_key = f"cannot_provide:{user_id}"
-    query_count_key = f"query_count:{user_id}"
-
-    raw_hist, raw_slots, raw_cannot, raw_query_count = await asyncio.gather(
-        redis_conn.get(hist_key),
-        redis_conn.get(slot_key),
-        redis_conn.get(cannot_provide_key),
-        redis_conn.get(query_count_key)
+def state_keys(user_id):
+    """Redis keys of a user's conversation state; the hash tag keeps both in one cluster slot"""
+    return f"agent:{{{user_id}}}:state", f"agent:{{{user_id}}}:history"
+
+def legacy_turn_keys(user_id):
+    """Per-field keys written before the state hash, read until they expire"""
+    return (
+        f"hist:{user_id}",
+        f"slots:{user_id}",
+        f"cannot_provide:{user_id}",
+        f"query_count:{user_id}"
     )
 
-    history = json.loads(raw_hist) if raw_hist else []
-    slots = json.loads(raw_slots) if raw_slots else {k: None for k in CRITICAL_SLOTS + OPTIONAL_SLOTS}
-    user_cannot_provide = json.loads(raw_cannot) if raw_cannot else {}
-    query_count = int(raw_query_count) if raw_query_count else 0
+def staged_turn_key(user_id, turn_id):
+    return f"turn:{user_id}:{turn_id}"
+
+# Compare-and-set of one turn: applied only if the state is still at the version
+# the turn was planned on, so a concurrent turn for the same user is never overwritten.
+# KEYS: state hash, history list. ARGV: expected version, slots, cannot_provide,
+# query_count, ttl, history limit, messages to append...
+SAVE_STATE_SCRIPT = redis_conn.register_script("""
+local version = tonumber(redis.call('HGET', KEYS[1], 'v') or '0')
+if version ~= tonumber(ARGV[1]) then
+    return -1
+end
+redis.call('HSET', KEYS[1], 'v', version + 1, 'slots', ARGV[2], 'cannot_provide', ARGV[3], 'query_count', ARGV[4])
+if #ARGV > 6 then
+    redis.call('RPUSH', KEYS[2], unpack(ARGV, 7, #ARGV))
+end
+redis.call('LTRIM', KEYS[2], -tonumber(ARGV[6]), -1)
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+return version + 1
+""")
+
+async def load_state(user_id):
+    """
+    Load a user's conversation state in one pipelined round trip.
+
+    The state is a hash (version, slots, cannot_provide, query_count) next to a
+    capped list of history messages. "stored" counts the history messages that
+    are already in Redis; anything after them is written with the next turn.
+    """
+    state_key, history_key = state_keys(user_id)
+
+    async with redis_conn.pipeline(transaction=False) as pipe:
+        pipe.hgetall(state_key)
+        pipe.lrange(history_key, 0, -1)
+        pipe.mget(*legacy_turn_keys(user_id))
+        fields, raw_history, legacy = await pipe.execute()
+
+    if fields:
+        history = [json.loads(message) for message in raw_history]
+
+        return {
+            "version": int(fields["v"]),
+            "stored": len(history),
+            "history": history,
+            "slots": json.loads(fields["slots"]),
+            "user_cannot_provide": json.loads(fields["cannot_provide"]),
+            "query_count": int(fields["query_count"])
+        }
+
+    raw_hist, raw_slots, raw_cannot, raw_query_count = legacy
+
+    return {
+        "version": 0,
+        "stored": 0,
+        "history": json.loads(raw_hist) if raw_hist else [],
+        "slots": json.loads(raw_slots) if raw_slots else {k: None for k in CRITICAL_SLOTS + OPTIONAL_SLOTS},
+        "user_cannot_provide": json.loads(raw_cannot) if raw_cannot else {},
+        "query_count": int(raw_query_count) if raw_query_count else 0
+    }
+
+def rebase_turn(turn, latest):
+    """Re-apply a turn on top of the state a concurrent turn saved since it was planned"""
+    updates = turn["updates"]
+    user_cannot_provide = {**latest["user_cannot_provide"], **updates["user_cannot_provide"]}
+
+    return {
+        "version": latest["version"],
+        # the greeting / legacy history was already written by the other turn
+        "carried": [],
+        "messages": turn["messages"],
+        "updates": updates,
+        "slots": secure_merge_slots(latest["slots"], updates["slots"], user_cannot_provide),
+        "user_cannot_provide": user_cannot_provide,
+        "query_count": latest["query_count"] + 1
+    }
+
+async def commit_turn(user_id, turn):
+    """Persist a turn with compare-and-set, rebasing and retrying when the state moved on"""
+    for _ in range(MAX_STATE_RETRIES):
+        version = await SAVE_STATE_SCRIPT(
+            keys=state_keys(user_id),
+            args=[
+                turn["version"],
+                json.dumps(turn["slots"]),
+                json.dumps(turn["user_cannot_provide"]),
+                turn["query_count"],
+                STATE_TTL,
+                HISTORY_LIMIT,
+                *(json.dumps(message) for message in turn["carried"] + turn["messages"])
+            ]
+        )
+
+        if version >= 0:
+            return version
+
+        turn = rebase_turn(turn, await load_state(user_id))
+
+    print(f"State Error: gave up saving turn for {user_id} after {MAX_STATE_RETRIES} conflicts")
+    return None
+
+async def save_turn(user_id, state, user_input, bot_msg, turn_id=None):
+    """Record the exchange and persist it, or stage it under turn_id until /chat/commit for a speculative turn"""
+    messages = [
+        {"role": "user", "content": user_input},
+        {"role": "assistant", "content": bot_msg}
+    ]
+
+    turn = {
+        "version": state["version"],
+        "carried": state["history"][state["stored"]:],
+        "messages": messages,
+        "updates": state["updates"],
+        "slots": state["slots"],
+        "user_cannot_provide": state["user_cannot_provide"],
+        "query_count": state["query_count"]
+    }
+
+    state["history"].extend(messages)
+
+    if turn_id:
+        await redis_conn.set(staged_turn_key(user_id, turn_id), json.dumps(turn), ex=SPECULATIVE_TURN_TTL)
+        return
+
+    await commit_turn(user_id, turn)
+
+async def end_turn(user_id, state, user_input, bot_msg, turn_id=None, hangup=False):
+    """Persist the turn and build its response"""
+    await save_turn(user_id, state, user_input, bot_msg, turn_id)
+
+    return ChatResponse(response=bot_msg, slots=state["slots"], hangup=hangup)
+
+async def plan_turn(user_id, user_input, turn_id=None):
+    """
+    Run everything before the persona model for one turn.
+
+    Returns (response, persona_turn): a finished ChatResponse when the turn
+    ends early (hangups), otherwise the persona request and the state that
+    must be persisted once the persona reply is known. With a turn_id the
+    turn is speculative and its state is only staged (see save_turn).
+    """
+    timings = {}
+    turn_start = time.perf_counter()
+
+    state = await timed(timings, "load_state", load_state(user_id))
+
+    history = state["history"]
+    slots = state["slots"]
+    user_cannot_provide = state["user_cannot_provide"]
+    query_count = state["query_count"]
 
     # Add initial greeting if this is the first message
     if not history:
-        initial_greeting = "Good day! I am Riya, an admission counselor at J-E-C-R-C University. I would be happy to assist you with your admission queries. May I have your name, please?"
-        history.append({"role": "assistant", "content": initial_greeting})
+        history.append({"role": "assistant", "content": INITIAL_GREETING})
 
     # Increment query count
     query_count += 1
 
-    # Get manager decision first to check for hangup / soft redirect conditions
-    manager = await get_manager_decision(history, slots, user_input)
+    # Manager and rephraser + vector search run concurrently; the retrieval
+    # branch is speculative and dropped if the manager hangs up
+    retrieval = asyncio.create_task(retrieve_context(history, user_input, query_count, timings))
+
+    try:
+        manager = await timed(timings, "manager", get_turn_decision(history, slots, user_cannot_provide, user_input))
+    except BaseException:
+        retrieval.cancel()
+        raise
+
+    timings["manager_source"] = "fast_path" if manager.get("fast_path") else "llm"
 
     # Get language for hangup responses
     language = manager.get("language", "English")
@@ -766,88 +1082,40 @@ async def chat(request: ChatRequest):
     # Merge slots FIRST (to capture data even if hangup is triggered)
     slots = secure_merge_slots(slots, manager.get("extracted_slots", {}), user_cannot_provide)
 
+    # what this turn changed, re-applied on its own if a concurrent turn saved first
+    updates = {"slots": manager.get("extracted_slots", {}), "user_cannot_provide": new_cannot_provide}
+
+    state.update(slots=slots, user_cannot_provide=user_cannot_provide, query_count=query_count, updates=updates)
+
     # =========================================================
     # HARD HANGUPS — End the call
     # =========================================================
-    hangup_type = manager.get("hangup_type")
-
-    if hangup_type:
-        bot_msg = get_hangup_response(hangup_type, language)
-
-        if bot_msg:
-            history.extend([
-                {"role": "user", "content": user_input},
-                {"role": "assistant", "content": bot_msg}
-            ])
-
-            await asyncio.gather(
-                redis_conn.set(hist_key, json.dumps(history[-10:]), ex=3600),
-                redis_conn.set(slot_key, json.dumps(slots), ex=3600),
-                redis_conn.set(cannot_provide_key, json.dumps(user_cannot_provide), ex=3600),
-                redis_conn.set(query_count_key, str(query_count), ex=3600)
-            )
-
-            return ChatResponse(response=bot_msg, slots=slots, hangup=True)
-
-    # Check for counselor request hangup
-    if manager.get("requesting_counselor_call", False) and manager.get("hangup_reason") == "counselor_requested":
-        bot_msg = "I have documented your information. Our admission counselor will reach out to you at the earliest. Thank you for your interest in J-E-C-R-C University!"
-
-        history.extend([
-            {"role": "user", "content": user_input},
-            {"role": "assistant", "content": bot_msg}
-        ])
-
-        await asyncio.gather(
-            redis_conn.set(hist_key, json.dumps(history[-10:]), ex=3600),
-            redis_conn.set(slot_key, json.dumps(slots), ex=3600),
-            redis_conn.set(cannot_provide_key, json.dumps(user_cannot_provide), ex=3600),
-            redis_conn.set(query_count_key, str(query_count), ex=3600)
-        )
+    bot_msg = hard_hangup_message(manager, language)
 
-        return ChatResponse(response=bot_msg, slots=slots, hangup=True)
+    if bot_msg:
+        retrieval.cancel()
 
-    # Check for non-admission query hangup
-    if manager.get("non_admission_query", False) and manager.get("hangup_reason") == "non_admission_intent":
-        bot_msg = "I apologize, but I can only assist with admission queries related to J-E-C-R-C University. For other inquiries, please contact the appropriate department. Thank you for your understanding."
-
-        history.extend([
-            {"role": "user", "content": user_input},
-            {"role": "assistant", "content": bot_msg}
-        ])
-
-        await asyncio.gather(
-            redis_conn.set(hist_key, json.dumps(history[-10:]), ex=3600),
-            redis_conn.set(slot_key, json.dumps(slots), ex=3600),
-            redis_conn.set(cannot_provide_key, json.dumps(user_cannot_provide), ex=3600),
-            redis_conn.set(query_count_key, str(query_count), ex=3600)
-        )
+        response = await timed(timings, "save_state", end_turn(user_id, state, user_input, bot_msg, turn_id, hangup=True))
+        timings["total"] = round((time.perf_counter() - turn_start) * 1000, 1)
+        log_timings(user_id, timings, "hard_hangup")
 
-        return ChatResponse(response=bot_msg, slots=slots, hangup=True)
+        return response, None
 
     # =========================================================
     # REPHRASER — also catches bye/abusive hangups
     # =========================================================
-    vector_query = await rephrase_query(history, user_input, query_count)
+    vector_query, context_data = await retrieval
 
     is_hangup = "<hangup>" in vector_query.lower()
 
     if is_hangup:
-        bot_msg = "Thank you for your time. Our counsellors will reach out to you soon! You can also reach our helpdesk between ten A-M and six P-M from Monday to Saturday. Thank you for calling J-E-C-R-C University"
-
-        history.extend([
-            {"role": "user", "content": user_input},
-            {"role": "assistant", "content": bot_msg}
-        ])
-
-        await asyncio.gather(
-            redis_conn.set(hist_key, json.dumps(history[-10:]), ex=3600),
-            redis_conn.set(slot_key, json.dumps(slots), ex=3600),
-            redis_conn.set(cannot_provide_key, json.dumps(user_cannot_provide), ex=3600),
-            redis_conn.set(query_count_key, str(query_count), ex=3600)
-        )
+        bot_msg = CLOSING_RESPONSE
 
-        return ChatResponse(response=bot_msg, slots=slots, hangup=True)
+        response = await timed(timings, "save_state", end_turn(user_id, state, user_input, bot_msg, turn_id, hangup=True))
+        timings["total"] = round((time.perf_counter() - turn_start) * 1000, 1)
+        log_timings(user_id, timings, "rephraser_hangup")
+
+        return response, None
 
     # =========================================================
     # SOFT REDIRECTS — Retain conversation, no hangup
@@ -878,9 +1146,6 @@ async def chat(request: ChatRequest):
     else:
         instruction += " Continue providing professional assistance without requesting previously collected information."
 
-    # Get context from vector DB
-    context_data = await search_vector_db(vector_query)
-
     # Check flags
     counselor_mentioned = check_counselor_mentioned(history)
     facility_mentioned = check_facility_mentioned(history)
@@ -888,10 +1153,9 @@ async def chat(request: ChatRequest):
     # Get user's name for personalization
     user_name = slots.get("Name") or "student"
 
-    # Prepare persona prompt
-    persona_prompt = RIYA_PERSONA_PROMPT.format(
+    # Everything the persona prompt is built from except the user's own details
+    prompt_fields = dict(
         language=language,
-        current_slots=json.dumps(slots),
         program_level=program_level,
         user_cannot_provide=json.dumps(user_cannot_provide),
         show_scholarship_alert=manager.get("is_scholarship_eligible", False),
@@ -899,41 +1163,163 @@ async def chat(request: ChatRequest):
         facility_mentioned=facility_mentioned,
         requesting_counselor_call=manager.get("requesting_counselor_call", False),
         soft_redirect=soft_redirect,
-        context_data=context_data,
         name_filled=slots.get("Name") not in (None, "", "null"),
         course_filled=slots.get("Course") not in (None, "", "null"),
         minimal_info_collected=flow_complete,
-        user_name=user_name,
         instruction=instruction
     )
 
-    final = await groq_client.chat.completions.create(
-        model=PERSONA_MODEL,
-        messages=[
+    # Prepare persona prompt
+    persona_prompt = RIYA_PERSONA_PROMPT.format(
+        current_slots=json.dumps(slots),
+        context_data=context_data,
+        user_name=user_name,
+        **prompt_fields
+    )
+
+    cache_key = persona_cache_key(manager, vector_query, context_data, slots.get("Course"), prompt_fields)
+    cached_response = persona_cache.get(cache_key, user_name) if cache_key else None
+
+    timings["persona_source"] = "cache" if cached_response is not None else "llm"
+
+    persona_turn = {
+        "messages": [
             {"role": "system", "content": persona_prompt},
             {"role": "user", "content": user_input}
         ],
+        "user_input": user_input,
+        "state": state,
+        "user_id": user_id,
+        "turn_id": turn_id,
+        "timings": timings,
+        "turn_start": turn_start,
+        "planned_at": time.perf_counter(),
+        "cache_key": cache_key,
+        "cached_response": cached_response,
+        "user_name": slots.get("Name"),
+        "personal_values": [slots.get("City"), slots.get("Percentage"), slots.get("Preference")]
+    }
+
+    return None, persona_turn
+
+async def finish_turn(persona_turn, bot_msg):
+    """Persist a persona turn and build its response"""
+    timings = persona_turn["timings"]
+    timings["persona"] = round((time.perf_counter() - persona_turn["planned_at"]) * 1000, 1)
+
+    response = await timed(timings, "save_state", end_turn(
+        persona_turn["user_id"],
+        persona_turn["state"],
+        persona_turn["user_input"],
+        bot_msg,
+        persona_turn["turn_id"]
+    ))
+
+    timings["total"] = round((time.perf_counter() - persona_turn["turn_start"]) * 1000, 1)
+    log_timings(persona_turn["user_id"], timings, "persona")
+
+    print(bot_msg)
+
+    return response
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
+    response, persona_turn = await plan_turn(request.user_id, request.message, request.turn_id)
+
+    if response:
+        return response
+
+    if persona_turn["cached_response"] is not None:
+        return await finish_turn(persona_turn, persona_turn["cached_response"])
+
+    final = await groq_client.chat.completions.create(
+        model=PERSONA_MODEL,
+        messages=persona_turn["messages"],
         temperature=0.7,
         max_tokens=512
     )
 
     bot_msg = final.choices[0].message.content
+    store_persona_response(persona_turn, bot_msg)
 
-    history.extend([
-        {"role": "user", "content": user_input},
-        {"role": "assistant", "content": bot_msg}
-    ])
+    return await finish_turn(persona_turn, bot_msg)
 
-    await asyncio.gather(
-        redis_conn.set(hist_key, json.dumps(history[-10:]), ex=3600),
-        redis_conn.set(slot_key, json.dumps(slots), ex=3600),
-        redis_conn.set(cannot_provide_key, json.dumps(user_cannot_provide), ex=3600),
-        redis_conn.set(query_count_key, str(query_count), ex=3600)
-    )
+@app.post("/chat/commit")
+async def chat_commit(request: CommitRequest):
+    """Persist the staged state of a speculative turn the caller decided to use"""
+    raw = await redis_conn.getdel(staged_turn_key(request.user_id, request.turn_id))
 
-    print(bot_msg)
+    if not raw:
+        return {"committed": False}
+
+    await commit_turn(request.user_id, json.loads(raw))
+
+    return {"committed": True}
+
+@app.get("/metrics")
+async def metrics():
+    """Fast-path coverage and agreement with the manager LLM, RAG client pool saturation, persona cache"""
+    return {
+        "fast_path": fast_path.stats.snapshot(),
+        "rag_http": rag_http_metrics.snapshot(app.state.rag_client),
+        "persona_cache": persona_cache.snapshot()
+    }
+
+@app.get("/prompts")
+async def prompts():
+    """Fixed replies spoken verbatim on every call, for the caller's TTS cache to pre-warm"""
+    fixed = [CLOSING_RESPONSE]
+    for responses in HANGUP_RESPONSES.values():
+        fixed.extend(responses.values())
+
+    return {"prompts": fixed}
+
+def stream_event(event_type, **fields):
+    return json.dumps({"type": event_type, **fields}) + "\n"
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Same turn as /chat, but streams the persona reply as NDJSON events:
+    {"type": "delta", "text": ...} per token batch, then one
+    {"type": "done", "response": ..., "slots": ..., "hangup": ...}.
+    Early (hangup) replies arrive as a single delta followed by done.
+    """
+    response, persona_turn = await plan_turn(request.user_id, request.message, request.turn_id)
+
+    async def events():
+        if response:
+            yield stream_event("delta", text=response.response)
+            yield stream_event("done", **response.model_dump())
+            return
+
+        if persona_turn["cached_response"] is not None:
+            yield stream_event("delta", text=persona_turn["cached_response"])
+            done = await finish_turn(persona_turn, persona_turn["cached_response"])
+            yield stream_event("done", **done.model_dump())
+            return
+
+        final = await groq_client.chat.completions.create(
+            model=PERSONA_MODEL,
+            messages=persona_turn["messages"],
+            temperature=0.7,
+            max_tokens=512,
+            stream=True
+        )
+
+        parts = []
+        async for chunk in final:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield stream_event("delta", text=chunk.choices[0].delta.content)
+
+        bot_msg = "".join(parts)
+        store_persona_response(persona_turn, bot_msg)
+
+        done = await finish_turn(persona_turn, bot_msg)
+        yield stream_event("done", **done.model_dump())
 
-    return ChatResponse(response=bot_msg, slots=slots, hangup=False)
+    return StreamingResponse(events(), media_type="application/x-ndjson")
 
 # =========================
 # RUN
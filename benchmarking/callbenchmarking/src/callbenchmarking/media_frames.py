@@ -0,0 +1,109 @@
+import json
+import time
+import base64
+
+import yaml
+import numpy as np
+
+from call.event import MEDIA_EVENT
+from call.vad import VAD , VARIANCE_VAD , ENERGY_VAD , SPECTRAL_FLUX_VAD
+
+with open('config.yml') as config_file : config : dict = yaml.safe_load(config_file)['media-frames']
+
+with open(config['call-config-path']) as config_file : vad_config : dict = yaml.safe_load(config_file)['session']['vad']
+
+def build_vad(vad_class : type , service : str) -> VAD :
+
+    return vad_class(config = {'sample-rate' : vad_config['sample-rate'] , **vad_config[service]})
+
+FRAMES_PER_CALL_SECOND : float = 1000 / config['frame-ms']
+
+def build_frames(num_frames : int) -> list[str] :
+
+    samples_per_frame : int = config['sample-rate'] * config['frame-ms'] // 1000
+    rng = np.random.default_rng(0)
+
+    frames : list[str] = []
+
+    for index in range(num_frames) :
+
+        amplitude : int = config['amplitudes'][index % len(config['amplitudes'])]
+        audio = (rng.standard_normal(samples_per_frame) * amplitude).clip(-32768 , 32767).astype(np.int16)
+
+        frames.append(
+            json.dumps(
+                {
+                    'event' : 'media' ,
+                    'sequenceNumber' : index ,
+                    'streamId' : 'benchmark' ,
+                    'media' : {
+                        'track' : 'inbound' ,
+                        'timestamp' : str(index * config['frame-ms']) ,
+                        'chunk' : index ,
+                        'payload' : base64.b64encode(audio.tobytes()).decode('utf-8')
+                    }
+                }
+            )
+        )
+
+    return frames
+
+def legacy_media_event(event : dict) -> tuple[bytes , bool] :
+    '''
+    The previous MEDIA_EVENT path : two base64 decodes , a float32 copy and np.std.
+    '''
+
+    payload : str = event['media']['payload']
+
+    audio_nd_array = np.frombuffer(base64.b64decode(payload) , dtype = np.int16).astype(np.float32) / 32768.0
+    audio_bytes : bytes = base64.b64decode(payload)
+
+    return audio_bytes , bool(np.std(audio_nd_array) >= 0.01)
+
+def media_event_handler(vad : VAD) :
+
+    def handler(event : dict) -> tuple[bytes , bool] :
+
+        media_event : MEDIA_EVENT = MEDIA_EVENT(**event)
+
+        return media_event.audio_bytes , vad(media_event.audio_nd_array)
+
+    return handler
+
+def run(frames : list[str] , handler) -> float :
+
+    for frame in frames[: config['warmup']] : handler(json.loads(frame))
+
+    start_time : float = time.perf_counter()
+
+    for frame in frames : handler(json.loads(frame))
+
+    return len(frames) / (time.perf_counter() - start_time)
+
+def main() -> None :
+
+    frames : list[str] = build_frames(config['frames'])
+
+    current_variance = media_event_handler(build_vad(VARIANCE_VAD , 'variance'))
+
+    mismatches : int = sum(
+        legacy_media_event(json.loads(frame))[1] != current_variance(json.loads(frame))[1]
+        for frame in frames
+    )
+
+    print(f'Frames : {len(frames)} x {config["frame-ms"]} ms @ {config["sample-rate"]} Hz , variance VAD decision mismatches : {mismatches}')
+
+    handlers : tuple = (
+        ('legacy' , legacy_media_event) ,
+        ('variance' , media_event_handler(build_vad(VARIANCE_VAD , 'variance'))) ,
+        ('energy' , media_event_handler(build_vad(ENERGY_VAD , 'energy'))) ,
+        ('spectral' , media_event_handler(build_vad(SPECTRAL_FLUX_VAD , 'spectral')))
+    )
+
+    for name , handler in handlers :
+
+        frames_per_second : float = run(frames , handler)
+
+        print(f'{name:>8} : {frames_per_second:>12,.0f} frames/s/core  ~ {frames_per_second / FRAMES_PER_CALL_SECOND:>8,.0f} concurrent calls/core')
+
+if __name__ == '__main__' : main()
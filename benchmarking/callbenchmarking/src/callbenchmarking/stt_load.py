@@ -0,0 +1,238 @@
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+import multiprocessing
+
+import yaml
+import numpy as np
+import websockets
+
+from threading import Thread
+from asyncio import Queue
+
+from deepgram import DeepgramClient , AsyncDeepgramClient
+from deepgram.core.events import EventType
+from deepgram.environment import DeepgramClientEnvironment
+from deepgram.extensions.types.sockets import ListenV1ControlMessage
+
+from call.connection import STT_STREAM
+from call.timers import TIMER_HEAP
+
+with open('config.yml') as config_file : config : dict = yaml.safe_load(config_file)['stt-load']
+
+with open(config['call-config-path']) as config_file : stt_config : dict = yaml.safe_load(config_file)['stt']['deepgram']
+
+OPTIONS : dict = {
+    'model' : stt_config['model-name'] ,
+    'encoding' : stt_config['encoding'] ,
+    'sample_rate' : str(stt_config['sample-rate']) ,
+    'language' : stt_config['language'] ,
+    'diarize' : stt_config['diarize'] ,
+    'keyterm' : stt_config['keyterm']
+}
+
+ENVIRONMENT : DeepgramClientEnvironment = DeepgramClientEnvironment(
+    base = f'http://{config["host"]}:{config["port"]}' ,
+    production = f'ws://{config["host"]}:{config["port"]}' ,
+    agent = f'ws://{config["host"]}:{config["port"]}'
+)
+
+RESULTS : str = json.dumps(
+    {
+        'type' : 'Results' ,
+        'channel_index' : [0 , 1] ,
+        'duration' : 0.5 ,
+        'start' : 0.0 ,
+        'is_final' : True ,
+        'speech_final' : False ,
+        'channel' : {'alternatives' : [{'transcript' : '' , 'confidence' : 0.0 , 'words' : []}]} ,
+        'metadata' : {
+            'request_id' : 'benchmark' ,
+            'model_info' : {'name' : 'fake' , 'version' : '0' , 'arch' : 'fake'} ,
+            'model_uuid' : 'benchmark'
+        }
+    }
+)
+
+def serve() -> None :
+    '''
+    Fake Deepgram listen endpoint , run in its own process so it does not compete
+    with the calls for the event loop : swallows audio , answers with an empty
+    Results message every `results-every` frames and closes on CloseStream.
+    '''
+
+    async def handler(websocket) -> None :
+
+        frames : int = 0
+
+        async for message in websocket :
+
+            if isinstance(message , str) :
+
+                if json.loads(message)['type'] == 'CloseStream' : return
+
+                continue
+
+            frames += 1
+
+            if frames % config['results-every'] == 0 : await websocket.send(RESULTS)
+
+    async def run() -> None :
+
+        async with websockets.serve(handler , config['host'] , config['port'] , max_queue = None) : await asyncio.Future()
+
+    asyncio.run(run())
+
+class LOAD :
+
+    def __init__(self) -> None :
+
+        self.latencies : list[float] = []
+        self.messages : int = 0
+        self.peak_threads : int = threading.active_count()
+
+        self.timers : TIMER_HEAP = TIMER_HEAP(logger = logging.getLogger(__name__))
+
+    def on_message(self , message) -> None : self.messages += 1
+
+    async def sample_threads(self) -> None :
+
+        while True :
+
+            self.peak_threads = max(self.peak_threads , threading.active_count())
+
+            await asyncio.sleep(0.1)
+
+    async def produce(self , queue : Queue , frame : bytes) -> None :
+        '''
+        Plivo side of a call : one frame every `frame-ms` , stamped with its arrival time.
+        '''
+
+        interval : float = config['frame-ms'] / 1000
+        num_frames : int = int(config['duration'] / interval)
+
+        # calls do not start on the same tick in production
+        await asyncio.sleep(random.uniform(0 , interval))
+
+        next_time : float = time.perf_counter()
+
+        for _ in range(num_frames) :
+
+            await queue.put((time.perf_counter() , frame))
+
+            next_time += interval
+
+            await asyncio.sleep(max(0.0 , next_time - time.perf_counter()))
+
+        await queue.put(None)
+
+    async def forward(self , queue : Queue , send) -> None :
+        '''
+        `SESSION.vad_task` side of a call : pull frames and hand them to the STT socket.
+        '''
+
+        while (item := await queue.get()) is not None :
+
+            arrival_time , frame = item
+
+            await send(frame)
+
+            self.latencies.append(time.perf_counter() - arrival_time)
+
+    async def threaded_call(self , client : DeepgramClient , frame : bytes) -> None :
+        '''
+        Previous path : sync socket , a listener thread per call and blocking sends on the loop.
+        '''
+
+        queue : Queue = Queue()
+
+        with client.listen.v1.connect(**OPTIONS) as connection :
+
+            connection.on(EventType.MESSAGE , self.on_message)
+
+            listen_thread : Thread = Thread(target = connection.start_listening , daemon = True)
+            listen_thread.start()
+
+            async def send(audio : bytes) -> None : connection.send_media(audio)
+
+            await asyncio.gather(self.produce(queue , frame) , self.forward(queue , send))
+
+            connection.send_control(ListenV1ControlMessage(type = 'CloseStream'))
+
+            await asyncio.to_thread(listen_thread.join , config['close-timeout'])
+
+    async def async_call(self , client : AsyncDeepgramClient , frame : bytes) -> None :
+
+        queue : Queue = Queue()
+
+        connection : STT_STREAM = STT_STREAM(
+            client = client ,
+            options = OPTIONS ,
+            keepalive_interval = stt_config['keepalive-interval'] ,
+            close_timeout = config['close-timeout'] ,
+            timers = self.timers ,
+            logger = logging.getLogger(__name__)
+        )
+
+        connection.on(EventType.MESSAGE , self.on_message)
+
+        async with connection :
+
+            await asyncio.gather(self.produce(queue , frame) , self.forward(queue , connection.send_media))
+
+async def run(mode : str) -> LOAD :
+
+    load : LOAD = LOAD()
+
+    samples_per_frame : int = config['sample-rate'] * config['frame-ms'] // 1000
+    frame : bytes = (np.random.default_rng(0).standard_normal(samples_per_frame) * 1000).astype(np.int16).tobytes()
+
+    if mode == 'threaded' :
+
+        client : DeepgramClient = DeepgramClient(api_key = 'benchmark' , environment = ENVIRONMENT)
+        call = load.threaded_call
+
+    else :
+
+        client : AsyncDeepgramClient = AsyncDeepgramClient(api_key = 'benchmark' , environment = ENVIRONMENT)
+        call = load.async_call
+
+    sampler : asyncio.Task = asyncio.create_task(load.sample_threads())
+
+    await asyncio.gather(*(call(client , frame) for _ in range(config['calls'])))
+
+    sampler.cancel()
+
+    return load
+
+def main() -> None :
+
+    server : multiprocessing.Process = multiprocessing.Process(target = serve , daemon = True)
+    server.start()
+
+    time.sleep(1.0)
+
+    print(f'Calls : {config["calls"]} x {config["duration"]} s , {config["frame-ms"]} ms frames')
+
+    try :
+
+        for mode in config['modes'] :
+
+            load : LOAD = asyncio.run(run(mode))
+
+            latencies_ms : np.ndarray = np.array(load.latencies) * 1000
+
+            print(
+                f'{mode:>8} : peak threads {load.peak_threads:>5}  '
+                f'frames {latencies_ms.shape[0]:>8,}  results {load.messages:>6,}  '
+                f'forward p50 {np.percentile(latencies_ms , 50):>7.3f} ms  '
+                f'p99 {np.percentile(latencies_ms , 99):>7.3f} ms  '
+                f'max {latencies_ms.max():>8.3f} ms'
+            )
+
+    finally : server.terminate()
+
+if __name__ == '__main__' : main()
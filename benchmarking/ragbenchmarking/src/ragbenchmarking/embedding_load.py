@@ -0,0 +1,83 @@
+import time
+import random
+import asyncio
+
+import yaml
+import numpy as np
+
+from rag.embedding import EmbeddingBatcher, load_embedder
+
+with open("config.yml") as config_file:
+    config = yaml.safe_load(config_file)["embedding-load"]
+
+QUERIES = [
+    "btech cse fees",
+    "what is the fee for b.tech computer science",
+    "hostel fees for girls",
+    "is there any scholarship for 90 percent",
+    "lateral entry eligibility",
+    "CSBS with TCS fees",
+    "Kalvium software product engineering",
+    "mba admission process",
+    "bca course duration",
+    "placement record of jecrc",
+    "m.tech cyber security fees",
+    "does the university provide transport",
+]
+
+
+async def caller(embed, latencies):
+    for _ in range(config["queries-per-caller"]):
+        start = time.perf_counter()
+        await embed(random.choice(QUERIES))
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(mode, callers, encode):
+    """Throughput and per-query latency of `callers` concurrent callers."""
+    batcher = None
+
+    if mode == "batched":
+        batcher = EmbeddingBatcher(encode, max_batch=config["max-batch"], max_wait_ms=config["max-wait-ms"])
+        batcher.start()
+        embed = batcher.embed
+    else:
+        # previous path: one encode per request on the thread pool
+        async def embed(text):
+            return (await asyncio.to_thread(encode, [text]))[0]
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(caller(embed, latencies) for _ in range(callers)))
+    elapsed = time.perf_counter() - start
+
+    if batcher is not None:
+        await batcher.stop()
+
+    return len(latencies) / elapsed, np.array(latencies) * 1000, batcher
+
+
+def main():
+    embedder = load_embedder(config["model"], backend=config["backend"])
+
+    def encode(texts):
+        return embedder.encode(texts, show_progress_bar=False)
+
+    # warm up kernels and tokenizer caches
+    encode(QUERIES)
+
+    print(f'{config["model"]} on {config["backend"]} , {config["queries-per-caller"]} queries per caller')
+
+    for callers in config["callers"]:
+        for mode in ("unbatched", "batched"):
+            throughput, latencies_ms, batcher = asyncio.run(run(mode, callers, encode))
+            batches = f'  mean batch {batcher.snapshot()["mean_batch_size"]:>6}' if batcher is not None else ""
+            print(
+                f"callers {callers:>4}  {mode:>9} : {throughput:>8.1f} q/s  "
+                f"p50 {np.percentile(latencies_ms, 50):>8.2f} ms  "
+                f"p99 {np.percentile(latencies_ms, 99):>8.2f} ms{batches}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import time
+import tempfile
+
+import yaml
+import numpy as np
+from chromadb import PersistentClient
+
+from rag.index import MmapVectorIndex
+
+with open("config.yml") as config_file:
+    config = yaml.safe_load(config_file)["index-load"]
+
+
+def corpus(rows, rng):
+    """Clustered unit vectors, closer to sentence embeddings of one domain than uniform noise."""
+    centers = rng.normal(size=(config["clusters"], config["dim"])).astype(np.float32)
+    vectors = centers[rng.integers(0, config["clusters"], rows)] + 0.5 * rng.normal(size=(rows, config["dim"])).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def chroma_engine(directory, ids, texts, metadatas, vectors):
+    collection = PersistentClient(path=directory).get_or_create_collection(name="benchmark", metadata={"hnsw:space": "cosine"})
+    batch = config["chroma-batch"]
+    for start in range(0, len(ids), batch):
+        end = start + batch
+        collection.add(ids=ids[start:end], documents=texts[start:end], metadatas=metadatas[start:end], embeddings=vectors[start:end])
+
+    def search(query, top_k):
+        results = collection.query(query_embeddings=[query], n_results=top_k, include=["documents", "metadatas", "distances"])
+        return results["ids"][0]
+
+    return search
+
+
+def mmap_engine(dtype):
+    def build(directory, ids, texts, metadatas, vectors):
+        index = MmapVectorIndex(directory, dtype=dtype)
+        index.add(ids, texts, metadatas, vectors)
+
+        def search(query, top_k):
+            return [row[0] for row in index.search(query, top_k)]
+
+        return search
+
+    return build
+
+
+def main():
+    rng = np.random.default_rng(0)
+    top_k = config["top-k"]
+    engines = {"chroma": chroma_engine, "mmap-f32": mmap_engine("float32"), "mmap-int8": mmap_engine("int8")}
+
+    for rows in config["rows"]:
+        vectors = corpus(rows, rng)
+        queries = corpus(config["queries"], rng)
+        ids = [f"chunk-{i}" for i in range(rows)]
+        texts = [f"chunk {i}" for i in range(rows)]
+        metadatas = [{"source_page": str(i % 300), "context_tag": "benchmark"} for i in range(rows)]
+
+        # exact neighbours for recall
+        truth = [set(ids[j] for j in np.argsort(-(vectors @ query))[:top_k]) for query in queries]
+
+        print(f"{rows:,} rows x {config['dim']} , {config['queries']:,} queries , top {top_k}")
+
+        for name, build in engines.items():
+            with tempfile.TemporaryDirectory() as directory:
+                start = time.perf_counter()
+                search = build(directory, ids, texts, metadatas, vectors)
+                build_s = time.perf_counter() - start
+
+                latencies, hits = [], 0
+                for query, expected in zip(queries, truth):
+                    start = time.perf_counter()
+                    found = search(query, top_k)
+                    latencies.append(time.perf_counter() - start)
+                    hits += len(expected.intersection(found))
+
+                latencies_ms = np.array(latencies) * 1000
+                print(
+                    f"  {name:>9} : build {build_s:>7.2f} s  "
+                    f"p50 {np.percentile(latencies_ms, 50):>7.3f} ms  "
+                    f"p99 {np.percentile(latencies_ms, 99):>7.3f} ms  "
+                    f"recall@{top_k} {hits / (len(queries) * top_k):.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import io
+import os
+import time
+import base64
+import resource
+import tempfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+from PIL import Image, ImageDraw
+from pdf2image import convert_from_bytes
+
+from rag.rasterize import PdfPages
+
+with open("config.yml") as config_file:
+    config = yaml.safe_load(config_file)["rasterize-memory"]
+
+
+def pages(count):
+    """A4 pages at 150 dpi with a table-like grid of text, one at a time."""
+    for number in range(1, count + 1):
+        page = Image.new("RGB", (1240, 1754), "white")
+        draw = ImageDraw.Draw(page)
+        for row in range(60):
+            draw.text((80, 80 + row * 26), f"Page {number} row {row} | B.Tech CSE | 2,45,000 | 60% in 10+2", fill="black")
+            draw.line((70, 100 + row * 26, 1170, 100 + row * 26), fill="gray")
+        yield page
+
+
+def make_pdf(path, count):
+    generator = pages(count)
+    first = next(generator)
+    first.save(path, "PDF", resolution=150, save_all=True, append_images=generator)
+
+
+def legacy(path):
+    """Previous /ingest: whole upload in memory, every page as a PIL image, JPEG+base64 per page."""
+    with open(path, "rb") as f:
+        file_bytes = f.read()
+    images = convert_from_bytes(file_bytes, dpi=config["dpi"])
+    for image in images:
+        buf = io.BytesIO()
+        image.save(buf, format="JPEG")
+        encoded = base64.b64encode(buf.getvalue()).decode()
+        del encoded
+    return len(images)
+
+
+def streaming(path):
+    """PdfPages as the ingest job uses it, `concurrency` pages in flight."""
+    source = PdfPages(path, dpi=config["dpi"])
+    with ThreadPoolExecutor(max_workers=config["concurrency"]) as pool:
+        for encoded in pool.map(source.load, range(1, source.count + 1)):
+            del encoded
+    return source.count
+
+
+def measure(mode, path, results):
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    count = {"legacy": legacy, "streaming": streaming}[mode](path)
+    results.put({
+        "pages": count,
+        "seconds": time.perf_counter() - start,
+        # ru_maxrss is in KiB on Linux
+        "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "baseline_mb": baseline / 1024,
+        "poppler_peak_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    })
+
+
+def main():
+    # every run in a fresh process so ru_maxrss is the peak of that run alone
+    context = multiprocessing.get_context("spawn")
+
+    print(f'{config["dpi"]} dpi , {config["concurrency"]} pages in flight when streaming')
+
+    with tempfile.TemporaryDirectory() as directory:
+        for count in config["pages"]:
+            path = os.path.join(directory, f"{count}.pdf")
+            make_pdf(path, count)
+
+            for mode in ("legacy", "streaming"):
+                results = context.Queue()
+                process = context.Process(target=measure, args=(mode, path, results))
+                process.start()
+                result = results.get()
+                process.join()
+
+                print(
+                    f"pages {count:>4}  {mode:>9} : {result['seconds']:>7.1f} s  "
+                    f"peak rss {result['peak_mb']:>8.1f} MB (baseline {result['baseline_mb']:.1f} MB)  "
+                    f"pdftoppm peak {result['poppler_peak_mb']:>6.1f} MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
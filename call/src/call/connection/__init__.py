@@ -1 +1,3 @@
+from .stt_ import * 
+from .stt_pool_ import * 
 from .connection_ import * 
\ No newline at end of file
@@ -1,19 +1,59 @@
 from logging import Logger 
 import os
+import asyncio
 
-from deepgram import DeepgramClient
+from deepgram import AsyncDeepgramClient
 from asyncio import Queue
 from plivo.base import ResponseObject
 
+from .stt_ import STT_STREAM
+from .stt_pool_ import STT_POOL
+from ..timers import TIMER_HEAP
+
 class ConnectionManager : 
 
-    def __init__(self , logger : Logger) -> None : 
+    def __init__(self , config : dict , timers : TIMER_HEAP , logger : Logger) -> None : 
         
         self.active_connections : dict = {}
+        self.config : dict = config
+        self.timers : TIMER_HEAP = timers
         self.logger : Logger = logger
 
-        self.deepgram_client = DeepgramClient(api_key = os.environ['DEEPGRAM_API_KEY'])
+        self.deepgram_client : AsyncDeepgramClient = AsyncDeepgramClient(api_key = os.environ['DEEPGRAM_API_KEY'])
+
+        self.stt_pool : STT_POOL = STT_POOL(
+            config = self.config['pool'] , 
+            factory = self.create_stt_connection , 
+            logger = self.logger
+        )
+
+    def create_stt_connection(self) -> STT_STREAM : 
+
+        return STT_STREAM(
+            client = self.deepgram_client , 
+            options = {
+                'model' : self.config['model-name'] , 
+                'encoding' : self.config['encoding'] , 
+                'sample_rate' : str(self.config['sample-rate']) , 
+                'language' : self.config['language'] , 
+                'diarize' : self.config['diarize'] , 
+                'keyterm' : self.config['keyterm']
+            } , 
+            keepalive_interval = self.config['keepalive-interval'] , 
+            close_timeout = self.config['close-timeout'] , 
+            timers = self.timers , 
+            logger = self.logger
+        )
+
+    def start(self) -> None : self.stt_pool.start()
+
+    async def stop(self) -> None : 
+
+        await self.stt_pool.stop()
+
+        connections : list[STT_STREAM] = [connection['stt-connection'] for connection in self.active_connections.values() if connection['stt-connection'] is not None]
 
+        await asyncio.gather(*(connection.finish() for connection in connections) , return_exceptions = True)
 
     async def initialize_connection(
         self , 
@@ -21,6 +61,8 @@ class ConnectionManager :
         inbound_stream : ResponseObject
     ) -> None : 
 
+        # an `/answer` retry for the same call , release whatever the earlier attempt held
+        await self.close_connection(call_uuid = call_uuid)
 
         self.active_connections[call_uuid] = {}
 
@@ -31,23 +73,9 @@ class ConnectionManager :
         self.active_connections[call_uuid]['tts_queue'] = Queue()
         self.active_connections[call_uuid]['speaking'] = False
 
-        connection = self.deepgram_client.listen.v1.connect(
-            model='nova-3',
-            encoding="linear16",
-            sample_rate='16000' , 
-            language = 'multi' , 
-            #endpointing = 20 , 
-            #vad_events = True , 
-            #utterance_end_ms = 1000,
-            #interim_results = True , 
-            #dictation = True , 
-            #smart_format = True , 
-            diarize = True , 
-            keyterm = 'jaipur, jaipoor, japur, btech, bca, bba, rajasthan'
-            # sample_rate = 16000 , 
-        )
-
-        self.active_connections[call_uuid]['stt-connection'] = connection
+        # claimed from the pool by the media websocket (`get_stt_connection`) , a call whose
+        # websocket never opens (early hangup , failed stream) never holds a live STT socket
+        self.active_connections[call_uuid]['stt-connection'] = None
 
         self.logger.info(f'Intialzied connection with Call UUID : {self.active_connections}')
 
@@ -59,7 +87,21 @@ class ConnectionManager :
 
         else : raise ValueError(f'Call UUID : {call_uuid} was not found')
 
-    def get_stt_connection(self , call_uuid : str) : 
+    def get_stt_connection(self , call_uuid : str) -> STT_STREAM : 
+        '''
+        STT stream of the call , taken from the pool on first use (pre-opened when one is available , no STT handshake when the call starts).
+        '''
+
+        if call_uuid not in self.active_connections : raise ValueError(f'Call UUID: {call_uuid} was not found')
+
+        connection : dict = self.active_connections[call_uuid]
+
+        if connection['stt-connection'] is None : connection['stt-connection'] = self.stt_pool.acquire()
+
+        return connection['stt-connection']
+
+    async def close_connection(self , call_uuid : str) -> None : 
+
+        connection : dict | None = self.active_connections.pop(call_uuid , None)
 
-        if call_uuid in self.active_connections : return self.active_connections[call_uuid].get('stt-connection')
-        else : raise ValueError(f'Call UUID: {call_uuid} was not found')
\ No newline at end of file
+        if connection is not None and connection['stt-connection'] is not None : await connection['stt-connection'].finish()
@@ -0,0 +1,159 @@
+import time
+import asyncio
+
+from logging import Logger
+from typing import Any , Callable
+from asyncio import Task , create_task
+
+from deepgram import AsyncDeepgramClient
+from deepgram.core.events import EventType
+from deepgram.listen.v1.socket_client import AsyncV1SocketClient
+from deepgram.extensions.types.sockets import ListenV1ControlMessage
+
+from ..timers import TIMER , TIMER_HEAP
+
+class STT_STREAM :
+    '''
+    asyncio-native Deepgram live transcription stream for a single call.
+
+    The websocket is opened on `async with` and lives on the event loop : received
+    messages are dispatched to the registered callbacks from a listener task , audio
+    is forwarded with an awaited send and a KeepAlive only goes out when no audio was
+    sent for `keepalive-interval` seconds , checked from the worker's shared timer
+    heap. A call costs one socket and one task instead of an OS thread.
+
+    Args:
+        - client (AsyncDeepgramClient): Shared async Deepgram client.
+        - options (dict): Keyword arguments for `listen.v1.connect`.
+        - keepalive_interval (float): Idle seconds before a KeepAlive is sent.
+        - close_timeout (float): Seconds to wait for the final results after CloseStream.
+        - timers (TIMER_HEAP): Worker-wide deadline scheduler.
+        - logger (Logger): Logger.
+    '''
+
+    def __init__(
+        self ,
+        client : AsyncDeepgramClient ,
+        options : dict ,
+        keepalive_interval : float ,
+        close_timeout : float ,
+        timers : TIMER_HEAP ,
+        logger : Logger
+    ) -> None :
+
+        self.client : AsyncDeepgramClient = client
+        self.options : dict = options
+        self.keepalive_interval : float = keepalive_interval
+        self.close_timeout : float = close_timeout
+        self.timers : TIMER_HEAP = timers
+        self.logger : Logger = logger
+
+        self.callbacks : list[tuple[EventType , Callable[[Any] , Any]]] = []
+
+        self.context : Any = None
+        self.socket : AsyncV1SocketClient | None = None
+
+        self.listen_task : Task | None = None
+        self.keepalive_timer : TIMER = self.timers.timer(callback = self._keepalive)
+        self.keepalive_failed : bool = False
+
+        self.last_send_time : float = time.monotonic()
+        self.opened_at : float | None = None
+        self.closed : bool = False
+
+    def on(self , event_type : EventType , callback : Callable[[Any] , Any]) -> None :
+        '''
+        Register a callback , plain functions and coroutine functions are both accepted.
+        '''
+
+        self.callbacks.append((event_type , callback))
+
+        if self.socket is not None : self.socket.on(event_type , callback)
+
+    async def open(self) -> 'STT_STREAM' :
+        '''
+        Open the websocket , a no-op for a stream that was pre-opened by the pool.
+        '''
+
+        if self.socket is not None : return self
+
+        self.context = self.client.listen.v1.connect(**self.options)
+        self.socket = await self.context.__aenter__()
+
+        for event_type , callback in self.callbacks : self.socket.on(event_type , callback)
+
+        self.last_send_time = time.monotonic()
+        self.opened_at = self.last_send_time
+
+        self.listen_task = create_task(self.socket.start_listening())
+        self.timers.rearm(self.keepalive_timer , delay = self.keepalive_interval)
+
+        return self
+
+    @property
+    def healthy(self) -> bool :
+        '''
+        Open , still listening and still able to send KeepAlive.
+        '''
+
+        return (
+            self.socket is not None and 
+            not self.closed and 
+            not self.listen_task.done() and 
+            not self.keepalive_failed
+        )
+
+    async def send_media(self , audio_bytes : bytes) -> None :
+
+        if self.closed : return
+
+        await self.socket.send_media(audio_bytes)
+
+        self.last_send_time = time.monotonic()
+
+    async def _keepalive(self) -> None :
+
+        if self.closed : return
+
+        idle : float = time.monotonic() - self.last_send_time
+
+        if idle >= self.keepalive_interval :
+
+            try : await self.socket.send_control(ListenV1ControlMessage(type = 'KeepAlive'))
+            except Exception as e : self.logger.warning(f'Deepgram KeepAlive failed : {e}') ; self.keepalive_failed = True ; return
+
+            self.last_send_time = time.monotonic()
+            idle = 0.0
+
+        self.timers.rearm(self.keepalive_timer , delay = self.keepalive_interval - idle)
+
+    async def finish(self) -> None :
+        '''
+        Ask Deepgram to flush the final results , wait for the socket to close and
+        release it. Safe to call more than once.
+        '''
+
+        if self.closed or self.socket is None : return
+
+        self.closed = True
+
+        self.timers.cancel(self.keepalive_timer)
+
+        try :
+
+            await self.socket.send_control(ListenV1ControlMessage(type = 'CloseStream'))
+            await asyncio.wait_for(asyncio.shield(self.listen_task) , timeout = self.close_timeout)
+
+        except Exception as e : self.logger.warning(f'Deepgram stream did not close cleanly : {e!r}')
+
+        finally :
+
+            if not self.listen_task.done() : self.listen_task.cancel()
+
+            await asyncio.gather(self.listen_task , return_exceptions = True)
+
+            await self.context.__aexit__(None , None , None)
+
+    async def __aenter__(self) -> 'STT_STREAM' : return await self.open()
+
+    async def __aexit__(self , *exc_info) -> None : await self.finish()
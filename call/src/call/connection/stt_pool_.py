@@ -0,0 +1,215 @@
+import time
+import asyncio
+
+from logging import Logger
+from collections import deque
+from typing import Callable
+from asyncio import Task , create_task
+
+from .stt_ import STT_STREAM
+
+class STT_POOL :
+    '''
+    Pool of pre-opened Deepgram streams handed to calls when their media websocket starts , so call
+    setup no longer pays the TLS + websocket handshake to the STT vendor.
+
+    Idle streams keep themselves alive (STT_STREAM sends KeepAlive when no audio
+    goes out) and a maintenance task health checks them , evicts dead or stale
+    ones and refills the pool. The refill target follows demand : the number of
+    streams taken in the last interval , clamped to [min-size , max-size].
+
+    A stream taken from the pool belongs to the call and is never returned , it
+    carries the call's transcript state. When the pool is empty `acquire` hands
+    out an unopened stream that the session opens itself , as before.
+
+    Args:
+        - config (dict): Pool configuration
+            - min-size (int): Streams always kept open and idle.
+            - max-size (int): Upper bound on idle + opening streams.
+            - max-age (float): Seconds after which an idle stream is considered stale and closed.
+            - health-check-interval (float): Seconds between health checks / refills.
+        - factory (Callable): Builds a new , unopened STT_STREAM.
+        - logger (Logger): Logger.
+    '''
+
+    def __init__(self , config : dict , factory : Callable[[] , STT_STREAM] , logger : Logger) -> None :
+
+        self.config : dict = config
+        self.factory : Callable[[] , STT_STREAM] = factory
+        self.logger : Logger = logger
+
+        self.min_size : int = config['min-size']
+        self.max_size : int = config['max-size']
+        self.max_age : float = config['max-age']
+        self.interval : float = config['health-check-interval']
+
+        self.idle : deque[STT_STREAM] = deque()
+        self.opening : int = 0
+
+        self.task : Task | None = None
+        self.background : set[Task] = set()
+
+        self.hits : int = 0
+        self.misses : int = 0
+        self.opened : int = 0
+        self.open_failures : int = 0
+        self.evicted_stale : int = 0
+        self.evicted_unhealthy : int = 0
+        self.total_open_ms : float = 0.0
+        self.acquired_since_check : int = 0
+
+    def acquire(self) -> STT_STREAM :
+        '''
+        Take the most recently opened healthy stream , or an unopened one when the pool is empty.
+        '''
+
+        self.acquired_since_check += 1
+
+        while self.idle :
+
+            stream : STT_STREAM = self.idle.pop()
+
+            if stream.healthy :
+
+                self.hits += 1
+
+                if len(self.idle) < self.min_size : self.refill_soon()
+
+                return stream
+
+            self.evicted_unhealthy += 1
+            self.spawn(stream.finish())
+
+        self.misses += 1
+
+        self.refill_soon()
+
+        return self.factory()
+
+    async def _open(self) -> None :
+
+        stream : STT_STREAM = self.factory()
+
+        start_time : float = time.perf_counter()
+
+        try :
+
+            await stream.open()
+
+            self.opened += 1
+            self.total_open_ms += (time.perf_counter() - start_time) * 1000
+
+            self.idle.appendleft(stream)
+
+        except Exception as e :
+
+            self.open_failures += 1
+            self.logger.warning(f'Could not pre-open Deepgram stream : {e}')
+
+        finally : self.opening -= 1
+
+    @property
+    def target_size(self) -> int : return min(self.max_size , max(self.min_size , self.acquired_since_check))
+
+    async def refill(self) -> None :
+
+        missing : int = self.target_size - len(self.idle) - self.opening
+
+        if missing <= 0 : return
+
+        # counted before the opens are scheduled so a concurrent refill does not overshoot
+        self.opening += missing
+
+        await asyncio.gather(*(self._open() for _ in range(missing)))
+
+    def spawn(self , coroutine) -> None :
+
+        task : Task = create_task(coroutine)
+
+        self.background.add(task)
+        task.add_done_callback(self.background.discard)
+
+    def refill_soon(self) -> None : self.spawn(self.refill())
+
+    async def check(self) -> None :
+        '''
+        Drop dead streams , close the ones idle for longer than `max-age` and refill.
+        '''
+
+        now : float = time.monotonic()
+
+        kept : deque[STT_STREAM] = deque()
+        evicted : list[STT_STREAM] = []
+
+        for stream in self.idle :
+
+            if not stream.healthy :
+
+                self.evicted_unhealthy += 1
+                evicted.append(stream)
+
+            elif now - stream.opened_at > self.max_age :
+
+                self.evicted_stale += 1
+                evicted.append(stream)
+
+            else : kept.append(stream)
+
+        self.idle = kept
+
+        await self.refill()
+
+        self.acquired_since_check = 0
+
+        if evicted : await asyncio.gather(*(stream.finish() for stream in evicted) , return_exceptions = True)
+
+    async def run(self) -> None :
+
+        while True :
+
+            try : await self.check()
+            except asyncio.CancelledError : raise
+            except Exception as e : self.logger.error(f'STT pool health check failed : {e}')
+
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None :
+
+        if self.task is None or self.task.done() : self.task = create_task(self.run())
+
+    async def stop(self) -> None :
+
+        if self.task is not None :
+
+            self.task.cancel()
+
+            await asyncio.gather(self.task , return_exceptions = True)
+
+            self.task = None
+
+        for task in list(self.background) : task.cancel()
+
+        await asyncio.gather(*self.background , return_exceptions = True)
+
+        streams : list[STT_STREAM] = list(self.idle)
+        self.idle.clear()
+
+        await asyncio.gather(*(stream.finish() for stream in streams) , return_exceptions = True)
+
+    def snapshot(self) -> dict :
+
+        acquired : int = self.hits + self.misses
+
+        return {
+            'idle' : len(self.idle) ,
+            'opening' : self.opening ,
+            'target_size' : self.target_size ,
+            'hits' : self.hits ,
+            'misses' : self.misses ,
+            'hit_rate' : round(self.hits / acquired , 4) if acquired else None ,
+            'opened' : self.opened ,
+            'open_failures' : self.open_failures ,
+            'evicted_stale' : self.evicted_stale ,
+            'evicted_unhealthy' : self.evicted_unhealthy ,
+            'mean_open_ms' : round(self.total_open_ms / self.opened , 3) if self.opened else None
+        }
@@ -5,7 +5,9 @@ import noisereduce as nr
 
 from numpy import ndarray 
 
-class EVENT : 
+class EVENT :
+
+    __slots__ = ()
 
     def __init__(self) -> None : pass
 
@@ -1,23 +1,34 @@
-import numpy as np 
+import binascii
 
-from numpy import ndarray , float32
+import numpy as np
+
+from numpy import ndarray , int16
 
 from .event import EVENT
 
-class MEDIA_EVENT(EVENT) : 
+class MEDIA_EVENT(EVENT) :
+
+    __slots__ = (
+        'sequence_number' ,
+        'stream_id' ,
+        'track' ,
+        'timestamp' ,
+        'chunk' ,
+        'payload' ,
+        'audio_bytes' ,
+        'audio_nd_array'
+    )
 
     def __init__(
-        self , 
-        sequenceNumber : int , 
-        streamId : str , 
-        media : dict , 
-        event : str , 
+        self ,
+        sequenceNumber : int ,
+        streamId : str ,
+        media : dict ,
+        event : str ,
         **kwargs
-    ) -> None : 
+    ) -> None :
 
-        super().__init__()
-
-        self.sequence_number : int = sequenceNumber 
+        self.sequence_number : int = sequenceNumber
         self.stream_id : str = streamId
 
         self.track : str = media['track']
@@ -25,21 +36,13 @@ class MEDIA_EVENT(EVENT) :
         self.chunk : int = media['chunk']
         self.payload : str = media['payload']
 
-        self.audio_nd_array : ndarray = self.base64audio_to_ndarray(base64_audio = self.payload)
-        self.audio_bytes : bytes = self.base64_audio_to_bytes(base64_audio = self.payload)
-        # self.reduced_noise : ndarray = self.reduce_noise(
-        #     audio_nd_array = self.audio_nd_array , 
-        #     sample_rate = 16_000 # ! make it dependent on the start 
-        # )
-
-        self.reduced_noise : ndarray = self.audio_nd_array
-
-        self.find_variance()
-
-    def find_variance(self) -> None : 
-
-        self.variance : float32 = np.std(self.reduced_noise)
-
-        self.possiblity : bool = bool(self.variance >= 0.01)
+        try : self.audio_bytes : bytes = binascii.a2b_base64(self.payload)
+        except (binascii.Error , ValueError) as e : raise ValueError(f'Received corrupt audio: {e}')
 
-        # if self.possiblity : print(f'User said something , confidence : {self.variance}')
\ No newline at end of file
+        # zero-copy int16 view over the decoded payload , a trailing odd byte is dropped ;
+        # the speech / silence decision is made by the session's VAD
+        self.audio_nd_array : ndarray = np.frombuffer(
+            self.audio_bytes ,
+            dtype = int16 ,
+            count = len(self.audio_bytes) // 2
+        )
@@ -0,0 +1 @@
+from .history_ import * 
\ No newline at end of file
@@ -0,0 +1,327 @@
+import os
+import json
+import time
+import asyncio
+
+from logging import Logger
+from collections import deque
+from asyncio import Event , Task
+
+from redis.asyncio import Redis
+
+class HISTORY_WRITER :
+    '''
+    Per-worker writer for the conversation history lists (`livehistory:<call_uuid>`).
+
+    Sessions only `append` to an in-memory queue , a background task drains it
+    and writes every batch in one pipelined round trip (one RPUSH per key with
+    all its messages , one EXPIRE per key). A batch is written as soon as it is
+    `batch-size` messages large or the oldest message waited `flush-interval-ms` ,
+    so Redis latency never shows up in a turn.
+
+    Batches that cannot be written (Redis down , timeouts) are appended to a local
+    jsonl spool and replayed , in order , before anything newer once Redis is
+    back. The writer task also replays the spool as soon as it starts , so history
+    left there by a crash or a Redis outage does not wait for the next message.
+    When the queue grows past `max-queue` the writer task moves it to the spool
+    between writes , never while a batch is in flight , so the spool stays in order.
+
+    Args:
+        - config (dict): Writer configuration
+            - ttl (int): Seconds the history list is kept after its last write.
+            - batch-size (int): Messages per pipelined write.
+            - flush-interval-ms (float): Longest a queued message waits for its batch.
+            - max-queue (int): Queued messages above which the writer moves the queue to the spool.
+            - spool-path (str): Local jsonl file for batches Redis did not accept.
+            - retry-backoff (float): First retry delay after a failed write , doubled up to `max-retry-backoff`.
+            - max-retry-backoff (float): Upper bound on the retry delay.
+        - redis_client (Redis): Async Redis client.
+        - logger (Logger): Logger.
+    '''
+
+    def __init__(self , config : dict , redis_client : Redis , logger : Logger) -> None :
+
+        self.config : dict = config
+        self.redis_client : Redis = redis_client
+        self.logger : Logger = logger
+
+        self.ttl : int = config['ttl']
+        self.batch_size : int = config['batch-size']
+        self.flush_interval : float = config['flush-interval-ms'] / 1000
+        self.max_queue : int = config['max-queue']
+        self.spool_path : str = config['spool-path']
+        self.retry_backoff : float = config['retry-backoff']
+        self.max_retry_backoff : float = config['max-retry-backoff']
+
+        # (key , serialized message) in append order
+        self.queue : deque[tuple[str , str]] = deque()
+        self.ready : Event = Event()
+        self.overflow : Event = Event()
+
+        self.task : Task | None = None
+        self.inflight : list[tuple[str , str]] | None = None
+        self.spooling : asyncio.Future | None = None
+
+        self.spooled : int = self.count_spool()
+
+        self.appended : int = 0
+        self.written : int = 0
+        self.batches : int = 0
+        self.failures : int = 0
+        self.overflowed : int = 0
+        self.replayed : int = 0
+        self.max_queue_depth : int = 0
+        self.total_flush_ms : float = 0.0
+        self.last_error : str | None = None
+
+    def append(self , key : str , message : str) -> None :
+        '''
+        Queue one serialized message for `key`. Never waits on Redis.
+        '''
+
+        self.appended += 1
+
+        self.queue.append((key , message))
+        self.max_queue_depth = max(self.max_queue_depth , len(self.queue))
+
+        # the writer is far behind (Redis is down) , wake it to move the backlog to the spool
+        if len(self.queue) >= self.max_queue : self.overflow.set()
+
+        self.ready.set()
+
+    async def write(self , batch : list[tuple[str , str]]) -> None :
+        '''
+        Write `batch` in one pipelined round trip , order is kept per key.
+        '''
+
+        grouped : dict[str , list[str]] = {}
+
+        for key , message in batch : grouped.setdefault(key , []).append(message)
+
+        start_time : float = time.perf_counter()
+
+        async with self.redis_client.pipeline(transaction = False) as pipe :
+
+            for key , messages in grouped.items() :
+
+                pipe.rpush(key , *messages)
+                pipe.expire(key , self.ttl)
+
+            await pipe.execute()
+
+        self.batches += 1
+        self.written += len(batch)
+        self.total_flush_ms += (time.perf_counter() - start_time) * 1000
+
+    def count_spool(self) -> int :
+
+        try :
+            with open(self.spool_path) as spool_file : return sum(1 for _ in spool_file)
+
+        except FileNotFoundError : return 0
+
+    def write_spool(self , batch : list[tuple[str , str]]) -> None :
+
+        with open(self.spool_path , 'a') as spool_file :
+
+            for key , message in batch : spool_file.write(json.dumps({'key' : key , 'message' : message}) + '\n')
+
+        self.spooled += len(batch)
+
+    def rewrite_spool(self , batch : list[tuple[str , str]]) -> None :
+
+        os.remove(self.spool_path)
+
+        self.spooled = 0
+        self.write_spool(batch)
+
+    def read_spool(self) -> list[tuple[str , str]] :
+
+        batch : list[tuple[str , str]] = []
+
+        try :
+
+            with open(self.spool_path) as spool_file :
+
+                for line in spool_file :
+
+                    try : entry : dict = json.loads(line)
+                    # a line cut short by a crash mid-write
+                    except json.JSONDecodeError : continue
+
+                    batch.append((entry['key'] , entry['message']))
+
+        except FileNotFoundError : pass
+
+        return batch
+
+    async def replay_spool(self) -> None :
+        '''
+        Write everything in the spool , oldest first , then remove it. Raises if Redis is still unavailable.
+        '''
+
+        batch : list[tuple[str , str]] = await asyncio.to_thread(self.read_spool)
+
+        for offset in range(0 , len(batch) , self.batch_size) :
+
+            try : await self.write(batch[offset : offset + self.batch_size])
+
+            except Exception :
+
+                # keep only what was not written , a later replay must not duplicate it
+                await asyncio.to_thread(self.rewrite_spool , batch[offset :])
+
+                raise
+
+        await asyncio.to_thread(os.remove , self.spool_path)
+
+        self.replayed += len(batch)
+        self.spooled = 0
+
+        if batch : self.logger.info(f'Replayed {len(batch)} spooled history messages')
+
+    async def spool_overflow(self) -> None :
+        '''
+        Move the whole queue to the spool. Only called by the writer task between
+        batches , so it lands after every batch spooled before it and is replayed
+        before anything queued after it.
+        '''
+
+        batch : list[tuple[str , str]] = list(self.queue)
+
+        self.queue.clear()
+        self.overflow.clear()
+
+        self.overflowed += 1
+
+        # shielded , a stop() mid-write waits for it instead of losing the batch
+        self.spooling = asyncio.ensure_future(asyncio.to_thread(self.write_spool , batch))
+
+        await asyncio.shield(self.spooling)
+
+        self.spooling = None
+
+    async def next_batch(self) -> list[tuple[str , str]] :
+
+        while not self.queue :
+
+            self.ready.clear()
+            await self.ready.wait()
+
+        # give the batch until the flush interval to fill up
+        deadline : float = time.monotonic() + self.flush_interval
+
+        while len(self.queue) < self.batch_size and (remaining := deadline - time.monotonic()) > 0 :
+
+            self.ready.clear()
+
+            try : await asyncio.wait_for(self.ready.wait() , timeout = remaining)
+            except asyncio.TimeoutError : break
+
+        return [self.queue.popleft() for _ in range(min(self.batch_size , len(self.queue)))]
+
+    async def flush(self , batch : list[tuple[str , str]]) -> bool :
+        '''
+        Write `batch` after whatever is spooled , spool it on failure. Returns False when Redis was unavailable.
+        '''
+
+        try :
+
+            if self.spooled : await self.replay_spool()
+
+            await self.write(batch)
+
+            return True
+
+        except Exception as e :
+
+            self.failures += 1
+            self.last_error = repr(e)
+
+            self.logger.warning(f'History write failed , spooling {len(batch)} messages : {e!r}')
+
+            await asyncio.to_thread(self.write_spool , batch)
+
+            return False
+
+    async def run(self) -> None :
+
+        backoff : float = self.retry_backoff
+
+        if self.spooled :
+
+            # a failure here is retried before the next batch
+            try : await self.replay_spool()
+
+            except Exception as e :
+
+                self.failures += 1
+                self.last_error = repr(e)
+
+                self.logger.warning(f'History spool replay failed on startup : {e!r}')
+
+        while True :
+
+            if len(self.queue) >= self.max_queue : await self.spool_overflow()
+
+            batch : list[tuple[str , str]] = await self.next_batch()
+
+            self.inflight = batch
+            flushed : bool = await self.flush(batch)
+            self.inflight = None
+
+            if flushed : backoff = self.retry_backoff
+
+            else :
+
+                # keep batching while Redis is down , everything lands in the spool in order ,
+                # an overflowing queue cuts the wait short
+                try : await asyncio.wait_for(self.overflow.wait() , timeout = backoff)
+                except asyncio.TimeoutError : pass
+
+                backoff = min(backoff * 2 , self.max_retry_backoff)
+
+    def start(self) -> None :
+
+        if self.task is None or self.task.done() : self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None :
+        '''
+        Stop the writer and flush what is still queued , spooling it if Redis is unavailable.
+        '''
+
+        if self.task is not None :
+
+            self.task.cancel()
+
+            await asyncio.gather(self.task , return_exceptions = True)
+
+            self.task = None
+
+        if self.spooling is not None : await self.spooling ; self.spooling = None
+
+        # a batch cut off mid-write goes out again , RPUSH may repeat it but nothing is lost
+        if self.inflight is not None : self.queue.extendleft(reversed(self.inflight)) ; self.inflight = None
+
+        while self.queue :
+
+            batch : list[tuple[str , str]] = [self.queue.popleft() for _ in range(min(self.batch_size , len(self.queue)))]
+
+            await self.flush(batch)
+
+    def snapshot(self) -> dict :
+
+        return {
+            'queue_depth' : len(self.queue) ,
+            'max_queue_depth' : self.max_queue_depth ,
+            'spooled' : self.spooled ,
+            'appended' : self.appended ,
+            'written' : self.written ,
+            'batches' : self.batches ,
+            'mean_batch_size' : round(self.written / self.batches , 3) if self.batches else None ,
+            'mean_flush_ms' : round(self.total_flush_ms / self.batches , 3) if self.batches else None ,
+            'failures' : self.failures ,
+            'overflowed' : self.overflowed ,
+            'replayed' : self.replayed ,
+            'last_error' : self.last_error
+        }
@@ -1,15 +1,20 @@
-from redis import Redis
+from redis.asyncio import Redis
 import yaml
 
+from httpx import AsyncClient
+
 from logging import Logger
 from fastapi import FastAPI
 from plivo import RestClient
 from ..connection import ConnectionManager
+from ..metrics import LOOP_MONITOR
+from ..timers import TIMER_HEAP
+from ..history import HISTORY_WRITER
 
 from typing import Tuple , Any
 
 from .logging_ import load_logger
-from .services import load_tts_client , load_llm_client , load_redis_client , load_plivo_client , load_connection_manager
+from .services import load_tts_client , load_llm_client , load_redis_client , load_plivo_client , load_connection_manager , load_http_client , load_loop_monitor , load_timers , load_history_writer
 from .api_ import load_fastapi_app
 
 def load_clients() -> Tuple[
@@ -18,7 +23,11 @@ def load_clients() -> Tuple[
     Any , 
     RestClient , 
     ConnectionManager , 
-    Redis
+    Redis , 
+    AsyncClient , 
+    LOOP_MONITOR , 
+    TIMER_HEAP , 
+    HISTORY_WRITER
     # FastAPI
 ] : 
 
@@ -49,7 +58,18 @@ def load_clients() -> Tuple[
             "api-version": "1",
             "sample-rate": 16000,
             "sample-width": 2,
-            "channels": 1
+            "channels": 1,
+            "encoding": "linear16",
+            "diarize": True,
+            "keyterm": "jaipur, jaipoor, japur, btech, bca, bba, rajasthan",
+            "keepalive-interval": 5,
+            "close-timeout": 2,
+            "pool": {
+                "min-size": 4,
+                "max-size": 32,
+                "max-age": 600,
+                "health-check-interval": 5
+            }
             }
         },
         "tts": {
@@ -60,7 +80,13 @@ def load_clients() -> Tuple[
             "service-file-path": "./sts.json"
             },
             "smallestai": None,
-            "murf": None
+            "murf": None,
+            "cache": {
+            "enabled": True,
+            "max-entries": 512,
+            "max-bytes": 67108864,
+            "directory": "./.tts-cache"
+            }
         },
         "llm": {
             "service": "groq",
@@ -108,8 +134,47 @@ def load_clients() -> Tuple[
             }
             }
         },
+        "http-client": {
+            "http2": True,
+            "max-connections": 200,
+            "max-keepalive-connections": 50,
+            "keepalive-expiry": 30,
+            "timeout": {
+            "connect": 2,
+            "read": 15,
+            "write": 5,
+            "pool": 2
+            }
+        },
+        "history": {
+            "ttl": 86400,
+            "batch-size": 64,
+            "flush-interval-ms": 50,
+            "max-queue": 10000,
+            "spool-path": "./.history-spool.jsonl",
+            "retry-backoff": 0.5,
+            "max-retry-backoff": 10
+        },
+        "metrics": {
+            "loop-monitor": {
+            "interval": 0.1,
+            "stall-threshold-ms": 50
+            }
+        },
         "session": {
             "agent-url": "http://localhost:9001/chat",
+            "agent-stream-url": "http://localhost:9001/chat/stream",
+            "agent-commit-url": "http://localhost:9001/chat/commit",
+            "agent-prompts-url": "http://localhost:9001/prompts",
+            "hangup-grace-ms": 1500,
+            "greeting": "Hello !!, This is Riya, JECRC University AI Admission Counsellor, may I please know your name and which course you are interested in ?",
+            "inactivity-message": "Hello, I didn't hear you for long, do you have any questions?",
+            "agent-timeout": {
+            "connect": 2,
+            "read": 15,
+            "write": 5,
+            "pool": 2
+            },
             "play-audio": {
             "event": "playAudio",
             "contentType": "audio/x-mulaw",
@@ -118,10 +183,56 @@ def load_clients() -> Tuple[
             "clear-audio": {
             "event": "clearAudio"
             },
+            "playback": {
+            "frame-ms": 100,
+            "lead-ms": 300,
+            "sample-rate": 8000,
+            "bytes-per-sample": 1
+            },
             "settings": {
             "min-buffer-len": 2000,
-            "max-continous-interruption": 50,
             "barge-in": True
+            },
+            "streaming": {
+            "enabled": True,
+            "first-clause-chars": 12,
+            "min-clause-chars": 40,
+            "max-clause-chars": 200
+            },
+            "speculation": {
+            "enabled": True,
+            "pause-ms": 200
+            },
+            "vad": {
+            "service": "energy",
+            "sample-rate": 16000,
+            "variance": {
+                "threshold": 0.01,
+                "end-of-utterance-ms": 1000
+            },
+            "energy": {
+                "onset-ms": 60,
+                "hangover-ms": 120,
+                "end-of-utterance-ms": 500,
+                "start-ratio": 3.0,
+                "stop-ratio": 1.8,
+                "min-energy": 0.004,
+                "min-noise-floor": 0.0005,
+                "noise-attack": 0.02,
+                "noise-release": 0.3,
+                "max-zcr": 0.35
+            },
+            "spectral": {
+                "onset-ms": 40,
+                "hangover-ms": 120,
+                "end-of-utterance-ms": 500,
+                "band-hz": [300, 3400],
+                "start-snr-db": 9.0,
+                "stop-snr-db": 4.0,
+                "flux-threshold": 0.6,
+                "noise-adapt": 0.05,
+                "min-energy": 0.004
+            }
             }
         }
         }
@@ -133,12 +244,20 @@ def load_clients() -> Tuple[
 
     plivo_client : RestClient = load_plivo_client()
 
-    connection_manager : ConnectionManager = load_connection_manager(logger = logger)
+    timers : TIMER_HEAP = load_timers(logger = logger)
+
+    connection_manager : ConnectionManager = load_connection_manager(config = config['stt']['deepgram'] , timers = timers , logger = logger)
 
     # app : FastAPI = load_fastapi_app(config['fast-api'])
 
     redis_client : Redis = load_redis_client()
 
+    history_writer : HISTORY_WRITER = load_history_writer(config = config['history'] , redis_client = redis_client , logger = logger)
+
+    http_client : AsyncClient = load_http_client(config['http-client'])
+
+    loop_monitor : LOOP_MONITOR = load_loop_monitor(config = config['metrics']['loop-monitor'] , logger = logger)
+
     return (
         config , 
         logger , 
@@ -147,5 +266,9 @@ def load_clients() -> Tuple[
         plivo_client , 
         connection_manager , 
         # app , 
-        redis_client
+        redis_client , 
+        http_client , 
+        loop_monitor , 
+        timers , 
+        history_writer
     )
\ No newline at end of file
@@ -1,14 +1,20 @@
 import os 
 
 from dotenv import load_dotenv
-from redis import Redis
+from redis.asyncio import Redis
+from httpx import AsyncClient , Limits , Timeout
 from plivo import RestClient
 from logging import Logger
 
 from ..connection import ConnectionManager
+from ..history import HISTORY_WRITER
+from ..metrics import LOOP_MONITOR
+from ..timers import TIMER_HEAP
+from ..vad import VAD , VARIANCE_VAD , ENERGY_VAD , SPECTRAL_FLUX_VAD
 
 from tts import (
-    GOOGLE_TTS
+    GOOGLE_TTS , 
+    CACHED_TTS
 )
 
 from llm import GROQ_LLM
@@ -27,14 +33,44 @@ def load_redis_client() -> Redis :
 
     return redis_client
 
+def load_http_client(config : dict) -> AsyncClient : 
+
+    http_client : AsyncClient = AsyncClient(
+        http2 = config['http2'] , 
+        limits = Limits(
+            max_connections = config['max-connections'] , 
+            max_keepalive_connections = config['max-keepalive-connections'] , 
+            keepalive_expiry = config['keepalive-expiry']
+        ) , 
+        timeout = Timeout(**config['timeout'])
+    )
+
+    return http_client
+
 def load_tts_client(config : dict) : 
 
     if config['service'] == 'murf' : tts_client = MURF_TTS(config = config['murf'])
     if config['service'] == 'google' : tts_client = GOOGLE_TTS(config = config['google'])
     if config['service'] == 'smallestai' : tts_client = SMALLESTAI_TTS(config = config['smallestai'])
 
+    if config['cache']['enabled'] : tts_client = CACHED_TTS(client = tts_client , config = config['cache'])
+
     return tts_client
 
+def load_vad(config : dict) -> VAD : 
+
+    backend_config : dict = {
+        'sample-rate' : config['sample-rate'] , 
+        **config[config['service']]
+    }
+
+    if config['service'] == 'variance' : vad = VARIANCE_VAD(config = backend_config)
+    elif config['service'] == 'energy' : vad = ENERGY_VAD(config = backend_config)
+    elif config['service'] == 'spectral' : vad = SPECTRAL_FLUX_VAD(config = backend_config)
+    else : raise ValueError(f'VAD service : "{config["service"]}" not supported')
+
+    return vad
+
 def load_llm_client(config : dict) : 
 
     if config['service'] == 'groq' : llm_client = GROQ_LLM(config = config['groq'])
@@ -50,8 +86,26 @@ def load_plivo_client() -> RestClient :
 
     return client 
 
-def load_connection_manager(logger : Logger) -> ConnectionManager : 
+def load_connection_manager(config : dict , timers : TIMER_HEAP , logger : Logger) -> ConnectionManager : 
     
-    connection_manger : ConnectionManager = ConnectionManager(logger = logger)
+    connection_manger : ConnectionManager = ConnectionManager(config = config , timers = timers , logger = logger)
+
+    return connection_manger
+
+def load_loop_monitor(config : dict , logger : Logger) -> LOOP_MONITOR : 
+
+    loop_monitor : LOOP_MONITOR = LOOP_MONITOR(config = config , logger = logger)
+
+    return loop_monitor
+
+def load_timers(logger : Logger) -> TIMER_HEAP : 
+
+    timers : TIMER_HEAP = TIMER_HEAP(logger = logger)
+
+    return timers
+
+def load_history_writer(config : dict , redis_client : Redis , logger : Logger) -> HISTORY_WRITER : 
+
+    history_writer : HISTORY_WRITER = HISTORY_WRITER(config = config , redis_client = redis_client , logger = logger)
 
-    return connection_manger
\ No newline at end of file
+    return history_writer
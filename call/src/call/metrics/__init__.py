@@ -0,0 +1,2 @@
+from .loop_ import * 
+from .speculation_ import * 
\ No newline at end of file
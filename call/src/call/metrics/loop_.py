@@ -0,0 +1,78 @@
+import time
+import asyncio
+
+from logging import Logger
+
+class LOOP_MONITOR :
+    '''
+    Measures event-loop stall time for the worker.
+
+    A background task sleeps for a fixed interval and records how late it was
+    woken up. Any lag is time during which no other coroutine could run , i.e.
+    audio routing , barge-in and TTS for every call on the worker were frozen.
+
+    Args:
+        - config (dict): Monitor configuration
+            - interval (float): Seconds between probes.
+            - stall-threshold-ms (float): Lag above which a probe counts as a stall and is logged.
+        - logger (Logger): Logger used to report stalls.
+    '''
+
+    def __init__(self , config : dict , logger : Logger) -> None :
+
+        self.interval : float = config['interval']
+        self.stall_threshold_ms : float = config['stall-threshold-ms']
+        self.logger : Logger = logger
+
+        self.task : asyncio.Task | None = None
+
+        self.probes : int = 0
+        self.stalls : int = 0
+        self.total_stall_ms : float = 0.0
+        self.max_lag_ms : float = 0.0
+        self.last_lag_ms : float = 0.0
+
+    async def run(self) -> None :
+
+        while True :
+
+            expected : float = time.perf_counter() + self.interval
+
+            await asyncio.sleep(self.interval)
+
+            lag_ms : float = max(time.perf_counter() - expected , 0.0) * 1000
+
+            self.probes += 1
+            self.last_lag_ms = lag_ms
+            self.max_lag_ms = max(self.max_lag_ms , lag_ms)
+
+            if lag_ms >= self.stall_threshold_ms :
+
+                self.stalls += 1
+                self.total_stall_ms += lag_ms
+
+                self.logger.warning(f'Event loop stalled for {lag_ms:.1f} ms')
+
+    def start(self) -> None :
+
+        if self.task is None or self.task.done() : self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None :
+
+        if self.task is None : return
+
+        self.task.cancel()
+
+        await asyncio.gather(self.task , return_exceptions = True)
+
+        self.task = None
+
+    def snapshot(self) -> dict :
+
+        return {
+            'probes' : self.probes ,
+            'stalls' : self.stalls ,
+            'total_stall_ms' : round(self.total_stall_ms , 3) ,
+            'max_lag_ms' : round(self.max_lag_ms , 3) ,
+            'last_lag_ms' : round(self.last_lag_ms , 3)
+        }
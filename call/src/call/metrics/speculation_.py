@@ -0,0 +1,28 @@
+class SPECULATION_STATS :
+    '''
+    Worker-wide counters for speculative agent turns.
+
+    - started : speculative turns launched on a short pause
+    - hits : the final transcript matched and the speculative reply was used
+    - misses : the final transcript differed and the speculative turn was dropped
+    - cancelled : dropped before the end of utterance (caller resumed , call ended)
+    '''
+
+    def __init__(self) -> None :
+
+        self.started : int = 0
+        self.hits : int = 0
+        self.misses : int = 0
+        self.cancelled : int = 0
+
+    def snapshot(self) -> dict :
+
+        resolved : int = self.hits + self.misses
+
+        return {
+            'started' : self.started ,
+            'hits' : self.hits ,
+            'misses' : self.misses ,
+            'cancelled' : self.cancelled ,
+            'hit_rate' : round(self.hits / resolved , 4) if resolved else None
+        }
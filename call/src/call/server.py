@@ -18,8 +18,9 @@ load_dotenv()
 
 
 from .state import AppState 
+from .metrics import SPECULATION_STATS
 
-from .services import env_str_to_bool , env_str_to_list
+from .services import env_str_to_bool , env_str_to_list , warm_tts_cache
 
 state : AppState = AppState()
 
@@ -32,7 +33,11 @@ async def lifespan(app : FastAPI) :
         tts_client , 
         plivo_client , 
         connection_manager , 
-        redis_client
+        redis_client , 
+        http_client , 
+        loop_monitor , 
+        timers , 
+        history_writer
     ) = load_clients()
 
     state.config = config 
@@ -41,9 +46,36 @@ async def lifespan(app : FastAPI) :
     state.plivo_client = plivo_client 
     state.connection_manager = connection_manager
     state.redis_client = redis_client
+    state.http_client = http_client
+    state.loop_monitor = loop_monitor
+    state.timers = timers
+    state.history_writer = history_writer
+    state.speculation_stats = SPECULATION_STATS()
+
+    state.loop_monitor.start()
+    state.connection_manager.start()
+    state.history_writer.start()
+
+    # in the background , calls that start before it is done just miss the cache
+    tts_warmup : asyncio.Task = asyncio.create_task(
+        warm_tts_cache(
+            tts_client = state.tts_client , 
+            http_client = state.http_client , 
+            config = state.config['session'] , 
+            logger = state.logger
+        )
+    )
 
     yield
 
+    tts_warmup.cancel()
+
+    await state.connection_manager.stop()
+    await state.history_writer.stop()
+    await state.redis_client.aclose()
+    await state.loop_monitor.stop()
+    await state.http_client.aclose()
+
 app : FastAPI = FastAPI(lifespan = lifespan)
 
 app.add_middleware(
@@ -57,6 +89,16 @@ app.add_middleware(
 @app.get('/health')
 async def health_check() : return {'status' : 'ok'}
 
+@app.get('/metrics')
+async def metrics() : return {
+    'event_loop' : state.loop_monitor.snapshot() , 
+    'speculation' : state.speculation_stats.snapshot() , 
+    'stt_pool' : state.connection_manager.stt_pool.snapshot() , 
+    'tts_cache' : state.tts_client.snapshot() if hasattr(state.tts_client , 'snapshot') else None , 
+    'timers' : state.timers.snapshot() , 
+    'history' : state.history_writer.snapshot()
+}
+
 
 @app.post('/answer' , tags = ['webhook'])
 async def answer(request : Request) : 
@@ -142,8 +184,11 @@ async def inbound(websocket : WebSocket , call_uuid : str) -> None :
         stream_id = await state.connection_manager.get_stream_id(call_uuid = call_uuid) , 
         connection_manager = state.connection_manager , 
         call_uuid = call_uuid , 
-        redis_client = state.redis_client , 
-        plivo_client = state.plivo_client
+        history_writer = state.history_writer , 
+        plivo_client = state.plivo_client , 
+        http_client = state.http_client , 
+        speculation_stats = state.speculation_stats , 
+        timers = state.timers
     )
 
     try : 
@@ -3,7 +3,9 @@ import base64
 
 import numpy as np 
 
-from typing import Tuple
+from typing import Tuple , Any
+from logging import Logger
+from httpx import AsyncClient , HTTPError
 from numpy import ndarray
 from asyncio import Queue
 from fastapi import Request
@@ -11,6 +13,8 @@ from fastapi import WebSocket
 
 from starlette.datastructures import FormData
 
+from ..session.services import speakable_clauses
+
 async def process_hook(hook) -> str : 
 
     if hook['type'] == 'websocket.receive' : 
@@ -109,3 +113,37 @@ def env_str_to_bool(
 
     if not value : value = default
     return _parse_bool(value)
+
+async def warm_tts_cache(
+    tts_client : Any , 
+    http_client : AsyncClient , 
+    config : dict , 
+    logger : Logger
+) -> None : 
+    '''
+    Pre-synthesize what every call says : the greeting , the inactivity reminder and
+    the agent's fixed replies , split the same way `run_tts` will receive them.
+
+    Args:
+        - tts_client (Any): TTS client , skipped unless it has a `warm` method.
+        - http_client (AsyncClient): Shared HTTP client.
+        - config (dict): Session configuration.
+        - logger (Logger): Logger.
+    '''
+
+    if not hasattr(tts_client , 'warm') : return
+
+    texts : list[str] = [config['greeting'] , config['inactivity-message']]
+
+    try : 
+
+        response = await http_client.get(config['agent-prompts-url'])
+        response.raise_for_status()
+
+        for prompt in response.json()['prompts'] : texts.extend(speakable_clauses(prompt , config = config['streaming']))
+
+    except (HTTPError , KeyError , ValueError) as e : logger.warning(f'Could not fetch agent prompts for the TTS cache : {e!r}')
+
+    counts : dict = await tts_client.warm(texts)
+
+    logger.info(f'TTS cache warmed : {counts}')
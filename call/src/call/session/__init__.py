@@ -1 +1,3 @@
-from .session import * 
\ No newline at end of file
+from .session import * 
+from .services import * 
+from .pacer_ import * 
\ No newline at end of file
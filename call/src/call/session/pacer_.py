@@ -0,0 +1,175 @@
+import json
+import time
+import base64
+import asyncio
+
+from typing import Awaitable , Callable
+
+class AUDIO_PACER :
+    '''
+    Outbound audio scheduler for one call.
+
+    TTS audio is re-chunked into fixed `frame-ms` frames and each frame is sent
+    only when the caller's playback is less than `lead-ms` behind it , so Plivo
+    gets a steady stream of equal frames instead of vendor sized bursts and a
+    clearAudio never has more than `lead-ms` of audio to throw away.
+
+    The playback clock assumes frames play back to back from the moment they are
+    sent and that playback stalls when the buffer runs dry , which lets the pacer
+    tell how many ms the caller actually heard when the utterance is interrupted.
+
+    Args:
+        - config (dict): Pacing configuration
+            - frame-ms (int): Duration of every playAudio frame.
+            - lead-ms (int): How far ahead of playback the sender may run.
+            - sample-rate (int): Outbound sample rate.
+            - bytes-per-sample (int): 1 for mu-law , 2 for linear16.
+        - play_audio (dict): Session `play-audio` configuration (event , contentType , sampleRate).
+        - send (Callable): Coroutine sending one text websocket message.
+    '''
+
+    def __init__(self , config : dict , play_audio : dict , send : Callable[[str] , Awaitable[None]]) -> None :
+
+        self.config : dict = config
+        self.play_audio : dict = play_audio
+        self.send : Callable[[str] , Awaitable[None]] = send
+
+        self.frame_ms : int = config['frame-ms']
+        self.lead_ms : int = config['lead-ms']
+
+        self.bytes_per_ms : float = config['sample-rate'] * config['bytes-per-sample'] / 1000
+        self.frame_bytes : int = int(self.frame_ms * self.bytes_per_ms)
+
+        self.buffer : bytearray = bytearray()
+
+        self.frames_sent : int = 0
+        self.underruns : int = 0
+
+        self.start()
+
+    def start(self) -> None :
+        '''
+        Reset the clock and the transcript marks for a new utterance.
+        '''
+
+        self.buffer.clear()
+
+        self.sent_ms : float = 0.0
+        self.queued_ms : float = 0.0
+        self.play_end_time : float = 0.0
+
+        # (start ms , end ms , text) of every clause in the utterance
+        self.marks : list[list] = []
+
+        self.interrupted : bool = False
+        self.interrupted_at_ms : float = 0.0
+
+    @property
+    def played_ms(self) -> float :
+        '''
+        Audio of the current utterance the caller has heard so far.
+        '''
+
+        return max(0.0 , self.sent_ms - max(0.0 , self.play_end_time - time.monotonic()) * 1000)
+
+    def begin_clause(self , text : str) -> None : self.marks.append([self.queued_ms , self.queued_ms , text])
+
+    async def play(self , audio : bytes) -> bool :
+        '''
+        Queue audio and send every complete frame that is due. Waits while the
+        sender is `lead-ms` ahead of playback , which holds back the TTS stream.
+
+        Returns False once the utterance was interrupted.
+        '''
+
+        if self.interrupted : return False
+
+        self.buffer += audio
+        self.queued_ms += len(audio) / self.bytes_per_ms
+
+        if self.marks : self.marks[-1][1] = self.queued_ms
+
+        while len(self.buffer) >= self.frame_bytes and not self.interrupted : await self._send_frame(self.frame_bytes)
+
+        return not self.interrupted
+
+    async def flush(self) -> None :
+        '''
+        Send the last , possibly short , frame of the utterance.
+        '''
+
+        if self.buffer and not self.interrupted : await self._send_frame(len(self.buffer))
+
+    async def _send_frame(self , size : int) -> None :
+
+        ahead_ms : float = self.sent_ms - self.played_ms - self.lead_ms
+
+        if ahead_ms > 0 :
+
+            await asyncio.sleep(ahead_ms / 1000)
+
+            if self.interrupted : return
+
+        frame : bytes = bytes(self.buffer[: size])
+        del self.buffer[: size]
+
+        frame_ms : float = size / self.bytes_per_ms
+        now : float = time.monotonic()
+
+        if self.sent_ms and self.play_end_time < now : self.underruns += 1
+
+        self.play_end_time = max(self.play_end_time , now) + frame_ms / 1000
+        self.sent_ms += frame_ms
+
+        await self.send(
+            json.dumps(
+                {
+                    'event' : self.play_audio['event'] ,
+                    'media' : {
+                        'contentType' : self.play_audio['contentType'] ,
+                        'sampleRate' : self.play_audio['sampleRate'] ,
+                        'payload' : base64.b64encode(frame).decode('utf-8')
+                    }
+                }
+            )
+        )
+
+        self.frames_sent += 1
+
+    def heard_text(self , played_ms : float) -> str :
+        '''
+        Text of the clauses heard up to `played_ms` , the clause playing at that
+        point is cut proportionally by words.
+        '''
+
+        heard : list[str] = []
+
+        for start_ms , end_ms , text in self.marks :
+
+            if played_ms >= end_ms : heard.append(text) ; continue
+
+            if played_ms > start_ms :
+
+                words : list[str] = text.split()
+                heard.append(' '.join(words[: int(len(words) * (played_ms - start_ms) / (end_ms - start_ms))]))
+
+            break
+
+        return ' '.join(part for part in heard if part)
+
+    def interrupt(self) -> tuple[float , str] :
+        '''
+        Stop the current utterance , drop what was not sent and return the ms and text the caller heard.
+        '''
+
+        played_ms : float = self.played_ms
+
+        self.interrupted = True
+        self.interrupted_at_ms = played_ms
+        self.buffer.clear()
+
+        # nothing queued at Plivo any more once clearAudio goes out
+        self.sent_ms = played_ms
+        self.play_end_time = 0.0
+
+        return played_ms , self.heard_text(played_ms)
@@ -0,0 +1,110 @@
+import re
+
+class CLAUSE_SPLITTER :
+    '''
+    Cuts a stream of LLM tokens into speakable sentence / clause chunks.
+
+    A chunk is released at a sentence terminator , or at a clause mark once it
+    holds at least `min-clause-chars` characters. The first chunk may be cut
+    at a clause mark earlier (`first-clause-chars`) so audio starts as soon as
+    possible , and anything longer than `max-clause-chars` is cut at the last space.
+
+    Args:
+        - config (dict): Splitter configuration
+            - first-clause-chars (int)
+            - min-clause-chars (int)
+            - max-clause-chars (int)
+    '''
+
+    sentence_end : re.Pattern = re.compile(r'[.!?।]+["\')\]]*\s')
+    clause_end : re.Pattern = re.compile(r'[,;:—]\s')
+
+    def __init__(self , config : dict) -> None :
+
+        self.first_clause_chars : int = config['first-clause-chars']
+        self.min_clause_chars : int = config['min-clause-chars']
+        self.max_clause_chars : int = config['max-clause-chars']
+
+        self.buffer : str = ''
+        self.emitted : int = 0
+
+    def _cut(self) -> int :
+
+        sentence_match = self.sentence_end.search(self.buffer)
+
+        if sentence_match : return sentence_match.end()
+
+        min_chars : int = self.first_clause_chars if self.emitted == 0 else self.min_clause_chars
+
+        for clause_match in self.clause_end.finditer(self.buffer) :
+
+            if clause_match.end() >= min_chars : return clause_match.end()
+
+        if len(self.buffer) >= self.max_clause_chars :
+
+            space : int = self.buffer.rfind(' ' , 0 , self.max_clause_chars)
+
+            return space + 1 if space > 0 else self.max_clause_chars
+
+        return 0
+
+    def feed(self , text : str) -> list[str] :
+
+        self.buffer += text
+
+        clauses : list[str] = []
+
+        while (cut := self._cut()) :
+
+            clause : str = self.buffer[: cut].strip()
+            self.buffer = self.buffer[cut :]
+
+            if clause :
+
+                clauses.append(clause)
+                self.emitted += 1
+
+        return clauses
+
+    def flush(self) -> list[str] :
+
+        clause : str = self.buffer.strip()
+        self.buffer = ''
+
+        if clause :
+
+            self.emitted += 1
+
+            return [clause]
+
+        return []
+
+def normalize_transcript(text : str) -> str :
+    '''
+    Case / whitespace / punctuation insensitive form used to match a speculative query with the final transcript.
+    '''
+
+    return ' '.join(re.sub(r'[^\w\s]' , ' ' , text.lower()).split())
+
+def spoken_form(text : str) -> str :
+    '''
+    Pronunciation fixes applied to agent replies before they reach TTS.
+    '''
+
+    return text.replace('Hons' , 'Honors').replace('hons' , 'Honors')
+
+def speakable_clauses(text : str , config : dict) -> list[str] :
+    '''
+    The exact strings `run_tts` synthesizes for an agent reply , used to pre-warm the TTS cache.
+
+    Args:
+        - text (str): Agent reply.
+        - config (dict): Session `streaming` configuration.
+    '''
+
+    if not config['enabled'] : return [spoken_form(text)]
+
+    # replies that are known up front arrive as a single delta
+    splitter : CLAUSE_SPLITTER = CLAUSE_SPLITTER(config = config)
+
+    return [spoken_form(clause) for clause in splitter.feed(text) + splitter.flush()]
@@ -1,31 +1,36 @@
-import os
 import time
 import json
+import base64
 import asyncio
-import requests
 import traceback
 
+from contextlib import aclosing
+
 from uuid import uuid4
 from typing import Any
-from redis import Redis
 from queue import Empty
 from logging import Logger
-from threading import Thread
 from plivo import RestClient
 from fastapi import WebSocket
-from requests import Response 
-from deepgram import DeepgramClient
+from httpx import AsyncClient , HTTPError , Response , Timeout
 
-from asyncio import Queue , Task, create_task, sleep
+from asyncio import Queue , Task, create_task
 
 from deepgram.core.events import EventType
 
-from deepgram.extensions.types.sockets import ListenV1ControlMessage , ListenV1ResultsEvent
+from deepgram.extensions.types.sockets import ListenV1ResultsEvent
 
 from deepgram.extensions.types.sockets.listen_v1_results_event import ListenV1Alternative , ListenV1Channel
 
 from ..event import START_EVENT , MEDIA_EVENT , PLAYED_EVENT , CLEAR_EVENT
-from ..connection import ConnectionManager
+from ..connection import ConnectionManager , STT_STREAM
+from ..loader import load_vad
+from ..vad import VAD
+from ..metrics import SPECULATION_STATS
+from ..timers import TIMER , TIMER_HEAP
+from ..history import HISTORY_WRITER
+from .services import CLAUSE_SPLITTER , normalize_transcript , spoken_form
+from .pacer_ import AUDIO_PACER
 
 class SESSION : 
 
@@ -39,14 +44,22 @@ class SESSION :
         stream_id : str , 
         connection_manager : ConnectionManager , 
         call_uuid : str ,
-        redis_client : Redis ,
-        plivo_client : RestClient
+        history_writer : HISTORY_WRITER ,
+        plivo_client : RestClient , 
+        http_client : AsyncClient , 
+        speculation_stats : SPECULATION_STATS , 
+        timers : TIMER_HEAP
     ) : 
 
         self.workflow : str = workflow
         self.config : dict = config
         self.tts_client : Any = tts_client
         self.plivo_client : RestClient = plivo_client
+        self.http_client : AsyncClient = http_client
+        self.agent_timeout : Timeout = Timeout(**self.config['agent-timeout'])
+
+        self.speculation_stats : SPECULATION_STATS = speculation_stats
+        self.speculative_turn : dict | None = None
 
         self.user_audio_input : bytes = bytes()
 
@@ -57,6 +70,12 @@ class SESSION :
         self.websocket_object : WebSocket = websocket_object
         self.stream_id : str = stream_id
 
+        self.pacer : AUDIO_PACER = AUDIO_PACER(
+            config = self.config['playback'] , 
+            play_audio = self.config['play-audio'] , 
+            send = self.websocket_object.send_text
+        )
+
         self.session_id : str = str(uuid4())
 
         self.logger : Logger = logger
@@ -70,23 +89,29 @@ class SESSION :
 
         self.transcription : str = ''
 
+        self.vad : VAD = load_vad(config = self.config['vad'])
+
         self.connection_manager = connection_manager
 
         self.call_uuid : str = call_uuid
 
         self.tasks : list[Task] = []
 
-        self.deepgram_client = DeepgramClient(api_key = os.environ['DEEPGRAM_API_KEY'])
-
-        self.redis_client : Redis = redis_client
+        self.history_writer : HISTORY_WRITER = history_writer
         self.history_key : str = f"livehistory:{self.call_uuid}"
         self.hangup_status : bool = False
 
         self.last_transcription_time : float = time.time()
         self.inactivity_timeout : float = 20.0
-        self.inactivity_message : str = "Hello, I didn't hear you for long, do you have any questions?"
+        self.inactivity_message : str = self.config['inactivity-message']
         self.inactivity_counter : int = 0
 
+        # deadlines live in the worker's shared timer heap instead of a polling task per call
+        self.timers : TIMER_HEAP = timers
+        self.inactivity_timer : TIMER = self.timers.timer(callback = self.on_inactivity)
+        self.hangup_timer : TIMER = self.timers.timer(callback = self.hangup)
+        self.hung_up : bool = False
+
         self.is_connected : bool = True
 
     async def receiver_task(self) : 
@@ -129,14 +154,14 @@ class SESSION :
                                     event_obj = PLAYED_EVENT(**textual_data_dict) 
 
                                     self.tts_speaking = False
-                                    self.last_transcription_time = time.time()
+                                    self.touch()
 
                                     self.barge_in_enabled = True
                                     self.logger.info(f"Barge-in re-enabled after short response ({self.last_response_word_count} words)")
 
                                     if self.hangup_status : 
 
-                                        self.plivo_client.calls.hangup(call_uuid = self.call_uuid)
+                                        await self.hangup()
 
                                 elif textual_data_dict['event'] == 'clearedAudio' : 
 
@@ -185,100 +210,93 @@ class SESSION :
 
             self.is_connected = False
 
-    async def inactivity_monitor_task(self) : 
+    def touch(self) -> None : 
+        '''
+        Caller or bot activity , pushes the inactivity deadline back.
+        '''
 
-        while self.is_connected : 
+        self.last_transcription_time = time.time()
 
-            try : 
+        self.timers.rearm(self.inactivity_timer , delay = self.inactivity_timeout)
 
-                await asyncio.sleep(1)
-
-                if not self.is_connected : 
-                    break
+    async def on_inactivity(self) -> None : 
 
-                time_since_last_transcription = time.time() - self.last_transcription_time
+        if not self.is_connected : return
 
-                if time_since_last_transcription >= self.inactivity_timeout and not self.tts_speaking:
+        # playback end re-arms it anyway , this only covers a lost playedStream
+        if self.tts_speaking : self.touch() ; return
 
-                    self.logger.info(f"Inactivity detected for {time_since_last_transcription:.1f}s. Sending reminder.")
+        self.logger.info(f"Inactivity detected for {time.time() - self.last_transcription_time:.1f}s. Sending reminder.")
 
-                    await self.tts_queue.put(self.inactivity_message)
+        await self.tts_queue.put(self.inactivity_message)
 
-                    self.inactivity_counter += 1 
+        self.inactivity_counter += 1 
 
-                    if self.inactivity_counter >= 3 : 
-                        self.hangup_status = True
-                        print('Hangup True')
+        if self.inactivity_counter >= 3 : 
+            self.hangup_status = True
+            print('Hangup True')
 
-                    self.last_transcription_time = time.time()
+        self.touch()
 
-            except asyncio.CancelledError : 
-                break
+    async def hangup(self) -> None : 
 
-            except Exception as e : 
+        if self.hung_up or not self.is_connected : return
 
-                self.logger.error(f"Error in inactivity monitor task: {e}")
+        self.hung_up = True
+        self.timers.cancel(self.hangup_timer)
 
-                traceback.print_exc()
+        await asyncio.to_thread(self.plivo_client.calls.hangup , call_uuid = self.call_uuid)
 
     async def vad_task(self) : 
 
-        await self.tts_queue.put('Hello !!, This is Riya, JECRC University AI Admission Counsellor, may I please know your name and which course you are interested in ?')  
-
-        self.loop = asyncio.get_running_loop()
-        
-        connection = self.connection_manager.get_stt_connection(call_uuid = self.call_uuid)
+        await self.tts_queue.put(self.config['greeting'])
 
-        try:
-            with connection as connection : 
+        connection : STT_STREAM = self.connection_manager.get_stt_connection(call_uuid = self.call_uuid)
 
-                create_task(
-                    self._send_keepalive(connection)
-                )
+        def on_message(message : ListenV1ResultsEvent) -> None : 
 
-                def on_message(message : ListenV1ResultsEvent) -> None : 
-                    if self.barge_in_enabled : 
+            if self.barge_in_enabled : 
 
-                        if message.type == 'Results' : 
+                if message.type == 'Results' : 
 
-                            channel_index : list[int] = message.channel_index
-                            duration : float = message.duration
-                            start : float = message.start 
-                            is_final : bool | None = message.is_final 
-                            speech_final : bool | None = message.speech_final
-                            channel : ListenV1Channel = message.channel
+                    channel_index : list[int] = message.channel_index
+                    duration : float = message.duration
+                    start : float = message.start 
+                    is_final : bool | None = message.is_final 
+                    speech_final : bool | None = message.speech_final
+                    channel : ListenV1Channel = message.channel
 
-                            alternatives : list[ListenV1Alternative] = channel.alternatives
+                    alternatives : list[ListenV1Alternative] = channel.alternatives
 
-                            first_alternative : ListenV1Alternative = alternatives[0]
+                    first_alternative : ListenV1Alternative = alternatives[0]
 
-                            transcript : str = first_alternative.transcript
+                    transcript : str = first_alternative.transcript
 
-                            print(f'Transcription ---------------> : {transcript}')
+                    print(f'Transcription ---------------> : {transcript}')
 
-                            if len(transcript.strip()) > 0 : 
+                    if len(transcript.strip()) > 0 : 
 
-                                # Update the last transcription time whenever we receive valid transcription
-                                self.last_transcription_time = time.time()
+                        # Push the inactivity deadline back whenever we receive valid transcription
+                        self.touch()
 
-                                if self.tts_speaking and self.barge_in_enabled : 
+                        if self.tts_speaking and self.barge_in_enabled : 
 
-                                    print(f"Deepgram detected speech: '{transcript}'. Stopping AI.")
+                            print(f"Deepgram detected speech: '{transcript}'. Stopping AI.")
 
-                                    asyncio.run_coroutine_threadsafe(self.stop_audio() , self.loop)
+                            # off the listener task , stop_audio may end up closing this stream
+                            create_task(self.stop_audio())
 
-                            self.transcription += transcript
-                    else : 
-                        self.logger.warning('Dropping speech as barge-in is disabled')
-                connection.on(EventType.OPEN , lambda _ : print("Connection opened"))
-                connection.on(EventType.MESSAGE , on_message)
-                connection.on(EventType.CLOSE , lambda _ : print("Connection closed"))
-                connection.on(EventType.ERROR , lambda error : print(f"Error: {error}"))
+                    self.transcription += transcript
+            else : 
+                self.logger.warning('Dropping speech as barge-in is disabled')
 
-                def start_listening() : connection.start_listening()
+        connection.on(EventType.OPEN , lambda _ : print("Connection opened"))
+        connection.on(EventType.MESSAGE , on_message)
+        connection.on(EventType.CLOSE , lambda _ : print("Connection closed"))
+        connection.on(EventType.ERROR , lambda error : print(f"Error: {error}"))
 
-                listen_thread = Thread(target = start_listening)
-                listen_thread.start()
+        try:
+            async with connection : 
 
                 try : 
 
@@ -292,11 +310,13 @@ class SESSION :
                             if not self.is_connected:
                                 break
 
-                            connection.send_media(data.audio_bytes)
-                            if data.possiblity : 
+                            await connection.send_media(data.audio_bytes)
+
+                            if self.vad(data.audio_nd_array) : 
 
                                 self.user_speaking = True 
-                                self.silence_packet_counter = 0 
+
+                                if self.speculative_turn : self.cancel_speculation()
                                 
                                 print('\rListening...' , end = '\n' , flush = True)
 
@@ -304,20 +324,21 @@ class SESSION :
 
                                 if len(self.transcription) > 3 : 
                                     
-                                    self.silence_packet_counter += 1
-                                    
-                                    print(f'\rSilence packet received ({self.silence_packet_counter})' , end = '' , flush = True)
+                                    print(f'\rSilence received ({self.vad.silence_ms:.0f} ms)' , end = '' , flush = True)
                                     
-                                    if self.silence_packet_counter >= self.config['settings']['max-continous-interruption'] : 
+                                    if self.vad.end_of_utterance : 
 
                                         await self.llm_queue.put(self.transcription)
                                         self.transcription = ''
                                         self.user_audio_input = bytes()
-                                        self.silence_packet_counter = 0 
+
+                                    elif self.should_speculate() : 
+
+                                        self.start_speculation(query = self.transcription)
 
                                     else : 
 
-                                        print(f'\rListening... for Silence {self.silence_packet_counter}' , end = '' , flush = True)
+                                        print(f'\rListening... for Silence {self.vad.silence_ms:.0f} ms' , end = '' , flush = True)
                                 
                                 else : print(f'\rBuffer too short, ignoring silence. Length: {len(self.user_audio_input)}' , end = '' , flush = True)
 
@@ -330,13 +351,9 @@ class SESSION :
 
                 except Exception as e : 
                     self.logger.error(f"Fatal error in VAD task for session {self.session_id}: {e}")
-                finally:
-                    # Close Deepgram connection when VAD task ends
-                    try:
-                        connection.finish()
-                        self.logger.info("Deepgram connection closed")
-                    except Exception as e:
-                        self.logger.error(f"Error closing Deepgram connection: {e}")
+
+            # Deepgram connection is closed when the `async with` block exits
+            self.logger.info("Deepgram connection closed")
                         
         except Exception as e:
             self.logger.error(f"Error in VAD task connection: {e}")
@@ -347,25 +364,20 @@ class SESSION :
                 self.is_connected = False
                 await self.disconnect()
 
-    async def add_to_history(self, role: str, content: str):
+    def add_to_history(self , role : str , content : str) -> None :
+        '''
+        Queue a turn for the worker's history writer , it reaches Redis in the next batch.
+        '''
 
-        try:
-            message = {
-                'role': role,
-                'content': content,
-                'timestamp': time.time()
-            }
-            
-            # Add to Redis list
-            self.redis_client.rpush(self.history_key, json.dumps(message))
-            
-            # Optional: Set expiry on the key (e.g., 24 hours)
-            self.redis_client.expire(self.history_key, 86400)
-            
-            self.logger.info(f"Added to history [{role}]: {content}...")
-            
-        except Exception as e:
-            self.logger.error(f"Error adding to history: {e}")
+        message : dict = {
+            'role' : role ,
+            'content' : content ,
+            'timestamp' : time.time()
+        }
+
+        self.history_writer.append(self.history_key , json.dumps(message))
+
+        self.logger.info(f"Added to history [{role}]: {content}...")
 
     async def run_llm(self) : 
 
@@ -380,99 +392,332 @@ class SESSION :
                     break
 
                 # Add user message to history
-                await self.add_to_history('user', query)
+                self.add_to_history('user', query)
 
                 start_time : float = time.time()
 
-                response : str = await self.run_ag(query = query)
+                speculative_turn : dict | None = self.take_speculation(query = query)
+
+                if speculative_turn : 
+
+                    response : str = await self.use_speculation(turn = speculative_turn)
+
+                elif self.config['streaming']['enabled'] : 
+
+                    reply : Queue = Queue()
+
+                    # hand the reply to TTS right away , clauses are spoken while the agent is still generating
+                    await self.tts_queue.put(reply)
+
+                    response : str = await self.run_ag_stream(query = query , reply = reply)
+
+                else : 
+
+                    response : str = await self.run_ag(query = query)
+
+                    await self.tts_queue.put(response)
 
                 print(f'-------------> LLM : {time.time() - start_time}')
 
                 print(f'----------------------------> {response}')
 
-                await self.tts_queue.put(response)
-
             except asyncio.CancelledError:
                 break
             except Exception as e : 
                 self.logger.error(f"Error in LLM task for session {self.session_id}: {e} : {traceback.format_exc()}")
 
-    async def run_ag(self , query : str) -> str : 
+    def agent_payload(self , query : str , turn : dict | None) -> dict : 
 
-        response : Response = requests.post(
-            url = self.config['agent-url'] , 
-            json = {
-                'message' : query , 
-                'user_id' : self.session_id
-            }
-        )
+        payload : dict = {
+            'message' : query , 
+            'user_id' : self.session_id
+        }
+
+        if turn : payload['turn_id'] = turn['turn_id']
+
+        return payload
+
+    def apply_hangup(self , hangup : bool , turn : dict | None = None) -> None : 
+
+        # speculative turns keep their outcome until they are confirmed
+        if turn is not None : 
+            turn['hangup'] = hangup
+            return
+
+        self.hangup_status = hangup
+        if self.hangup_status : 
+            self.barge_in_enabled = False
+
+    async def run_ag(self , query : str , turn : dict | None = None) -> str : 
+
+        try : 
+
+            response : Response = await self.http_client.post(
+                url = self.config['agent-url'] , 
+                json = self.agent_payload(query = query , turn = turn) , 
+                timeout = self.agent_timeout
+            )
+
+        except HTTPError as e : 
+
+            self.logger.error(f"Agent request failed for session {self.session_id}: {e!r}")
+
+            return 'Sorry we were unable to process your resquest'
 
         if response.status_code == 200 : 
-            if 'response' in response.json() : 
-                self.hangup_status = response.json()['hangup']
-                if self.hangup_status : 
-                    self.barge_in_enabled = False
+
+            response_json : dict = response.json()
+
+            if 'response' in response_json : 
+                self.apply_hangup(hangup = response_json['hangup'] , turn = turn)
 
                 print(self.hangup_status , self.barge_in_enabled)
-                llm_response = response.json()['response'].replace('Hons' , 'Honors').replace('hons' , 'Honors')
+                llm_response = spoken_form(response_json['response'])
 
                 return llm_response
 
         return 'Sorry we were unable to process your resquest'
 
+    async def run_ag_stream(self , query : str , reply : Queue , turn : dict | None = None) -> str : 
+        '''
+        Stream the agent reply from `/chat/stream` , pushing each speakable clause
+        onto `reply` as soon as it is complete. A `None` sentinel ends the reply.
+        '''
+
+        splitter : CLAUSE_SPLITTER = CLAUSE_SPLITTER(config = self.config['streaming'])
+        response : str = ''
+
+        try : 
+
+            async with self.http_client.stream(
+                'POST' , 
+                url = self.config['agent-stream-url'] , 
+                json = self.agent_payload(query = query , turn = turn) , 
+                timeout = self.agent_timeout
+            ) as stream : 
+
+                stream.raise_for_status()
+
+                async for line in stream.aiter_lines() : 
+
+                    if not line : continue
+
+                    event : dict = json.loads(line)
+
+                    if event['type'] == 'delta' : 
+
+                        for clause in splitter.feed(event['text']) : 
+                            await reply.put(spoken_form(clause))
+
+                    elif event['type'] == 'done' : 
+
+                        response = event['response']
+
+                        self.apply_hangup(hangup = event['hangup'] , turn = turn)
+
+            for clause in splitter.flush() : 
+                await reply.put(spoken_form(clause))
+
+        except (HTTPError , json.JSONDecodeError , KeyError) as e : 
+
+            self.logger.error(f"Agent stream failed for session {self.session_id}: {e!r}")
+
+            if splitter.emitted == 0 : 
+
+                response = 'Sorry we were unable to process your resquest'
+                await reply.put(response)
+
+        finally : 
+
+            await reply.put(None)
+
+        return response
+
+    def should_speculate(self) -> bool : 
+
+        if not self.config['speculation']['enabled'] : return False
+        if self.vad.silence_ms < self.config['speculation']['pause-ms'] : return False
+
+        # a late final transcript during the pause makes the running speculation stale
+        return self.speculative_turn is None or self.speculative_turn['source'] != self.transcription
+
+    def start_speculation(self , query : str) -> None : 
+        '''
+        Start the agent turn on the transcript seen at a short pause , before
+        the end of utterance is confirmed. The agent only stages its state for
+        this turn until it is committed.
+        '''
+
+        self.cancel_speculation()
+
+        turn : dict = {
+            'source' : query , 
+            'query' : normalize_transcript(query) , 
+            'turn_id' : str(uuid4()) , 
+            'hangup' : False , 
+            'reply' : Queue() if self.config['streaming']['enabled'] else None
+        }
+
+        if turn['reply'] is not None : 
+            turn['task'] = create_task(self.run_ag_stream(query = query , reply = turn['reply'] , turn = turn))
+        else : 
+            turn['task'] = create_task(self.run_ag(query = query , turn = turn))
+
+        self.speculative_turn = turn
+        self.speculation_stats.started += 1
+
+        self.logger.info(f'Speculative turn started for session {self.session_id} after {self.vad.silence_ms:.0f} ms pause')
+
+    def cancel_speculation(self) -> None : 
+
+        turn : dict | None = self.speculative_turn
+        self.speculative_turn = None
+
+        if turn is None : return
+
+        turn['task'].cancel()
+        self.speculation_stats.cancelled += 1
+
+    def take_speculation(self , query : str) -> dict | None : 
+        '''
+        Return the speculative turn if it was started on the same transcript as
+        the final `query` , otherwise drop it.
+        '''
+
+        turn : dict | None = self.speculative_turn
+        self.speculative_turn = None
+
+        if turn is None : return None
+
+        if turn['query'] == normalize_transcript(query) : 
+
+            self.speculation_stats.hits += 1
+            self.logger.info(f'Speculative turn hit for session {self.session_id}')
+
+            return turn
+
+        turn['task'].cancel()
+
+        self.speculation_stats.misses += 1
+        self.logger.info(f'Speculative turn missed for session {self.session_id}')
+
+        return None
+
+    async def use_speculation(self , turn : dict) -> str : 
+
+        if turn['reply'] is not None : 
+
+            await self.tts_queue.put(turn['reply'])
+
+            response : str = await turn['task']
+
+        else : 
+
+            response : str = await turn['task']
+
+            await self.tts_queue.put(response)
+
+        self.apply_hangup(hangup = turn['hangup'])
+
+        try : 
+
+            await self.http_client.post(
+                url = self.config['agent-commit-url'] , 
+                json = {
+                    'user_id' : self.session_id , 
+                    'turn_id' : turn['turn_id']
+                } , 
+                timeout = self.agent_timeout
+            )
+
+        except HTTPError as e : 
+
+            self.logger.error(f"Committing speculative turn failed for session {self.session_id}: {e!r}")
+
+        return response
+
+    async def iter_clauses(self , speaking : str | Queue) : 
+        '''
+        A plain string is a single utterance , a Queue is a streamed reply of clauses ending with None.
+        '''
+
+        if isinstance(speaking , str) : 
+
+            yield speaking
+
+            return
+
+        while (clause := await speaking.get()) is not None : yield clause
+
+    def set_barge_in(self , word_count : int) -> None : 
+
+        if word_count <= 30 : 
+
+            self.barge_in_enabled = False
+            self.logger.info(f"Barge-in disabled for short response ({word_count} words)")
+
+        else : 
+
+            if self.hangup_status : 
+                    self.barge_in_enabled = False 
+                    self.logger.info(f'Barge in disabled as final hangup')
+
+            else : 
+                self.barge_in_enabled = True
+                self.logger.info(f"Barge-in enabled for response ({word_count} words)")
+
     async def run_tts(self) : 
 
         while self.is_connected: 
 
             try : 
 
-                speaking_text : str = await self.tts_queue.get()
+                speaking : str | Queue = await self.tts_queue.get()
 
                 if not self.is_connected : 
                     break
 
-                await self.add_to_history('assistant' , speaking_text)
+                spoken : list[str] = []
+                word_count : int = 0
 
-                word_count = len(speaking_text.split())
-                self.last_response_word_count = word_count
-                
-                if word_count <= 30 : 
+                self.pacer.start()
 
-                    self.barge_in_enabled = False
-                    self.logger.info(f"Barge-in disabled for short response ({word_count} words)")
+                async for clause in self.iter_clauses(speaking) : 
 
-                else : 
+                    if not self.is_connected or self.pacer.interrupted : 
+                        break
 
-                    if self.hangup_status : 
-                            self.barge_in_enabled = False 
-                            self.logger.info(f'Barge in disabled as final hangup')
+                    spoken.append(clause)
 
-                    else : 
-                        self.barge_in_enabled = True
-                        self.logger.info(f"Barge-in enabled for response ({word_count} words)")
+                    word_count += len(clause.split())
+                    self.last_response_word_count = word_count
 
-                # start_time : float = time.time()
+                    self.set_barge_in(word_count = word_count)
 
-                async for chunk in self.tts_client(speaking_text) : 
+                    self.pacer.begin_clause(clause)
 
-                    if not self.is_connected : 
-                        break
+                    # closed as soon as we stop reading , so an interrupted synthesis releases its stream
+                    async with aclosing(self.tts_client(clause)) as chunks : 
 
-                    await self.websocket_object.send_text(
+                        async for chunk in chunks : 
 
-                        json.dumps(
-                            {
-                                'event' : self.config['play-audio']['event'] , 
-                                'media' : {
-                                    'contentType' : self.config['play-audio']['contentType'] , 
-                                    'sampleRate' : self.config['play-audio']['sampleRate'] , 
-                                    'payload' : chunk
-                                }
-                            }
-                        )
-                    )
+                            if not self.is_connected : 
+                                break
+
+                            self.tts_speaking = True
+
+                            # re-chunked into fixed frames and paced against playback
+                            if not await self.pacer.play(base64.b64decode(chunk)) : 
+                                break
 
-                    self.tts_speaking = True
+                await self.pacer.flush()
+
+                if self.pacer.interrupted : 
+
+                    # only what the caller actually heard goes into the history
+                    self.add_to_history('assistant' , self.pacer.heard_text(self.pacer.interrupted_at_ms))
+
+                else : self.add_to_history('assistant' , ' '.join(spoken))
 
                 if self.is_connected : 
 
@@ -485,7 +730,13 @@ class SESSION :
                         })
                     )
 
-                self.last_transcription_time = time.time()
+                    # hang up even if the playedStream for the last line never arrives
+                    if self.hangup_status : self.timers.rearm(
+                        self.hangup_timer , 
+                        delay = max(0.0 , self.pacer.play_end_time - time.monotonic()) + self.config['hangup-grace-ms'] / 1000
+                    )
+
+                self.touch()
 
             except asyncio.CancelledError : 
                 break
@@ -513,7 +764,8 @@ class SESSION :
         self.tasks.append(asyncio.create_task(self.receiver_task()))
         self.tasks.append(asyncio.create_task(self.router_task()))
         self.tasks.append(asyncio.create_task(self.vad_task()))
-        self.tasks.append(asyncio.create_task(self.inactivity_monitor_task()))  # Add the new task
+
+        self.touch()
 
     async def _flush_queue(self, queue: Queue):
 
@@ -536,6 +788,11 @@ class SESSION :
 
         self.logger.info(f"Disconnecting session {self.session_id}. Cancelling background tasks.")
 
+        self.cancel_speculation()
+
+        self.timers.cancel(self.inactivity_timer)
+        self.timers.cancel(self.hangup_timer)
+
         # Cancel all running tasks
         for task in self.tasks:
             if not task.done() : 
@@ -544,6 +801,9 @@ class SESSION :
         # Wait for all tasks to complete
         await asyncio.gather(*self.tasks , return_exceptions = True)
 
+        # closes the STT stream if the VAD task never got to it and forgets the call
+        await self.connection_manager.close_connection(call_uuid = self.call_uuid)
+
         self.logger.info("Flushing all queues.")
 
         # Flush all queues
@@ -572,6 +832,11 @@ class SESSION :
         if not self.is_connected:
             return
 
+        # stop feeding frames first , then drop what Plivo still has queued
+        played_ms , heard = self.pacer.interrupt()
+
+        self.logger.info(f'Barge-in after {played_ms:.0f} ms of playback , caller heard : {heard!r}')
+
         try:
             await self.websocket_object.send_text(
                 data = json.dumps(
@@ -591,10 +856,3 @@ class SESSION :
             if self.is_connected:
                 self.is_connected = False
                 await self.disconnect()
-
-    async def _send_keepalive(self , connection) : 
-
-        await sleep(5)
-        connection.send_control(ListenV1ControlMessage(type = 'KeepAlive'))
-
-        self.logger.info('Keep Alive Message sent')
\ No newline at end of file
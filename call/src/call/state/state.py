@@ -1,9 +1,13 @@
 from logging import Logger
 from typing import Any
 
-from redis import Redis
+from redis.asyncio import Redis
+from httpx import AsyncClient
 from plivo import RestClient
 from ..connection import ConnectionManager
+from ..metrics import LOOP_MONITOR , SPECULATION_STATS
+from ..timers import TIMER_HEAP
+from ..history import HISTORY_WRITER
 
 class AppState : 
 
@@ -16,4 +20,14 @@ class AppState :
 
     connection_manager : ConnectionManager
 
-    redis_client : Redis 
\ No newline at end of file
+    redis_client : Redis
+
+    http_client : AsyncClient
+
+    loop_monitor : LOOP_MONITOR
+
+    speculation_stats : SPECULATION_STATS
+
+    timers : TIMER_HEAP
+
+    history_writer : HISTORY_WRITER
@@ -0,0 +1 @@
+from .timer_ import * 
\ No newline at end of file
@@ -0,0 +1,166 @@
+import heapq
+import asyncio
+import inspect
+
+from logging import Logger
+from typing import Any , Callable
+from asyncio import AbstractEventLoop , Task , TimerHandle
+
+class TIMER :
+    '''
+    A re-armable deadline owned by a TIMER_HEAP.
+
+    Re-arming only moves `deadline` ; the heap entry is corrected lazily when it
+    comes up , so pushing a deadline back on every transcript costs O(1).
+    '''
+
+    __slots__ = ('callback' , 'deadline' , 'queued_at' , 'active')
+
+    def __init__(self , callback : Callable[[] , Any]) -> None :
+
+        self.callback : Callable[[] , Any] = callback
+
+        self.deadline : float = 0.0
+        self.queued_at : float | None = None
+        self.active : bool = False
+
+class TIMER_HEAP :
+    '''
+    Per-worker scheduler for session deadlines (inactivity , hangup after
+    playback , STT keepalive).
+
+    All deadlines live in one heap and a single loop callback is armed for the
+    earliest one , so the worker only wakes up when a deadline actually expires
+    instead of every session polling on its own. Callbacks may be plain functions
+    or coroutine functions , the latter run as tasks.
+
+    Args:
+        - logger (Logger): Logger.
+    '''
+
+    def __init__(self , logger : Logger) -> None :
+
+        self.logger : Logger = logger
+
+        self.heap : list[tuple[float , int , TIMER]] = []
+        self.sequence : int = 0
+
+        self.loop : AbstractEventLoop | None = None
+        self.handle : TimerHandle | None = None
+        self.handle_at : float | None = None
+
+        self.background : set[Task] = set()
+
+        self.armed : int = 0
+        self.fired : int = 0
+        self.wakeups : int = 0
+
+    def timer(self , callback : Callable[[] , Any]) -> TIMER : return TIMER(callback = callback)
+
+    def schedule(self , delay : float , callback : Callable[[] , Any]) -> TIMER :
+
+        timer : TIMER = self.timer(callback = callback)
+
+        self.rearm(timer , delay = delay)
+
+        return timer
+
+    def rearm(self , timer : TIMER , delay : float) -> None :
+        '''
+        (Re)start `timer` so it fires `delay` seconds from now.
+        '''
+
+        if self.loop is None : self.loop = asyncio.get_running_loop()
+
+        if not timer.active : self.armed += 1
+
+        timer.deadline = self.loop.time() + delay
+        timer.active = True
+
+        # a later deadline keeps the current entry and is pushed back when it surfaces
+        if timer.queued_at is None or timer.deadline < timer.queued_at : self._push(timer)
+
+    def cancel(self , timer : TIMER | None) -> None :
+
+        if timer is not None and timer.active :
+
+            timer.active = False
+            self.armed -= 1
+
+    def _push(self , timer : TIMER) -> None :
+
+        timer.queued_at = timer.deadline
+
+        self.sequence += 1
+        heapq.heappush(self.heap , (timer.deadline , self.sequence , timer))
+
+        if self.handle_at is None or timer.deadline < self.handle_at : self._arm(timer.deadline)
+
+    def _arm(self , when : float) -> None :
+
+        if self.handle is not None : self.handle.cancel()
+
+        self.handle = self.loop.call_at(when , self._expire)
+        self.handle_at = when
+
+    def _expire(self) -> None :
+
+        self.handle = None
+        self.handle_at = None
+        self.wakeups += 1
+
+        now : float = self.loop.time()
+
+        while self.heap and self.heap[0][0] <= now :
+
+            queued_at , _ , timer = heapq.heappop(self.heap)
+
+            # superseded by an earlier push
+            if timer.queued_at != queued_at : continue
+
+            timer.queued_at = None
+
+            if not timer.active : continue
+
+            if timer.deadline > now :
+
+                self._push(timer)
+                continue
+
+            timer.active = False
+            self.armed -= 1
+            self.fired += 1
+
+            self._fire(timer)
+
+        if self.heap and (self.handle_at is None or self.heap[0][0] < self.handle_at) : self._arm(self.heap[0][0])
+
+    def _fire(self , timer : TIMER) -> None :
+
+        try :
+
+            result : Any = timer.callback()
+
+            if inspect.isawaitable(result) :
+
+                task : Task = asyncio.ensure_future(result)
+
+                self.background.add(task)
+                task.add_done_callback(self._done)
+
+        except Exception as e : self.logger.error(f'Timer callback failed : {e!r}')
+
+    def _done(self , task : Task) -> None :
+
+        self.background.discard(task)
+
+        if not task.cancelled() and task.exception() is not None : self.logger.error(f'Timer callback failed : {task.exception()!r}')
+
+    def snapshot(self) -> dict :
+
+        return {
+            'armed' : self.armed ,
+            'heap_size' : len(self.heap) ,
+            'fired' : self.fired ,
+            'wakeups' : self.wakeups
+        }
@@ -0,0 +1,4 @@
+from .vad import * 
+from .variance_ import * 
+from .energy_ import * 
+from .spectral_ import * 
\ No newline at end of file
@@ -0,0 +1,67 @@
+import numpy as np
+
+from numpy import ndarray
+
+from .vad import VAD , frame_std
+
+class ENERGY_VAD(VAD) :
+    '''
+    Energy + zero-crossing VAD with an adaptive noise floor.
+
+    The noise floor is tracked on non-speech frames for the whole call (fast
+    down , slow up) and the speech thresholds are ratios over it , with a lower
+    ratio once speech has started so trailing syllables do not cause false
+    endpoints. Frames with a very high zero-crossing rate (hiss , fricative-like
+    noise) only count as speech when they are clearly loud.
+
+    Config:
+        - start-ratio (float): Energy over noise floor needed to enter speech.
+        - stop-ratio (float): Energy over noise floor needed to stay in speech.
+        - min-energy (float): Absolute normalised energy below which a frame is never speech.
+        - min-noise-floor (float): Lower bound on the noise floor estimate.
+        - noise-attack (float): Adaptation rate when the floor rises.
+        - noise-release (float): Adaptation rate when the floor falls.
+        - max-zcr (float): Zero-crossing rate (per sample) above which a frame is treated as noise.
+    '''
+
+    def __init__(self , config : dict) -> None :
+
+        super().__init__(config = config)
+
+        self.start_ratio : float = config['start-ratio']
+        self.stop_ratio : float = config['stop-ratio']
+        self.min_energy : float = config['min-energy']
+        self.min_noise_floor : float = config['min-noise-floor']
+        self.noise_attack : float = config['noise-attack']
+        self.noise_release : float = config['noise-release']
+        self.max_zcr : float = config['max-zcr']
+
+        self.noise_floor : float | None = None
+
+    def detect(self , samples : ndarray) -> bool :
+
+        energy : float = frame_std(samples)
+
+        if self.noise_floor is None : self.noise_floor = max(energy , self.min_noise_floor)
+
+        threshold : float = max(
+            self.noise_floor * (self.stop_ratio if self.speaking else self.start_ratio) ,
+            self.min_energy
+        )
+
+        active : bool = energy >= threshold
+
+        if active and energy < 2 * threshold :
+
+            signs : ndarray = np.signbit(samples)
+            zero_crossing_rate : float = np.count_nonzero(signs[1 :] != signs[: -1]) / samples.shape[0]
+
+            active = zero_crossing_rate <= self.max_zcr
+
+        if not active :
+
+            rate : float = self.noise_attack if energy > self.noise_floor else self.noise_release
+
+            self.noise_floor = max(self.noise_floor + rate * (energy - self.noise_floor) , self.min_noise_floor)
+
+        return active
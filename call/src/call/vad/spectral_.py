@@ -0,0 +1,83 @@
+import numpy as np
+
+from numpy import ndarray , float32
+
+from .vad import VAD , frame_std
+
+class SPECTRAL_FLUX_VAD(VAD) :
+    '''
+    Spectral VAD using band-limited SNR against a per-bin noise spectrum plus spectral flux.
+
+    The noise spectrum is learnt from non-speech frames across the call. A frame
+    is speech when its SNR in the speech band clears the start (or , once
+    speaking , the lower stop) threshold , or when a sharp positive spectral flux
+    marks an onset while the SNR is already above the stop threshold.
+
+    Config:
+        - band-hz (list[float]): Low / high edge of the speech band.
+        - start-snr-db (float): Band SNR needed to enter speech.
+        - stop-snr-db (float): Band SNR needed to stay in speech.
+        - flux-threshold (float): Normalised positive spectral flux counted as an onset.
+        - noise-adapt (float): Adaptation rate of the noise spectrum.
+        - min-energy (float): Absolute normalised frame energy below which a frame is never speech.
+    '''
+
+    def __init__(self , config : dict) -> None :
+
+        super().__init__(config = config)
+
+        self.band_hz : list[float] = config['band-hz']
+        self.start_snr_db : float = config['start-snr-db']
+        self.stop_snr_db : float = config['stop-snr-db']
+        self.flux_threshold : float = config['flux-threshold']
+        self.noise_adapt : float = config['noise-adapt']
+        self.min_energy : float = config['min-energy']
+
+        self.frame_length : int = 0
+        self.window : ndarray | None = None
+        self.band : slice = slice(0 , 0)
+
+        self.noise_spectrum : ndarray | None = None
+        self.previous_spectrum : ndarray | None = None
+
+    def _prepare(self , frame_length : int) -> None :
+
+        self.frame_length = frame_length
+        self.window = np.hanning(frame_length).astype(float32) / 32768.0
+
+        frequencies : ndarray = np.fft.rfftfreq(frame_length , d = 1 / self.sample_rate)
+        low , high = np.searchsorted(frequencies , self.band_hz)
+
+        self.band = slice(int(low) , int(high))
+
+        self.noise_spectrum = None
+        self.previous_spectrum = None
+
+    def detect(self , samples : ndarray) -> bool :
+
+        if samples.shape[0] != self.frame_length : self._prepare(samples.shape[0])
+
+        spectrum : ndarray = np.abs(np.fft.rfft(samples * self.window))[self.band]
+        power : float = float(np.dot(spectrum , spectrum))
+
+        if self.noise_spectrum is None :
+
+            self.noise_spectrum = spectrum
+            self.previous_spectrum = spectrum
+
+            return False
+
+        noise_power : float = float(np.dot(self.noise_spectrum , self.noise_spectrum)) + 1e-12
+        snr_db : float = 10 * np.log10(power / noise_power + 1e-12)
+
+        flux : float = float(np.maximum(spectrum - self.previous_spectrum , 0).sum() / (self.previous_spectrum.sum() + 1e-12))
+
+        self.previous_spectrum = spectrum
+
+        if frame_std(samples) < self.min_energy : active = False
+        elif snr_db >= (self.stop_snr_db if self.speaking else self.start_snr_db) : active = True
+        else : active = flux >= self.flux_threshold and snr_db >= self.stop_snr_db
+
+        if not active : self.noise_spectrum = self.noise_spectrum + self.noise_adapt * (spectrum - self.noise_spectrum)
+
+        return active
@@ -0,0 +1,121 @@
+import math
+
+import numpy as np
+
+from numpy import ndarray , int32 , int64
+
+class FRAME_BUFFER :
+    '''
+    Reusable scratch space for per-frame energy computation.
+
+    Frames are processed synchronously on the event loop, so a single buffer
+    per worker is enough ; it only grows when a longer frame shows up.
+    '''
+
+    __slots__ = ('squares' ,)
+
+    def __init__(self , size : int = 320) -> None :
+
+        self.squares : ndarray = np.empty(size , dtype = int32)
+
+    def get(self , size : int) -> ndarray :
+
+        if self.squares.shape[0] < size : self.squares = np.empty(size , dtype = int32)
+
+        return self.squares[: size]
+
+_frame_buffer : FRAME_BUFFER = FRAME_BUFFER()
+
+def frame_std(samples : ndarray) -> float :
+    '''
+    Standard deviation of an int16 frame , normalised to the (-1 , 1) range.
+
+    Computed from exact integer sums so no float copy of the frame is built.
+    '''
+
+    num_samples : int = samples.shape[0]
+
+    if num_samples == 0 : return 0.0
+
+    squares : ndarray = np.square(samples , out = _frame_buffer.get(num_samples) , dtype = int32)
+
+    sum_samples : int = int(samples.sum(dtype = int64))
+    sum_squares : int = int(squares.sum(dtype = int64))
+
+    # n^2 * var in int16 units
+    scaled_variance : int = num_samples * sum_squares - sum_samples * sum_samples
+
+    return math.sqrt(scaled_variance) / (num_samples * 32768.0)
+
+class VAD :
+    '''
+    Base class for streaming, per-session Voice Activity Detection.
+
+    Backends only implement `detect`, a raw per-frame speech decision that may
+    keep its own state (noise floor , previous spectrum , ...). This class adds
+    hysteresis on top of it and tracks how long the caller has been silent so
+    the session can decide when an utterance has ended.
+
+    Args:
+        - config (dict): Backend configuration , the timing keys are
+            - sample-rate (int): Sample rate of the inbound audio.
+            - onset-ms (float): Speech must last this long before the state flips to speaking.
+            - hangover-ms (float): Silence must last this long before the state flips back.
+            - end-of-utterance-ms (float): Silence after speech that ends the utterance.
+    '''
+
+    def __init__(self , config : dict) -> None :
+
+        self.config : dict = config
+
+        self.sample_rate : int = config['sample-rate']
+        self.onset_ms : float = config.get('onset-ms' , 0)
+        self.hangover_ms : float = config.get('hangover-ms' , 0)
+        self.end_of_utterance_ms : float = config['end-of-utterance-ms']
+
+        self.reset()
+
+    def reset(self) -> None :
+
+        self.speaking : bool = False
+
+        self.speech_run_ms : float = 0.0
+        self.silence_run_ms : float = 0.0
+        self.silence_ms : float = 0.0
+
+    def detect(self , samples : ndarray) -> bool :
+        '''
+        Raw speech decision for a single int16 frame , implemented by the backends.
+        '''
+
+        raise NotImplementedError
+
+    def __call__(self , samples : ndarray) -> bool :
+        '''
+        Feed one int16 frame and return whether the caller is currently speaking.
+        '''
+
+        if samples.shape[0] == 0 : return self.speaking
+
+        frame_ms : float = samples.shape[0] * 1000 / self.sample_rate
+
+        if self.detect(samples) :
+
+            self.speech_run_ms += frame_ms
+            self.silence_run_ms = 0.0
+
+            if not self.speaking and self.speech_run_ms >= self.onset_ms : self.speaking = True
+
+        else :
+
+            self.silence_run_ms += frame_ms
+            self.speech_run_ms = 0.0
+
+            if self.speaking and self.silence_run_ms > self.hangover_ms : self.speaking = False
+
+        self.silence_ms = 0.0 if self.speaking else max(self.silence_ms + frame_ms , self.silence_run_ms)
+
+        return self.speaking
+
+    @property
+    def end_of_utterance(self) -> bool : return self.silence_ms >= self.end_of_utterance_ms
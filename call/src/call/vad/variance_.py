@@ -0,0 +1,19 @@
+from numpy import ndarray
+
+from .vad import VAD , frame_std
+
+class VARIANCE_VAD(VAD) :
+    '''
+    Stateless fixed-threshold gate , the behaviour MEDIA_EVENT.find_variance used to have.
+
+    Config:
+        - threshold (float): Normalised frame standard deviation above which a frame is speech.
+    '''
+
+    def __init__(self , config : dict) -> None :
+
+        super().__init__(config = config)
+
+        self.threshold : float = config['threshold']
+
+    def detect(self , samples : ndarray) -> bool : return frame_std(samples) >= self.threshold
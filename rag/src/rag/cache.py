@@ -0,0 +1,123 @@
+import threading
+import unicodedata
+from collections import OrderedDict, deque
+
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    """Case, unicode and whitespace normalised query, trailing punctuation dropped."""
+    text = unicodedata.normalize("NFKC", query).lower()
+    return " ".join(text.split()).strip(" ?.!,")
+
+
+def percentile(values, q: float):
+    if not values:
+        return None
+    return round(float(np.percentile(np.fromiter(values, dtype=np.float64), q)), 3)
+
+
+class QueryCache:
+    """
+    Two-level cache of /search results.
+
+    Level one is an exact-match LRU keyed on the normalised query and top_k, it
+    is checked before the query is embedded. Level two keeps the embeddings of
+    recent queries in one matrix; a new query whose embedding is within
+    `threshold` cosine similarity of a cached one reuses its results, so
+    paraphrases ("btech cse fees" / "fees for btech cse") skip the vector search.
+
+    Every ingest bumps the generation and drops both levels; results computed
+    against an older generation are never stored.
+    """
+
+    def __init__(self, max_entries: int = 1024, semantic_entries: int = 512, threshold: float = 0.95, latency_window: int = 2048):
+        self.max_entries = max_entries
+        self.semantic_entries = semantic_entries
+        self.threshold = threshold
+
+        self.lock = threading.Lock()
+        self.generation = 0
+
+        self.exact = OrderedDict()
+
+        # ring buffer of unit query embeddings, allocated on the first store
+        self.vectors = None
+        self.semantic = [None] * semantic_entries
+        self.next_slot = 0
+
+        self.hits = {"exact": 0, "semantic": 0, "miss": 0}
+        self.latencies = {outcome: deque(maxlen=latency_window) for outcome in self.hits}
+        self.invalidations = 0
+
+    def get_exact(self, query: str, top_k: int):
+        key = (normalize_query(query), top_k)
+        with self.lock:
+            results = self.exact.get(key)
+            if results is not None:
+                self.exact.move_to_end(key)
+            return results
+
+    def get_similar(self, embedding: np.ndarray, top_k: int):
+        """Results of the closest cached query if it is within the threshold and has enough results."""
+        query = embedding / (np.linalg.norm(embedding) or 1.0)
+        with self.lock:
+            if self.vectors is None:
+                return None
+            similarities = self.vectors @ query
+            best = int(np.argmax(similarities))
+            entry = self.semantic[best]
+            if entry is None or similarities[best] < self.threshold or entry[0] < top_k:
+                return None
+            return entry[1][:top_k]
+
+    def store(self, query: str, top_k: int, embedding: np.ndarray, results: list, generation: int):
+        with self.lock:
+            # an ingest ran while this search was in flight
+            if generation != self.generation:
+                return
+
+            self.exact[(normalize_query(query), top_k)] = results
+            self.exact.move_to_end((normalize_query(query), top_k))
+            while len(self.exact) > self.max_entries:
+                self.exact.popitem(last=False)
+
+            if self.vectors is None:
+                self.vectors = np.zeros((self.semantic_entries, embedding.shape[-1]), dtype=np.float32)
+            self.vectors[self.next_slot] = embedding / (np.linalg.norm(embedding) or 1.0)
+            self.semantic[self.next_slot] = (top_k, results)
+            self.next_slot = (self.next_slot + 1) % self.semantic_entries
+
+    def invalidate(self):
+        """Drop both levels, called whenever the collection changes."""
+        with self.lock:
+            self.generation += 1
+            self.invalidations += 1
+            self.exact.clear()
+            self.vectors = None
+            self.semantic = [None] * self.semantic_entries
+            self.next_slot = 0
+
+    def record(self, outcome: str, elapsed_ms: float):
+        with self.lock:
+            self.hits[outcome] += 1
+            self.latencies[outcome].append(elapsed_ms)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            lookups = sum(self.hits.values())
+            return {
+                "lookups": lookups,
+                "exact_hits": self.hits["exact"],
+                "semantic_hits": self.hits["semantic"],
+                "misses": self.hits["miss"],
+                "hit_rate": round((self.hits["exact"] + self.hits["semantic"]) / lookups, 4) if lookups else None,
+                "exact_entries": len(self.exact),
+                "semantic_entries": sum(entry is not None for entry in self.semantic),
+                "generation": self.generation,
+                "invalidations": self.invalidations,
+                "latency_ms": {
+                    outcome: {"p50": percentile(values, 50), "p95": percentile(values, 95)}
+                    for outcome, values in self.latencies.items()
+                }
+            }
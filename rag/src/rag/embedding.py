@@ -0,0 +1,147 @@
+import time
+import asyncio
+from collections import deque
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from .cache import percentile
+
+# quantized exports shipped in the all-MiniLM-L6-v2 repository
+ONNX_INT8_FILE = "onnx/model_quint8_avx2.onnx"
+
+
+def load_embedder(model_name: str, backend: str = "torch", onnx_file: str = None) -> SentenceTransformer:
+    """
+    SentenceTransformer on the requested backend.
+
+    `torch` is the default PyTorch model, `onnx` runs the exported ONNX graph on
+    onnxruntime and `onnx-int8` the dynamically quantized one (needs the `onnx`
+    extra). `onnx_file` overrides the ONNX file picked inside the model repository.
+    """
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    if backend not in ("onnx", "onnx-int8"):
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    file_name = onnx_file or (ONNX_INT8_FILE if backend == "onnx-int8" else None)
+    model_kwargs = {"file_name": file_name} if file_name else None
+    return SentenceTransformer(model_name, backend="onnx", model_kwargs=model_kwargs)
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching front of the query embedder.
+
+    Queries are queued with a future each; one worker task takes the first
+    waiting query, gathers whatever else arrives within `max_wait_ms` (up to
+    `max_batch`), encodes them in one forward pass on a worker thread and
+    resolves every future with its row. Queries that queue up while a batch is
+    encoding go out together in the next one, so concurrent callers share the
+    model instead of contending for it one query at a time, while a lone query
+    only pays the `max_wait_ms` window.
+    """
+
+    def __init__(self, encode, max_batch: int = 32, max_wait_ms: float = 2.0, latency_window: int = 2048):
+        self.encode = encode
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+
+        self.queue = None
+        self.worker = None
+
+        self.batches = 0
+        self.queries = 0
+        self.largest_batch = 0
+        self.failures = 0
+        self.wait_ms = deque(maxlen=latency_window)
+        self.encode_ms = deque(maxlen=latency_window)
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.worker = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.worker is None:
+            return
+        self.worker.cancel()
+        try:
+            await self.worker
+        except asyncio.CancelledError:
+            pass
+        self.worker = None
+
+        # nobody will encode what is still queued
+        while not self.queue.empty():
+            _, future, _ = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Embedding batcher stopped"))
+
+    async def embed(self, text: str) -> np.ndarray:
+        # no running worker (e.g. the app was started without its lifespan), encode inline
+        if self.worker is None:
+            return (await asyncio.to_thread(self.encode, [text]))[0]
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future, time.perf_counter()))
+        return await future
+
+    async def collect(self) -> list:
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def run(self):
+        while True:
+            batch = await self.collect()
+
+            # callers that gave up (request cancelled) are not encoded
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                embeddings = await asyncio.to_thread(self.encode, [text for text, _, _ in batch])
+            except Exception as e:
+                self.failures += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            for row, (_, future, queued_at) in zip(embeddings, batch):
+                self.wait_ms.append((start - queued_at) * 1000)
+                if not future.done():
+                    future.set_result(row)
+
+            self.batches += 1
+            self.queries += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            self.encode_ms.append(elapsed_ms)
+
+    def snapshot(self) -> dict:
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "mean_batch_size": round(self.queries / self.batches, 2) if self.batches else None,
+            "largest_batch": self.largest_batch,
+            "failures": self.failures,
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+            "queue_wait_ms": {"p50": percentile(self.wait_ms, 50), "p95": percentile(self.wait_ms, 95)},
+            "encode_ms": {"p50": percentile(self.encode_ms, 50), "p95": percentile(self.encode_ms, 95)}
+        }
@@ -0,0 +1,152 @@
+import re
+from statistics import median, mode
+
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTFigure, LTImage, LTTextContainer, LTTextLine
+
+from .rasterize import PdfPages
+
+WORD = re.compile(r"^[^\W_]{2,}$|^[\d.,%₹/-]+$")
+
+
+def text_lines(layout) -> list:
+    """Every text line of a page layout as (x0, y0, x1, y1, text), figures included."""
+    lines = []
+    for element in layout:
+        if isinstance(element, LTTextLine):
+            text = element.get_text().strip()
+            if text:
+                lines.append((element.x0, element.y0, element.x1, element.y1, text))
+        elif isinstance(element, (LTTextContainer, LTFigure)):
+            lines.extend(text_lines(element))
+    return lines
+
+
+def image_area(layout) -> float:
+    area = 0.0
+    for element in layout:
+        if isinstance(element, LTImage):
+            area += element.width * element.height
+        elif isinstance(element, LTFigure):
+            area += image_area(element)
+    return area
+
+
+def group_rows(lines: list) -> list:
+    """Lines sharing a baseline (within half a line height) as rows of cells, top to bottom, left to right."""
+    if not lines:
+        return []
+    tolerance = median(y1 - y0 for _, y0, _, y1, _ in lines) / 2
+
+    rows = []
+    for line in sorted(lines, key=lambda line: -(line[1] + line[3]) / 2):
+        center = (line[1] + line[3]) / 2
+        if rows and abs(rows[-1][0] - center) <= tolerance:
+            rows[-1][1].append(line)
+        else:
+            rows.append([center, [line]])
+
+    return [[cell[4] for cell in sorted(cells, key=lambda cell: cell[0])] for _, cells in rows]
+
+
+def rows_to_markdown(rows: list):
+    """
+    Markdown for the rows: runs of two or more multi-cell rows become a table,
+    the rest paragraphs. Returns the markdown, the table rows and the fraction
+    of table rows with the modal cell count of their table.
+    """
+    blocks, table = [], []
+    table_rows = consistent = 0
+
+    def flush():
+        nonlocal table_rows, consistent
+        if len(table) < 2:
+            blocks.extend(" ".join(row) for row in table)
+        else:
+            width = max(len(row) for row in table)
+            modal = mode(len(row) for row in table)
+            table_rows += len(table)
+            consistent += sum(len(row) == modal for row in table)
+            lines = [f"| {' | '.join(row + [''] * (width - len(row)))} |" for row in table]
+            lines.insert(1, f"| {' | '.join(['---'] * width)} |")
+            blocks.append("\n".join(lines))
+        table.clear()
+
+    for row in rows:
+        if len(row) > 1:
+            table.append(row)
+            continue
+        flush()
+        blocks.append(row[0])
+    flush()
+
+    return "\n\n".join(blocks), table_rows, (consistent / table_rows) if table_rows else 1.0
+
+
+def extract_text_layer(path: str, page: int):
+    """
+    Markdown of the embedded text layer of one PDF page and a quality estimate.
+
+    The score multiplies text density (non-space characters, saturating at 600),
+    the share of clean characters (no (cid:N) or replacement glyphs), the share of
+    word-like tokens, a penalty for the page area covered by images (text there
+    is invisible to this pass) and the cell-count consistency of detected tables.
+    Scanned pages score 0, digital pages with readable text and tables near 1.
+    """
+    try:
+        layout = next(extract_pages(path, page_numbers=[page - 1], laparams=LAParams()))
+    except Exception as e:
+        return "", {"score": 0.0, "error": str(e)}
+
+    lines = text_lines(layout)
+    markdown, table_rows, table_consistency = rows_to_markdown(group_rows(lines))
+
+    text = " ".join(line[4] for line in lines)
+    chars = sum(not c.isspace() for c in text)
+    garbage = (len(re.findall(r"\(cid:\d+\)", text)) * 6 + text.count("�")) / chars if chars else 1.0
+    tokens = text.split()
+    word_ratio = sum(bool(WORD.match(token.strip(".,:;()[]*\"'"))) for token in tokens) / len(tokens) if tokens else 0.0
+    page_area = layout.width * layout.height or 1.0
+    image_coverage = min(1.0, image_area(layout) / page_area)
+
+    score = (
+        min(1.0, chars / 600)
+        * max(0.0, 1.0 - garbage)
+        * word_ratio
+        * (1.0 - 0.6 * image_coverage)
+        * (0.5 + 0.5 * table_consistency)
+    )
+
+    return markdown, {
+        "score": round(score, 3),
+        "chars": chars,
+        "garbage_ratio": round(garbage, 3),
+        "word_ratio": round(word_ratio, 3),
+        "image_coverage": round(image_coverage, 3),
+        "table_rows": table_rows,
+        "table_consistency": round(table_consistency, 3)
+    }
+
+
+class PlannedPdfPages:
+    """
+    Pages of a PDF with the extraction strategy chosen per page.
+
+    `load(page)` first reads the page's embedded text layer locally; if its
+    quality score reaches `min_quality` the markdown is used as is
+    (`text_layer`), otherwise the page is rasterized for the vision model
+    (`vision`). Scanned and image-heavy pages keep going to the vision model,
+    digital-native ones never do.
+    """
+
+    def __init__(self, path: str, dpi: int = 200, jpeg_quality: int = 75, min_quality: float = 0.6):
+        self.path = path
+        self.min_quality = min_quality
+        self.raster = PdfPages(path, dpi=dpi, jpeg_quality=jpeg_quality)
+        self.count = self.raster.count
+
+    def load(self, page: int) -> dict:
+        markdown, quality = extract_text_layer(self.path, page)
+        if quality["score"] >= self.min_quality:
+            return {"strategy": "text_layer", "content": markdown, "quality": quality}
+        return {"strategy": "vision", "content": self.raster.load(page), "quality": quality}
@@ -0,0 +1,353 @@
+import os
+import json
+import fcntl
+import threading
+
+import numpy as np
+
+MANIFEST = "manifest.json"
+LOCK = "index.lock"
+
+
+class MmapVectorIndex:
+    """
+    Brute-force vector index over a memory-mapped embedding matrix.
+
+    All chunk embeddings live unit-normalised in one contiguous row-major file
+    (float32, or int8 with a float32 scale per row) next to a JSONL file of ids,
+    documents and metadata; a top-k query is a single matrix-vector product over
+    the mapped rows. For a corpus of a few thousand chunks that is well under a
+    millisecond and needs no HNSW graph or SQLite round trip.
+
+    `manifest.json` names the current generation and how many rows of it are
+    valid. Adding chunks appends rows to the generation's files and then swaps
+    the manifest, deleting rows compacts into a new generation. Readers stat the
+    manifest on every query and remap only when it changed, so every uvicorn
+    worker maps the same files and shares their pages through the OS page cache.
+    Writers serialise on a flock, so any worker can ingest.
+    """
+
+    def __init__(self, directory: str, dtype: str = "float32"):
+        if dtype not in ("float32", "int8"):
+            raise ValueError(f"Unsupported index dtype: {dtype}")
+
+        self.directory = directory
+        self.dtype = dtype
+        os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.manifest_mtime = None
+
+        self.generation = -1
+        self.count = 0
+        self.dim = None
+        self.vectors = None
+        self.scales = None
+        self.ids = []
+        self.texts = []
+        self.metadatas = []
+        self.rows_offset = 0
+
+        self.refresh()
+
+    # --------------------------------------------------------
+    # files
+    # --------------------------------------------------------
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def files(self, generation: int):
+        return (
+            self.path(f"vectors-{generation}.bin"),
+            self.path(f"scales-{generation}.bin"),
+            self.path(f"rows-{generation}.jsonl")
+        )
+
+    def read_manifest(self):
+        try:
+            with open(self.path(MANIFEST), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def write_manifest(self, manifest: dict):
+        tmp = self.path(MANIFEST + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path(MANIFEST))
+
+    def exclusive(self):
+        """Cross-process write lock, use as `with index.exclusive():`."""
+        return FileLock(self.path(LOCK))
+
+    # --------------------------------------------------------
+    # read side
+    # --------------------------------------------------------
+
+    def refresh(self):
+        """Remap if another writer (or process) changed the manifest since the last call."""
+        try:
+            stat = os.stat(self.path(MANIFEST))
+        except FileNotFoundError:
+            return
+        # the manifest is always replaced, so a new inode means a new version
+        mtime = (stat.st_ino, stat.st_mtime_ns)
+        if mtime == self.manifest_mtime:
+            return
+
+        with self.lock:
+            manifest = self.read_manifest()
+            if manifest is None:
+                return
+            try:
+                self.load(manifest)
+            except FileNotFoundError:
+                # compacted between reading the manifest and opening its files, pick it up next time
+                return
+            self.manifest_mtime = mtime
+
+    def load(self, manifest: dict):
+        if manifest["dtype"] != self.dtype:
+            raise ValueError(f"Index at {self.directory} is {manifest['dtype']}, not {self.dtype}")
+
+        vectors_path, scales_path, rows_path = self.files(manifest["generation"])
+
+        if manifest["generation"] != self.generation:
+            ids, texts, metadatas, offset = [], [], [], 0
+        else:
+            ids, texts, metadatas, offset = list(self.ids), list(self.texts), list(self.metadatas), self.rows_offset
+
+        # only the rows appended since the last load are parsed
+        with open(rows_path, "rb") as f:
+            f.seek(offset)
+            for line in f.read(manifest["rows_bytes"] - offset).splitlines():
+                row = json.loads(line)
+                ids.append(row["id"])
+                texts.append(row["text"])
+                metadatas.append(row["metadata"])
+
+        count, dim = manifest["count"], manifest["dim"]
+        vectors = scales = None
+        if count:
+            vectors = np.memmap(vectors_path, dtype=np.dtype(self.dtype), mode="r", shape=(count, dim))
+            if self.dtype == "int8":
+                scales = np.memmap(scales_path, dtype=np.float32, mode="r", shape=(count,))
+
+        self.generation = manifest["generation"]
+        self.count, self.dim = count, dim
+        self.vectors, self.scales = vectors, scales
+        self.ids, self.texts, self.metadatas = ids, texts, metadatas
+        self.rows_offset = manifest["rows_bytes"]
+
+    def search(self, embedding, top_k: int = 5) -> list:
+        """
+        `top_k` nearest rows as (id, cosine distance, document, metadata), closest
+        first, the same distances Chroma reports for a cosine collection.
+        """
+        self.refresh()
+
+        with self.lock:
+            vectors, scales, count = self.vectors, self.scales, self.count
+            ids, texts, metadatas = self.ids, self.texts, self.metadatas
+
+        if not count or top_k <= 0:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        scores = vectors @ query
+        if scales is not None:
+            scores = scores * scales
+
+        k = min(top_k, count)
+        best = np.argpartition(-scores, k - 1)[:k] if k < count else np.arange(count)
+        best = best[np.argsort(-scores[best])]
+
+        return [(ids[i], float(1.0 - scores[i]), texts[i], metadatas[i]) for i in best]
+
+    def __len__(self):
+        self.refresh()
+        return self.count
+
+    def snapshot(self) -> dict:
+        self.refresh()
+        with self.lock:
+            return {
+                "rows": self.count,
+                "dim": self.dim,
+                "dtype": self.dtype,
+                "generation": self.generation,
+                "mapped_bytes": int(self.vectors.nbytes) if self.vectors is not None else 0
+            }
+
+    # --------------------------------------------------------
+    # write side
+    # --------------------------------------------------------
+
+    def encode_rows(self, embeddings):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+        if self.dtype == "float32":
+            return np.ascontiguousarray(vectors), None
+
+        # symmetric per-row quantisation, score = (q @ query) * scale
+        scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127.0
+        quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    def add(self, ids: list, texts: list, metadatas: list, embeddings):
+        """Append rows to the current generation and publish them."""
+        if not len(ids):
+            return
+
+        vectors, scales = self.encode_rows(embeddings)
+
+        with self.exclusive():
+            self.append(ids, texts, metadatas, vectors, scales)
+
+        self.refresh()
+
+    def append(self, ids, texts, metadatas, vectors, scales):
+        """Append encoded rows to the current generation. Caller holds the lock."""
+        manifest = self.read_manifest()
+        if manifest is None or not manifest["count"]:
+            self.write_generation(manifest["generation"] + 1 if manifest else 0, ids, texts, metadatas, vectors, scales)
+            return
+
+        if manifest["dim"] != vectors.shape[1]:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {manifest['dim']}")
+
+        vectors_path, scales_path, rows_path = self.files(manifest["generation"])
+        # anything past the published rows is a torn append from a crashed writer
+        truncate_append(vectors_path, manifest["count"] * vectors.itemsize * manifest["dim"], vectors.tobytes())
+        if scales is not None:
+            truncate_append(scales_path, manifest["count"] * 4, scales.tobytes())
+        rows_bytes = truncate_append(rows_path, manifest["rows_bytes"], encode_jsonl(ids, texts, metadatas))
+
+        manifest.update(count=manifest["count"] + len(ids), rows_bytes=rows_bytes)
+        self.write_manifest(manifest)
+
+    def replace(self, ids: list, texts: list, metadatas: list, embeddings, delete=()) -> int:
+        """
+        Upsert rows and drop the `delete` ids in one step. Without overlap with
+        existing rows this is an append, otherwise the survivors and the new rows
+        are compacted into a new generation, so readers see either the old or
+        the new rows, never a mix. Returns the existing rows removed or overwritten.
+        """
+        drop = set(delete) | set(ids)
+        if not drop:
+            return 0
+
+        new_vectors, new_scales = self.encode_rows(embeddings) if len(ids) else (None, None)
+
+        with self.exclusive():
+            self.manifest_mtime = None
+            self.refresh()
+            keep = [i for i, row_id in enumerate(self.ids) if row_id not in drop]
+            removed = self.count - len(keep)
+
+            if not removed:
+                if len(ids):
+                    self.append(ids, texts, metadatas, new_vectors, new_scales)
+            else:
+                vectors = np.asarray(self.vectors[keep])
+                scales = np.asarray(self.scales[keep]) if self.scales is not None else None
+                if new_vectors is not None:
+                    vectors = np.concatenate([vectors, new_vectors])
+                    if scales is not None:
+                        scales = np.concatenate([scales, new_scales])
+                self.write_generation(
+                    self.generation + 1,
+                    [self.ids[i] for i in keep] + list(ids),
+                    [self.texts[i] for i in keep] + list(texts),
+                    [self.metadatas[i] for i in keep] + list(metadatas),
+                    vectors,
+                    scales
+                )
+
+        self.refresh()
+        return removed
+
+    def delete(self, ids) -> int:
+        """Drop rows by id, compacting the survivors into a new generation. Returns the rows removed."""
+        return self.replace([], [], [], None, delete=ids)
+
+    def rebuild(self, ids: list, texts: list, metadatas: list, embeddings):
+        """Replace the whole index with the given rows (e.g. a full export of the Chroma collection)."""
+        vectors, scales = self.encode_rows(embeddings) if len(ids) else (None, None)
+
+        with self.exclusive():
+            manifest = self.read_manifest()
+            self.write_generation(manifest["generation"] + 1 if manifest else 0, ids, texts, metadatas, vectors, scales)
+
+        self.refresh()
+
+    def write_generation(self, generation: int, ids, texts, metadatas, vectors, scales):
+        """Write a complete generation, publish it and remove the previous one. Caller holds the lock."""
+        previous = self.read_manifest()
+        vectors_path, scales_path, rows_path = self.files(generation)
+
+        write_file(vectors_path, vectors.tobytes() if vectors is not None else b"")
+        if self.dtype == "int8":
+            write_file(scales_path, scales.tobytes() if scales is not None else b"")
+        rows = encode_jsonl(ids, texts, metadatas)
+        write_file(rows_path, rows)
+
+        self.write_manifest({
+            "generation": generation,
+            "count": len(ids),
+            "dim": int(vectors.shape[1]) if vectors is not None else (previous or {}).get("dim"),
+            "dtype": self.dtype,
+            "rows_bytes": len(rows)
+        })
+
+        # processes still mapping the old files keep them alive until they remap
+        if previous is not None and previous["generation"] != generation:
+            for path in self.files(previous["generation"]):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+class FileLock:
+    def __init__(self, path: str):
+        self.path = path
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_CREAT | os.O_RDWR)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+
+
+def encode_jsonl(ids, texts, metadatas) -> bytes:
+    return b"".join(
+        (json.dumps({"id": i, "text": t, "metadata": m}, ensure_ascii=False) + "\n").encode("utf-8")
+        for i, t, m in zip(ids, texts, metadatas)
+    )
+
+
+def write_file(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def truncate_append(path: str, size: int, data: bytes) -> int:
+    """Cut `path` back to `size` bytes, append `data` and return the new size."""
+    with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+        f.truncate(size)
+        f.seek(size)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return size + len(data)
@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import uuid
+import fcntl
+import asyncio
+import traceback
+
+ACTIVE = ("queued", "running")
+
+
+class TokenBucket:
+    """
+    Async token bucket, `rate` tokens per second up to `capacity`.
+
+    Callers await `acquire()` before every rate-limited call; a burst of up to
+    `capacity` calls goes through at once and the rest are spaced at the
+    sustained rate, instead of sleeping a fixed interval after every call.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+        self.acquired = 0
+        self.waited = 0.0
+        self.paused = 0
+
+    async def acquire(self, tokens: float = 1.0):
+        # the lock keeps waiters in arrival order
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    self.acquired += 1
+                    return
+                delay = (tokens - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        """Hold every caller back for `seconds`, e.g. after the provider answered 429."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # waiters recompute their delay from the debt when they wake up
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+        self.paused += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "rate_per_s": self.rate,
+            "capacity": self.capacity,
+            "acquired": self.acquired,
+            "waited_s": round(self.waited, 3),
+            "paused": self.paused
+        }
+
+
+class IngestJobs:
+    """
+    Background ingestion jobs with per-page checkpoints.
+
+    Every job gets a directory under `directory` holding the uploaded file,
+    `job.json` (status and progress) and `pages.jsonl`, one line per finished
+    page. A job opens its source with `open_source(job)`, which returns an object
+    with `count` and a lazy `load(page)`, and runs up to `concurrency` pages at a
+    time through the async `process_page(job, page, payload)`; only the pages in
+    flight are ever loaded. Pages already in the checkpoint are skipped, so a job
+    interrupted by a crash or restart resumes where it stopped. Once every page
+    is done `finish(job, records)` stores the result.
+
+    Jobs are claimed with a flock on their directory, so with several workers
+    only one runs a job while any of them can report its progress from disk.
+    """
+
+    def __init__(self, directory: str, open_source, process_page, finish, concurrency: int = 4):
+        self.directory = directory
+        self.open_source = open_source
+        self.process_page = process_page
+        self.finish = finish
+        self.concurrency = concurrency
+        os.makedirs(directory, exist_ok=True)
+
+        self.tasks = {}
+
+    # --------------------------------------------------------
+    # job files
+    # --------------------------------------------------------
+
+    def path(self, job_id: str, name: str = "") -> str:
+        return os.path.join(self.directory, job_id, name)
+
+    def get(self, job_id: str):
+        try:
+            with open(self.path(job_id, "job.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, NotADirectoryError, json.JSONDecodeError):
+            return None
+
+    def save(self, job: dict):
+        job["updated_at"] = time.time()
+        tmp = self.path(job["id"], "job.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(job, f)
+        os.replace(tmp, self.path(job["id"], "job.json"))
+
+    def read_checkpoint(self, job_id: str) -> dict:
+        records = {}
+        try:
+            with open(self.path(job_id, "pages.jsonl"), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # torn last line from a crash, that page runs again
+                        continue
+                    records[record["page"]] = record
+        except FileNotFoundError:
+            pass
+        return records
+
+    def checkpoint(self, job_id: str, record: dict):
+        with open(self.path(job_id, "pages.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    # --------------------------------------------------------
+    # lifecycle
+    # --------------------------------------------------------
+
+    def create(self, filename: str, kind: str, source_path: str, **fields) -> dict:
+        """
+        Register a job for a file already written to `source_path` (moved into
+        the job directory). Extra `fields` are stored on the job for the callbacks.
+        """
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.path(job_id))
+        source = self.path(job_id, "source" + os.path.splitext(filename)[1].lower())
+        os.replace(source_path, source)
+
+        job = {
+            "id": job_id,
+            "filename": filename,
+            "kind": kind,
+            "source": source,
+            "status": "queued",
+            "total_pages": None,
+            "pages_done": 0,
+            "pages_resumed": 0,
+            "chunks": 0,
+            "error": None,
+            "result": None,
+            "created_at": time.time(),
+            **fields
+        }
+        self.save(job)
+        return job
+
+    def start(self, job_id: str) -> bool:
+        """Run the job in the background unless it is finished or another worker holds it."""
+        if job_id in self.tasks:
+            return False
+        job = self.get(job_id)
+        if job is None or job["status"] == "completed":
+            return False
+
+        fd = os.open(self.path(job_id, "job.lock"), os.O_CREAT | os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+
+        task = asyncio.create_task(self.run(job_id))
+        self.tasks[job_id] = task
+
+        def release(_):
+            self.tasks.pop(job_id, None)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+        task.add_done_callback(release)
+        return True
+
+    def resume(self) -> list:
+        """Restart every job left queued or running by a previous process."""
+        resumed = []
+        for job_id in sorted(os.listdir(self.directory)):
+            job = self.get(job_id)
+            if job is not None and job["status"] in ACTIVE and self.start(job_id):
+                resumed.append(job_id)
+        return resumed
+
+    async def stop(self):
+        # cancelled jobs stay `running` on disk and are resumed on the next start
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self, job_id: str):
+        job = self.get(job_id)
+        job.update(status="running", error=None)
+        self.save(job)
+
+        try:
+            source = await asyncio.to_thread(self.open_source, job)
+            records = self.read_checkpoint(job_id)
+            pending = iter([page for page in range(1, source.count + 1) if page not in records])
+
+            job.update(
+                total_pages=source.count,
+                pages_done=len(records),
+                pages_resumed=len(records),
+                chunks=sum(len(record["chunks"]) for record in records.values())
+            )
+            self.save(job)
+
+            async def worker():
+                # the iterator is shared, every worker takes the next page not started yet
+                for page in pending:
+                    payload = await asyncio.to_thread(source.load, page)
+                    record = await self.process_page(job, page, payload)
+                    del payload
+
+                    record["page"] = page
+                    self.checkpoint(job_id, record)
+                    records[page] = record
+
+                    job["pages_done"] += 1
+                    job["chunks"] += len(record["chunks"])
+                    self.save(job)
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            try:
+                await asyncio.gather(*workers)
+            except BaseException:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                raise
+
+            result = await asyncio.to_thread(self.finish, job, [records[page] for page in sorted(records)])
+
+            job.update(status="completed", result=result)
+            self.save(job)
+
+            # the checkpoint is only needed to resume
+            for name in (os.path.basename(job["source"]), "pages.jsonl"):
+                if os.path.exists(self.path(job_id, name)):
+                    os.remove(self.path(job_id, name))
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            traceback.print_exc()
+            job.update(status="failed", error=str(e))
+            self.save(job)
+
+    def snapshot(self) -> dict:
+        return {"running": len(self.tasks), "concurrency": self.concurrency}
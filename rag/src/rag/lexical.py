@@ -0,0 +1,127 @@
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+TOKEN = re.compile(r"[^\W_]+(?:[.,&][^\W_]+)*")
+
+
+def tokenize(text: str) -> list:
+    """
+    Lowercased word and number tokens with inner punctuation folded, so
+    "B.Tech" -> "btech", "2,45,000" -> "245000" and "L&T" -> "lt" match however
+    the query spells them.
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    return [re.sub(r"[.,&]", "", token) for token in TOKEN.findall(text)]
+
+
+def rrf_fuse(rankings: list, k: int = 60) -> list:
+    """Reciprocal rank fusion of ranked id lists, (id, score) best first."""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+class BM25Index:
+    """
+    In-process inverted index scoring chunks with Okapi BM25.
+
+    Dense MiniLM embeddings blur exact tokens such as "CSBS", "Kalvium" or a fee
+    amount; the inverted index matches them literally and is fused with the
+    dense ranking. Postings map a term to {row: term frequency}; removed rows
+    leave a hole that is reused by the next add. It keeps each chunk's text and
+    metadata so lexical-only hits can be returned without another store lookup.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.postings = defaultdict(dict)
+        self.rows = {}
+        self.ids = []
+        self.docs = []
+        self.lengths = []
+        self.free = []
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def rebuild(self, ids: list, texts: list, metadatas: list):
+        with self.lock:
+            self.clear()
+            self._add(ids, texts, metadatas)
+
+    def upsert(self, ids: list, texts: list, metadatas: list, delete=()):
+        with self.lock:
+            self._remove(list(delete) + list(ids))
+            self._add(ids, texts, metadatas)
+
+    def _add(self, ids, texts, metadatas):
+        for doc_id, text, metadata in zip(ids, texts, metadatas):
+            # the context tag carries the program / fee heading the chunk belongs to
+            terms = Counter(tokenize(f"{(metadata or {}).get('context_tag', '')} {text}"))
+            length = sum(terms.values())
+
+            if self.free:
+                row = self.free.pop()
+                self.ids[row], self.docs[row], self.lengths[row] = doc_id, (text, metadata), length
+            else:
+                row = len(self.ids)
+                self.ids.append(doc_id)
+                self.docs.append((text, metadata))
+                self.lengths.append(length)
+
+            self.rows[doc_id] = row
+            self.total_length += length
+            for term, frequency in terms.items():
+                self.postings[term][row] = frequency
+
+    def _remove(self, ids):
+        for doc_id in ids:
+            row = self.rows.pop(doc_id, None)
+            if row is None:
+                continue
+            text, metadata = self.docs[row]
+            for term in set(tokenize(f"{(metadata or {}).get('context_tag', '')} {text}")):
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(row, None)
+                    if not postings:
+                        del self.postings[term]
+            self.total_length -= self.lengths[row]
+            self.ids[row], self.docs[row], self.lengths[row] = None, None, 0
+            self.free.append(row)
+
+    def search(self, query: str, top_k: int = 20) -> list:
+        """`top_k` best rows as (id, score, text, metadata)."""
+        with self.lock:
+            count = len(self.rows)
+            if not count:
+                return []
+            average = self.total_length / count
+
+            scores = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for row, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[row] / average)
+                    scores[row] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+            best = sorted(scores.items(), key=lambda item: -item[1])[:top_k]
+            return [(self.ids[row], score, *self.docs[row]) for row, score in best]
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {"documents": len(self.rows), "terms": len(self.postings)}
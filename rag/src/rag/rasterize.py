@@ -0,0 +1,41 @@
+import base64
+import tempfile
+
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+
+def jpeg_data_url(data: bytes) -> str:
+    return f"data:image/jpeg;base64,{base64.b64encode(data).decode()}"
+
+
+class PdfPages:
+    """
+    Pages of a PDF on disk, rasterized one at a time.
+
+    `load(page)` has pdftoppm render just that page at `dpi` straight to a JPEG
+    in a scratch directory, reads it back as a base64 data URL and deletes it.
+    The page bitmap only ever exists inside the pdftoppm process, so what a page
+    in flight costs here is one compressed JPEG, however many pages the
+    document has.
+    """
+
+    def __init__(self, path: str, dpi: int = 200, jpeg_quality: int = 75):
+        self.path = path
+        self.dpi = dpi
+        self.jpeg_quality = jpeg_quality
+        self.count = pdfinfo_from_path(path)["Pages"]
+
+    def load(self, page: int) -> str:
+        with tempfile.TemporaryDirectory(prefix="rag-page-") as scratch:
+            paths = convert_from_path(
+                self.path,
+                dpi=self.dpi,
+                first_page=page,
+                last_page=page,
+                fmt="jpeg",
+                jpegopt={"quality": self.jpeg_quality},
+                output_folder=scratch,
+                paths_only=True
+            )
+            with open(paths[0], "rb") as f:
+                return jpeg_data_url(f.read())
@@ -0,0 +1,84 @@
+import time
+import asyncio
+import threading
+from collections import deque
+
+from sentence_transformers import CrossEncoder
+
+from .cache import percentile
+
+
+class BudgetedReranker:
+    """
+    CPU cross-encoder reranking of fused /search candidates under a latency budget.
+
+    The cost of one (query, chunk) pair is tracked as a moving average and only
+    as many leading candidates as fit into `budget_ms` are scored (at most
+    `max_candidates`, never fewer than `min_candidates`). If scoring still
+    overruns the budget, or another rerank is still running, the fused order is
+    returned unchanged; an overrunning call finishes in the background and its
+    timing shrinks the next batches.
+    """
+
+    def __init__(self, model_name: str, budget_ms: float = 80, max_candidates: int = 10, min_candidates: int = 3, latency_window: int = 2048):
+        self.model = CrossEncoder(model_name, device="cpu")
+        self.budget_ms = budget_ms
+        self.max_candidates = max_candidates
+        self.min_candidates = min_candidates
+
+        self.lock = threading.Lock()
+        self.per_pair_ms = None
+        self.inflight = 0
+
+        self.outcomes = {"reranked": 0, "timeout": 0, "busy": 0, "skipped": 0}
+        self.latencies = deque(maxlen=latency_window)
+
+    def candidates(self, available: int) -> int:
+        if self.per_pair_ms is None:
+            return min(available, self.min_candidates)
+        fits = int(self.budget_ms / self.per_pair_ms)
+        return min(available, self.max_candidates, max(self.min_candidates, fits))
+
+    def score(self, query: str, texts: list) -> list:
+        with self.lock:
+            self.inflight += 1
+        start = time.perf_counter()
+        try:
+            return [float(score) for score in self.model.predict([(query, text) for text in texts], show_progress_bar=False)]
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self.lock:
+                self.inflight -= 1
+                per_pair = elapsed_ms / max(1, len(texts))
+                self.per_pair_ms = per_pair if self.per_pair_ms is None else 0.8 * self.per_pair_ms + 0.2 * per_pair
+                self.latencies.append(elapsed_ms)
+
+    async def rerank(self, query: str, results: list) -> list:
+        """`results` with the leading candidates reordered by cross-encoder score, as far as the budget allows."""
+        count = self.candidates(len(results))
+        if count < 2:
+            self.outcomes["skipped"] += 1
+            return results
+        if self.inflight:
+            self.outcomes["busy"] += 1
+            return results
+
+        head = results[:count]
+        try:
+            scores = await asyncio.wait_for(asyncio.to_thread(self.score, query, [r["text"] for r in head]), self.budget_ms / 1000)
+        except asyncio.TimeoutError:
+            self.outcomes["timeout"] += 1
+            return results
+
+        self.outcomes["reranked"] += 1
+        order = sorted(range(count), key=lambda i: -scores[i])
+        return [{**head[i], "score": round(scores[i], 4)} for i in order] + results[count:]
+
+    def snapshot(self) -> dict:
+        return {
+            "budget_ms": self.budget_ms,
+            "per_pair_ms": round(self.per_pair_ms, 3) if self.per_pair_ms is not None else None,
+            "next_candidates": self.candidates(self.max_candidates),
+            **self.outcomes,
+            "latency_ms": {"p50": percentile(self.latencies, 50), "p95": percentile(self.latencies, 95)}
+        }
@@ -3,8 +3,10 @@ import os
 import json
 import uuid
 import time
-import base64
+import hashlib
 import csv
+import asyncio
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
@@ -12,10 +14,6 @@ from fastapi import FastAPI, UploadFile, File, HTTPException
 from pydantic import BaseModel
 import uvicorn
 
-# PDF / Image processing
-from pdf2image import convert_from_bytes
-from PIL import Image
-
 # DOCX processing
 from docx import Document
 from docx.document import Document as _Document
@@ -24,11 +22,18 @@ from docx.oxml.table import CT_Tbl
 from docx.table import _Cell, Table
 from docx.text.paragraph import Paragraph
 
-from tqdm import tqdm
 from groq import Groq
 import chromadb
 from chromadb import PersistentClient
-from sentence_transformers import SentenceTransformer
+
+from .cache import QueryCache
+from .embedding import EmbeddingBatcher, load_embedder
+from .index import MmapVectorIndex
+from .jobs import IngestJobs, TokenBucket
+from .sources import SourceRegistry, chunk_ids, content_hash
+from .extraction import PlannedPdfPages
+from .lexical import BM25Index, rrf_fuse
+from .rerank import BudgetedReranker
 
 from dotenv import load_dotenv 
 
@@ -46,6 +51,14 @@ COLLECTION_NAME = "college_programs_granular"
 
 EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
+# torch | onnx | onnx-int8 (the last two need the `onnx` extra), EMBED_ONNX_FILE picks another export
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+EMBED_ONNX_FILE = os.getenv("EMBED_ONNX_FILE")
+
+# /search queries arriving within this window are embedded in one forward pass
+EMBED_BATCH_SIZE = 32
+EMBED_BATCH_WAIT_MS = 2.0
+
 # Models
 # Note: "moonshotai/kimi-k2" is not on Groq. We stick to the best Llama 3.3 model.
 # Removing JSON constraint from Phase 1 makes this model work perfectly.
@@ -55,6 +68,57 @@ CHUNKING_MODEL = "llama-3.3-70b-versatile"
 
 CSV_CHUNKS_PATH = "final_granular_chunks_audit.csv"
 
+# per-document versions: page hashes and the chunk ids each page produced
+SOURCE_REGISTRY_PATH = "./sources.json"
+
+# /ingest runs as a background job: pages in flight per job, and the Groq request
+# budget shared by every extraction and chunking call of the process
+INGEST_JOBS_DIR = "./ingest_jobs"
+INGEST_CONCURRENCY = 4
+LLM_REQUESTS_PER_SECOND = 2.0
+LLM_BURST = 4
+# a failed extraction / chunking call of a job is retried with exponential backoff, then the
+# job fails with the page left out of its checkpoint so a resume retries it
+LLM_RETRIES = 3
+LLM_RETRY_BACKOFF = 2.0
+
+# uploads are spooled to disk in blocks of this size, PDF pages are rasterized one at a
+# time at PDF_DPI and sent to the vision model as JPEG (PIL's default quality)
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+PDF_DPI = int(os.getenv("PDF_DPI", "200"))
+PDF_JPEG_QUALITY = 75
+
+# PDF pages whose embedded text layer scores at least this (0-1, see extraction.py)
+# are taken as is, only the rest go through the vision model
+TEXT_LAYER_MIN_QUALITY = float(os.getenv("TEXT_LAYER_MIN_QUALITY", "0.6"))
+
+# engine answering /search: chroma | mmap (in-process matmul over a memory-mapped
+# mirror of the collection, float32 or int8 rows). Chroma stays the store of record.
+VECTOR_ENGINE = os.getenv("VECTOR_ENGINE", "chroma")
+VECTOR_INDEX_DIR = "./vector_index"
+VECTOR_INDEX_DTYPE = os.getenv("VECTOR_INDEX_DTYPE", "float32")
+
+# /search result cache: exact LRU size, semantic cache size and its cosine similarity threshold
+QUERY_CACHE_SIZE = 1024
+SEMANTIC_CACHE_SIZE = 512
+SEMANTIC_CACHE_THRESHOLD = 0.95
+
+# /search retrieval: hybrid fuses BM25 over the chunk texts with the dense ranking (RRF over
+# HYBRID_CANDIDATES from each), dense is vector search only. In hybrid mode a result's
+# "score" is the fused (or reranker) relevance, higher is better.
+SEARCH_MODE = os.getenv("SEARCH_MODE", "hybrid")
+HYBRID_CANDIDATES = 20
+RRF_K = 60
+
+# optional CPU cross-encoder over the fused head, e.g. cross-encoder/ms-marco-MiniLM-L-6-v2;
+# it scores only as many candidates as fit into the budget and is skipped when it overruns
+RERANKER_MODEL = os.getenv("RERANKER_MODEL")
+RERANK_BUDGET_MS = 80
+RERANK_CANDIDATES = 10
+
+# rewritten on every write to the collection, tells other workers to rebuild their BM25 index
+STORE_EPOCH_PATH = "./store_epoch"
+
 os.makedirs(CHROMA_DIR, exist_ok=True)
 
 # ============================================================
@@ -62,7 +126,13 @@ os.makedirs(CHROMA_DIR, exist_ok=True)
 # ============================================================
 
 client = Groq(api_key=os.environ['GROQ_API_KEY'])
-embedder = SentenceTransformer(EMBED_MODEL)
+embedder = load_embedder(EMBED_MODEL, backend=EMBED_BACKEND, onnx_file=EMBED_ONNX_FILE)
+
+embedding_batcher = EmbeddingBatcher(
+    lambda texts: embedder.encode(texts, show_progress_bar=False),
+    max_batch=EMBED_BATCH_SIZE,
+    max_wait_ms=EMBED_BATCH_WAIT_MS
+)
 
 chroma = PersistentClient(path=CHROMA_DIR)
 
@@ -71,7 +141,42 @@ collection = chroma.get_or_create_collection(
     metadata={"hnsw:space": "cosine"}
 )
 
-app = FastAPI(title="College Admission RAG Pipeline (Granular)")
+vector_index = MmapVectorIndex(VECTOR_INDEX_DIR, dtype=VECTOR_INDEX_DTYPE) if VECTOR_ENGINE == "mmap" else None
+
+source_registry = SourceRegistry(SOURCE_REGISTRY_PATH)
+
+lexical_index = BM25Index()
+# store epoch this worker's BM25 index and query cache reflect
+seen_epoch = None
+
+reranker = BudgetedReranker(RERANKER_MODEL, budget_ms=RERANK_BUDGET_MS, max_candidates=RERANK_CANDIDATES) if RERANKER_MODEL else None
+
+llm_limiter = TokenBucket(rate=LLM_REQUESTS_PER_SECOND, capacity=LLM_BURST)
+
+query_cache = QueryCache(
+    max_entries=QUERY_CACHE_SIZE,
+    semantic_entries=SEMANTIC_CACHE_SIZE,
+    threshold=SEMANTIC_CACHE_THRESHOLD
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if vector_index is not None:
+        await asyncio.to_thread(sync_vector_index)
+    if SEARCH_MODE == "hybrid":
+        await asyncio.to_thread(sync_lexical_index)
+    if reranker is not None:
+        # first call loads the weights, keep it out of the first query's budget
+        await asyncio.to_thread(reranker.score, "warm up", ["warm up"])
+    embedding_batcher.start()
+    resumed = ingest_jobs.resume()
+    if resumed:
+        print(f"Resuming ingest jobs: {', '.join(resumed)}")
+    yield
+    await ingest_jobs.stop()
+    await embedding_batcher.stop()
+
+app = FastAPI(title="College Admission RAG Pipeline (Granular)", lifespan=lifespan)
 
 # Input model for Raw Text
 class TextInput(BaseModel):
@@ -82,11 +187,6 @@ class TextInput(BaseModel):
 # UTILS
 # ============================================================
 
-def img_to_b64(img: Image.Image) -> str:
-    buf = io.BytesIO()
-    img.save(buf, format="JPEG")
-    return f"data:image/jpeg;base64,{base64.b64encode(buf.getvalue()).decode()}"
-
 def safe_json_loads(text: str, context_info: str):
     """Robust JSON parser."""
     if not text: return {}
@@ -204,20 +304,24 @@ Your task is to convert the raw text into a JSON list of strictly "Contextualize
 # STAGE 1: RAW EXTRACTION
 # ============================================================
 
-def extract_page_vision_raw(image: Image.Image, page_num: int) -> str:
-    img_b64 = img_to_b64(image)
+def extract_page_vision_raw(image_url: str, page_num: int, raise_errors: bool = False) -> str:
     messages = [
         {"role": "system", "content": RAW_EXTRACTION_PROMPT},
-        {"role": "user", "content": [{"type": "text", "text": f"Page {page_num}"}, {"type": "image_url", "image_url": {"url": img_b64}}]}
+        {"role": "user", "content": [{"type": "text", "text": f"Page {page_num}"}, {"type": "image_url", "image_url": {"url": image_url}}]}
     ]
     try:
         resp = client.chat.completions.create(model=VISION_MODEL, messages=messages, temperature=0.1)
-        return resp.choices[0].message.content or ""
+        content = resp.choices[0].message.content or ""
+        if raise_errors and not content.strip():
+            raise ValueError(f"Empty vision response for page {page_num}")
+        return content
     except Exception as e:
         print(f"[ERR] Vision fail page {page_num}: {e}")
+        if raise_errors:
+            raise
         return ""
 
-def extract_segment_text_raw(text_content: str, segment_num: int) -> str:
+def extract_segment_text_raw(text_content: str, segment_num: int, raise_errors: bool = False) -> str:
     messages = [
         {"role": "system", "content": RAW_EXTRACTION_PROMPT},
         {"role": "user", "content": f"Extract/Clean segment {segment_num}:\n\n{text_content}"}
@@ -227,16 +331,21 @@ def extract_segment_text_raw(text_content: str, segment_num: int) -> str:
         return resp.choices[0].message.content or ""
     except Exception as e:
         print(f"[ERR] Text fail segment {segment_num}: {e}")
+        if raise_errors:
+            raise
         return ""
 
 # ============================================================
 # STAGE 2: SEMANTIC CHUNKING
 # ============================================================
 
-def generate_semantic_chunks(raw_text: str, source_identifier: str) -> List[Dict]:
+def generate_semantic_chunks(raw_text: str, source_identifier: str, source_name: Optional[str] = None, page_hash: Optional[str] = None, raise_errors: bool = False) -> List[Dict]:
     """
     Uses LLM to split text into paragraph-based contextual chunks.
     source_identifier: can be 'Page 1' or 'Manual Input Part 1'
+    source_name / page_hash: document and page content hash of a file page, recorded in the
+    metadata. Chunk ids hash the source, page and text, so the same content maps to the same id.
+    raise_errors: raise on a failed call or a response without chunks instead of returning [].
     """
     if not raw_text or len(raw_text) < 20:
         return []
@@ -259,25 +368,31 @@ def generate_semantic_chunks(raw_text: str, source_identifier: str) -> List[Dict
         chunks_data = response_data.get("chunks", [])
         
         final_chunks = []
+        seen = set()
         for item in chunks_data:
             context = item.get("context_tag", "General Info")
             text = item.get("content", "")
-            
-            if text:
-                final_chunks.append({
-                    "id": str(uuid.uuid4()),
-                    "text": text,
-                    "metadata": {
-                        "source_page": str(source_identifier),
-                        "context_tag": context,
-                        "chunk_type": "semantic_paragraph",
-                        "ingest_type": "text" if "Manual" in str(source_identifier) else "file"
-                    }
-                })
+            chunk_id = content_hash(source_name or str(source_identifier), page_hash or "", text)[:32]
+
+            if text and chunk_id not in seen:
+                seen.add(chunk_id)
+                metadata = {
+                    "source_page": str(source_identifier),
+                    "context_tag": context,
+                    "chunk_type": "semantic_paragraph",
+                    "ingest_type": "text" if "Manual" in str(source_identifier) else "file"
+                }
+                if source_name:
+                    metadata.update(source=source_name, page_hash=page_hash)
+                final_chunks.append({"id": chunk_id, "text": text, "metadata": metadata})
+        if raise_errors and not final_chunks:
+            raise ValueError(f"No chunks in the chunking response for {source_identifier}")
         return final_chunks
 
     except Exception as e:
         print(f"[ERR] Chunking fail {source_identifier}: {e}")
+        if raise_errors:
+            raise
         return []
 
 # ============================================================
@@ -334,11 +449,268 @@ def save_chunks_to_csv(chunks: List[Dict]):
                 "timestamp": datetime.utcnow().isoformat()
             })
 
-def ingest_chunks_to_db(chunks: List[Dict]):
-    if not chunks: return
+def ingest_chunks_to_db(chunks: List[Dict], stale_ids=()):
+    """
+    Upserts chunks (ids are content hashes, so re-ingesting the same content is a no-op)
+    and deletes `stale_ids`. New chunks are written before stale ones are removed, so a
+    replaced page is never missing from search; the mmap index swaps both in one generation.
+    """
+    stale_ids = list(stale_ids)
+    if not chunks and not stale_ids: return
+    ids = [c["id"] for c in chunks]
     texts = [c["text"] for c in chunks]
-    embeddings = embedder.encode(texts, show_progress_bar=False)
-    collection.add(ids=[c["id"] for c in chunks], documents=texts, metadatas=[c["metadata"] for c in chunks], embeddings=embeddings)
+    metadatas = [c["metadata"] for c in chunks]
+    embeddings = embedder.encode(texts, show_progress_bar=False) if chunks else None
+    if chunks:
+        collection.upsert(ids=ids, documents=texts, metadatas=metadatas, embeddings=embeddings)
+    if stale_ids:
+        collection.delete(ids=stale_ids)
+    if vector_index is not None:
+        vector_index.replace(ids, texts, metadatas, embeddings, delete=stale_ids)
+    lexical_index.upsert(ids, texts, metadatas, delete=stale_ids)
+    bump_store_epoch()
+    # cached /search results may now miss the new chunks
+    query_cache.invalidate()
+
+def load_stored_chunks(ids: List[str], page: int) -> Optional[List[Dict]]:
+    """Stored chunks of an unchanged page, renumbered to `page`. None if any of them is missing."""
+    if not ids:
+        return []
+    stored = collection.get(ids=ids, include=["documents", "metadatas"])
+    if len(stored["ids"]) != len(set(ids)):
+        return None
+    by_id = {chunk_id: (text, metadata) for chunk_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"])}
+    return [{"id": chunk_id, "text": by_id[chunk_id][0], "metadata": {**by_id[chunk_id][1], "source_page": str(page)}} for chunk_id in ids]
+
+def sync_vector_index():
+    """Rebuild the mmap index from Chroma when it is missing or out of step (first start, crash mid-ingest)."""
+    if len(vector_index) == collection.count():
+        return
+    exported = collection.get(include=["documents", "metadatas", "embeddings"])
+    print(f"Rebuilding vector index from {len(exported['ids'])} Chroma rows")
+    vector_index.rebuild(exported["ids"], exported["documents"], exported["metadatas"], exported["embeddings"])
+
+def store_epoch():
+    try:
+        stat = os.stat(STORE_EPOCH_PATH)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns)
+
+def bump_store_epoch():
+    """Marks the collection as changed. This worker's BM25 and cache stay current unless another one wrote since."""
+    global seen_epoch
+    current = store_epoch() == seen_epoch
+    tmp = STORE_EPOCH_PATH + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(uuid.uuid4().hex)
+    os.replace(tmp, STORE_EPOCH_PATH)
+    seen_epoch = store_epoch() if current else None
+
+def sync_lexical_index():
+    """Rebuilds BM25 from the whole collection."""
+    global seen_epoch
+    epoch = store_epoch()
+    exported = collection.get(include=["documents", "metadatas"])
+    lexical_index.rebuild(exported["ids"], exported["documents"], exported["metadatas"])
+    seen_epoch = epoch
+
+async def refresh_store_view():
+    """Catches up with writes made by other workers: drops cached results and, in hybrid mode, rebuilds BM25."""
+    global seen_epoch
+    epoch = store_epoch()
+    if epoch == seen_epoch:
+        return
+    if SEARCH_MODE == "hybrid":
+        await asyncio.to_thread(sync_lexical_index)
+    else:
+        seen_epoch = epoch
+    query_cache.invalidate()
+
+async def hybrid_search(query: str, emb, top_k: int) -> List[Dict]:
+    """Dense and BM25 candidates fused with reciprocal rank fusion, optionally reranked, in /search result format."""
+    if SEARCH_MODE != "hybrid":
+        return await asyncio.to_thread(query_vectors, emb, top_k)
+
+    candidates = max(top_k, HYBRID_CANDIDATES)
+    dense, lexical = await asyncio.gather(
+        asyncio.to_thread(query_vectors, emb, candidates),
+        asyncio.to_thread(lexical_index.search, query, candidates)
+    )
+
+    by_id = {r["id"]: r for r in dense}
+    for chunk_id, _, text, metadata in lexical:
+        by_id.setdefault(chunk_id, {
+            "id": chunk_id,
+            "context": metadata.get("context_tag"),
+            "text": text,
+            "source": metadata.get("source_page")
+        })
+
+    fused = rrf_fuse([[r["id"] for r in dense], [hit[0] for hit in lexical]], k=RRF_K)
+    results = [{**by_id[chunk_id], "score": round(score, 5)} for chunk_id, score in fused]
+
+    if reranker is not None:
+        results = await reranker.rerank(query, results)
+
+    return results[:top_k]
+
+def query_vectors(emb, top_k: int) -> List[Dict]:
+    """Top-k chunks for a query embedding from the configured engine, in /search result format."""
+    if vector_index is not None:
+        return [
+            {
+                "id": chunk_id,
+                "score": distance,
+                "context": metadata.get("context_tag"),
+                "text": text,
+                "source": metadata.get("source_page")
+            }
+            for chunk_id, distance, text, metadata in vector_index.search(emb, top_k)
+        ]
+
+    results = collection.query(
+        query_embeddings=[emb],
+        n_results=top_k,
+        include=["documents", "metadatas", "distances"]
+    )
+
+    formatted = []
+    if results["ids"]:
+        for i in range(len(results["ids"][0])):
+            formatted.append({
+                "id": results["ids"][0][i],
+                "score": results["distances"][0][i],
+                "context": results["metadatas"][0][i].get("context_tag"),
+                "text": results["documents"][0][i],
+                "source": results["metadatas"][0][i].get("source_page")
+            })
+    return formatted
+
+# ============================================================
+# INGEST JOBS
+# ============================================================
+
+class DocxPages:
+    """Text segments of a DOCX on disk, numbered like pages."""
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.segments = parse_docx_to_text_segments(f.read())
+        self.count = len(self.segments)
+
+    def load(self, page: int) -> dict:
+        return {"strategy": "docx_text", "content": self.segments[page - 1], "quality": None}
+
+def open_ingest_source(job: dict):
+    if job["kind"] == "pdf":
+        return PlannedPdfPages(job["source"], dpi=PDF_DPI, jpeg_quality=PDF_JPEG_QUALITY, min_quality=TEXT_LAYER_MIN_QUALITY)
+    return DocxPages(job["source"])
+
+async def call_llm(fn, *args):
+    """
+    `fn(*args)` in a thread, paced by the shared limiter and retried with exponential backoff.
+    A 429 pauses the limiter so every page backs off, not just this one. Raises once the
+    retries are spent, the job then fails without checkpointing the page.
+    """
+    for attempt in range(LLM_RETRIES + 1):
+        await llm_limiter.acquire()
+        try:
+            return await asyncio.to_thread(fn, *args, raise_errors=True)
+        except Exception as e:
+            if attempt == LLM_RETRIES:
+                raise RuntimeError(f"{fn.__name__} failed after {attempt + 1} attempts: {e}") from e
+            delay = LLM_RETRY_BACKOFF * 2 ** attempt
+            if getattr(e, "status_code", None) == 429:
+                llm_limiter.pause(delay)
+            print(f"[WARN] {fn.__name__} attempt {attempt + 1} failed, retrying in {delay:.0f}s: {e}")
+            await asyncio.sleep(delay)
+
+async def process_ingest_page(job: dict, page: int, payload) -> dict:
+    """
+    Raw extraction and semantic chunking of one page, each LLM call paced by the shared limiter
+    and retried (`call_llm`), a page whose calls keep failing fails the job.
+    A page whose content hash is already in the current version of the source reuses its chunks,
+    a PDF page with a good text layer skips the vision call. The strategy lands in chunk metadata.
+    """
+    # text layer markdown or JPEG of a PDF page, text of a DOCX segment
+    page_hash = content_hash(payload["content"])
+    known_ids = source_registry.page_chunks(job["source_name"], page_hash)
+    if known_ids is not None:
+        chunks = await asyncio.to_thread(load_stored_chunks, known_ids, page)
+        if chunks is not None:
+            return {"page_hash": page_hash, "reused": True, "strategy": "reused", "raw_text": None, "chunks": chunks}
+
+    strategy = payload["strategy"]
+    if strategy == "text_layer":
+        raw_text = payload["content"]
+    elif strategy == "vision":
+        raw_text = await call_llm(extract_page_vision_raw, payload["content"], page)
+    else:
+        raw_text = await call_llm(extract_segment_text_raw, payload["content"], page)
+        if len(raw_text) <= 10:
+            raw_text = ""
+
+    chunks = []
+    # shorter text is never sent to the chunker (see generate_semantic_chunks)
+    if len(raw_text) >= 20:
+        chunks = await call_llm(generate_semantic_chunks, raw_text, str(page), job["source_name"], page_hash)
+
+    for chunk in chunks:
+        chunk["metadata"]["extraction"] = strategy
+        if payload["quality"] is not None:
+            chunk["metadata"]["extraction_quality"] = payload["quality"]["score"]
+
+    return {"page_hash": page_hash, "reused": False, "strategy": strategy, "quality": payload["quality"], "raw_text": raw_text, "chunks": chunks}
+
+def finish_ingest_job(job: dict, records: List[Dict]) -> dict:
+    """
+    Publishes the job as the next version of its source: chunks that are new or moved to another
+    page are written, chunks of pages that changed or disappeared are deleted, unchanged ones stay.
+    """
+    source = job["source_name"]
+    pages = {record["page"]: {"hash": record["page_hash"], "chunk_ids": [c["id"] for c in record["chunks"]]} for record in records}
+
+    # a page repeated in the document yields the same ids
+    chunks = list({c["id"]: c for record in records for c in record["chunks"]}.values())
+    counts = {}
+
+    def apply(previous):
+        previous_ids = chunk_ids(previous)
+        previous_page = {chunk_id: number for number, page in (previous or {"pages": {}})["pages"].items() for chunk_id in page["chunk_ids"]}
+
+        changed = [c for c in chunks if previous_page.get(c["id"]) != c["metadata"]["source_page"]]
+        added = [c for c in changed if c["id"] not in previous_ids]
+        stale = previous_ids - {c["id"] for c in chunks}
+
+        print(f"--- Storing {source}: {len(added)} new, {len(changed) - len(added)} moved, {len(stale)} removed ---")
+        ingest_chunks_to_db(changed, stale_ids=stale)
+        save_chunks_to_csv(added)
+        counts.update(added=len(added), removed=len(stale))
+
+    # with a page that yielded nothing an identical re-upload must run again, not come back "unchanged"
+    file_hash = job["file_hash"] if all(record["chunks"] for record in records) else None
+    entry = source_registry.update(source, file_hash, pages, apply)
+
+    return {
+        "file_type": job["kind"],
+        "source": source,
+        "version": entry["version"],
+        "pages_processed": sum(1 for record in records if record["chunks"] or record["raw_text"]),
+        "pages_reused": sum(1 for record in records if record["reused"]),
+        "pages_by_strategy": {strategy: sum(1 for record in records if record["strategy"] == strategy) for strategy in sorted({record["strategy"] for record in records})},
+        "total_semantic_vectors": len(chunks),
+        "vectors_added": counts["added"],
+        "vectors_removed": counts["removed"],
+        "db_total_count": collection.count()
+    }
+
+ingest_jobs = IngestJobs(
+    INGEST_JOBS_DIR,
+    open_source=open_ingest_source,
+    process_page=process_ingest_page,
+    finish=finish_ingest_job,
+    concurrency=INGEST_CONCURRENCY
+)
 
 # ============================================================
 # API ENDPOINTS
@@ -388,74 +760,137 @@ async def ingest_raw_text(payload: TextInput):
         raise HTTPException(500, str(e))
 
 
-@app.post("/ingest")
+@app.post("/ingest", status_code=202)
 async def ingest_file(file: UploadFile = File(...)):
+    """
+    Queues a PDF/DOCX for background ingestion and returns its job id.
+    Progress is at GET /ingest/{job_id}.
+    """
     filename = file.filename.lower()
-    file_bytes = await file.read()
-    raw_pages_data = []
+    if filename.endswith(".pdf"):
+        kind = "pdf"
+    elif filename.endswith(".docx") or "wordprocessingml" in (file.content_type or ""):
+        kind = "docx"
+    else:
+        raise HTTPException(400, "Unsupported file. Use PDF or DOCX.")
+
+    source_name = os.path.basename(filename)
+
+    # spool the upload block by block instead of holding it in memory
+    upload_path = os.path.join(INGEST_JOBS_DIR, f"upload-{uuid.uuid4().hex}")
+    digest = hashlib.sha256()
+    with open(upload_path, "wb") as f:
+        while block := await file.read(UPLOAD_CHUNK_BYTES):
+            digest.update(block)
+            f.write(block)
+    file_hash = digest.hexdigest()
+
+    current = source_registry.get(source_name)
+    if current is not None and current["file_hash"] == file_hash:
+        os.remove(upload_path)
+        return {"job_id": None, "status": "unchanged", "source": source_name, "version": current["version"]}
+
+    job = ingest_jobs.create(file.filename, kind, upload_path, source_name=source_name, file_hash=file_hash)
+    ingest_jobs.start(job["id"])
+
+    return {"job_id": job["id"], "status": job["status"], "progress_url": f"/ingest/{job['id']}"}
+
+@app.get("/ingest/{job_id}")
+def ingest_progress(job_id: str):
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Unknown ingest job.")
+
+    return {
+        "job_id": job["id"],
+        "filename": job["filename"],
+        "status": job["status"],
+        "total_pages": job["total_pages"],
+        "pages_done": job["pages_done"],
+        "pages_resumed": job["pages_resumed"],
+        "progress": round(job["pages_done"] / job["total_pages"], 4) if job["total_pages"] else 0.0,
+        "chunks": job["chunks"],
+        "error": job["error"],
+        "result": job["result"]
+    }
 
-    try:
-        print(f"--- Phase 1: Raw Extraction ({filename}) ---")
-        
-        if filename.endswith(".pdf"):
-            images = convert_from_bytes(file_bytes)
-            for i, img in tqdm(enumerate(images, start=1), total=len(images), desc="PDF Extract"):
-                raw_text = extract_page_vision_raw(img, i)
-                if raw_text: raw_pages_data.append((str(i), raw_text))
-                time.sleep(0.3)
-
-        elif filename.endswith(".docx") or "wordprocessingml" in file.content_type:
-            text_segments = parse_docx_to_text_segments(file_bytes)
-            for i, text_seg in tqdm(enumerate(text_segments, start=1), total=len(text_segments), desc="DOCX Extract"):
-                raw_text = extract_segment_text_raw(text_seg, i)
-                if raw_text and len(raw_text) > 10: raw_pages_data.append((str(i), raw_text))
-                time.sleep(0.2)
-        else:
-            raise HTTPException(400, "Unsupported file. Use PDF or DOCX.")
+@app.post("/ingest/{job_id}/resume")
+async def resume_ingest(job_id: str):
+    """Restarts a failed job from its last checkpointed page."""
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Unknown ingest job.")
+    if job["status"] != "failed":
+        raise HTTPException(409, f"Job is {job['status']}.")
+
+    if not ingest_jobs.start(job_id):
+        raise HTTPException(409, "Job is already running in another worker.")
+    return {"job_id": job_id, "status": "running", "progress_url": f"/ingest/{job_id}"}
+
+@app.get("/sources")
+def list_sources():
+    """Ingested documents with their current version."""
+    return {
+        "sources": [
+            {
+                "source": name,
+                "version": entry["version"],
+                "pages": len(entry["pages"]),
+                "chunks": len(chunk_ids(entry)),
+                "updated_at": entry["updated_at"]
+            }
+            for name, entry in source_registry.read().items()
+        ]
+    }
 
-        print(f"--- Phase 2: Semantic Chunking ---")
-        all_semantic_chunks = []
-        for page_num, raw_text in tqdm(raw_pages_data, desc="Chunking"):
-            page_chunks = generate_semantic_chunks(raw_text, page_num)
-            all_semantic_chunks.extend(page_chunks)
-            time.sleep(0.1) 
+@app.delete("/sources/{source_name}")
+def delete_source(source_name: str):
+    """Removes a document and all of its chunks."""
+    entry = source_registry.remove(source_name.lower(), lambda entry: ingest_chunks_to_db([], stale_ids=chunk_ids(entry)))
+    if entry is None:
+        raise HTTPException(404, "Unknown source.")
+    return {"status": "deleted", "source": source_name.lower(), "vectors_removed": len(chunk_ids(entry))}
 
-        print(f"--- Phase 3: Storing {len(all_semantic_chunks)} Vectors ---")
-        save_chunks_to_csv(all_semantic_chunks)
-        ingest_chunks_to_db(all_semantic_chunks)
+@app.get("/search")
+async def search(query: str, top_k: int = 5):
+    start = time.perf_counter()
+    await refresh_store_view()
+    generation = query_cache.generation
 
-        return {
-            "status": "success",
-            "file_type": "pdf" if filename.endswith(".pdf") else "docx",
-            "pages_processed": len(raw_pages_data),
-            "total_semantic_vectors": len(all_semantic_chunks),
-            "db_total_count": collection.count()
-        }
+    cached = query_cache.get_exact(query, top_k)
+    if cached is not None:
+        query_cache.record("exact", (time.perf_counter() - start) * 1000)
+        return {"results": cached}
 
-    except Exception as e:
-        print(f"CRITICAL ERROR: {e}")
-        raise HTTPException(500, str(e))
+    emb = await embedding_batcher.embed(query)
 
-@app.get("/search")
-def search(query: str, top_k: int = 5):
-    emb = embedder.encode(query)
-    results = collection.query(
-        query_embeddings=[emb], 
-        n_results=top_k,
-        include=["documents", "metadatas", "distances"]
-    )
+    cached = query_cache.get_similar(emb, top_k)
+    if cached is not None:
+        query_cache.record("semantic", (time.perf_counter() - start) * 1000)
+        return {"results": cached}
+
+    formatted = await hybrid_search(query, emb, top_k)
+
+    query_cache.store(query, top_k, emb, formatted, generation)
+    query_cache.record("miss", (time.perf_counter() - start) * 1000)
 
-    formatted = []
-    if results["ids"]:
-        for i in range(len(results["ids"][0])):
-            formatted.append({
-                "score": results["distances"][0][i],
-                "context": results["metadatas"][0][i].get("context_tag"),
-                "text": results["documents"][0][i],
-                "source": results["metadatas"][0][i].get("source_page")
-            })
     return {"results": formatted}
 
+@app.get("/metrics")
+def metrics():
+    """Query cache hit rates, embedding batch sizes, latency per stage and ingest job load"""
+    return {
+        "query_cache": query_cache.snapshot(),
+        "embedding": embedding_batcher.snapshot(),
+        "ingest": {**ingest_jobs.snapshot(), "llm_rate_limit": llm_limiter.snapshot()},
+        "vector_index": {"engine": VECTOR_ENGINE, **(vector_index.snapshot() if vector_index is not None else {})},
+        "retrieval": {
+            "mode": SEARCH_MODE,
+            "lexical": lexical_index.snapshot(),
+            "reranker": reranker.snapshot() if reranker is not None else None
+        }
+    }
+
 # ============================================================
 # ENTRY
 # ============================================================
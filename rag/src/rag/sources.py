@@ -0,0 +1,108 @@
+import os
+import json
+import time
+import hashlib
+
+from .index import FileLock
+
+
+def content_hash(*parts) -> str:
+    """sha256 over the parts, str parts are utf-8 encoded and every part is length-delimited."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else bytes(part)
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class SourceRegistry:
+    """
+    Versioned record of every ingested document.
+
+    For each source (the normalised upload filename) it keeps the hash of the
+    last ingested file and, per page, the page's content hash and the ids of the
+    chunks it produced. Ingest looks pages up by hash to reuse the chunks of
+    unchanged pages instead of calling the LLMs again, and `update` publishes a
+    new version: the caller's `apply(previous)` swaps the vectors while the
+    registry lock is held, then the version is bumped. Chunk ids are derived
+    from content, so repeating an interrupted update is harmless.
+
+    The registry is one JSON file replaced atomically; a flock next to it
+    serialises updates from every worker.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.lock_path = path + ".lock"
+
+    def read(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def write(self, sources: dict):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(sources, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def get(self, source: str):
+        return self.read().get(source)
+
+    def page_chunks(self, source: str, page_hash: str):
+        """
+        Chunk ids of a page with this hash in the current version of `source`, None if it is new.
+        A page that produced no chunks is never reused, it is extracted again.
+        """
+        entry = self.get(source)
+        if entry is None:
+            return None
+        for page in entry["pages"].values():
+            if page["hash"] == page_hash and page["chunk_ids"]:
+                return page["chunk_ids"]
+        return None
+
+    def update(self, source: str, file_hash: str, pages: dict, apply) -> dict:
+        """
+        Publish `pages` ({page number: {"hash", "chunk_ids"}}) as the next
+        version of `source`. `apply(previous entry or None)` runs under the lock
+        and must leave the store holding exactly the new chunk ids.
+        """
+        with FileLock(self.lock_path):
+            sources = self.read()
+            previous = sources.get(source)
+            apply(previous)
+
+            entry = {
+                "version": (previous["version"] + 1) if previous else 1,
+                "file_hash": file_hash,
+                "updated_at": time.time(),
+                "pages": {str(number): page for number, page in pages.items()}
+            }
+            sources[source] = entry
+            self.write(sources)
+        return entry
+
+    def remove(self, source: str, apply):
+        """Drop `source`, `apply(entry)` deletes its chunks under the lock. Returns the removed entry."""
+        with FileLock(self.lock_path):
+            sources = self.read()
+            entry = sources.pop(source, None)
+            if entry is not None:
+                apply(entry)
+                self.write(sources)
+        return entry
+
+
+def chunk_ids(entry) -> set:
+    """Every chunk id of a registry entry."""
+    if not entry:
+        return set()
+    return {chunk_id for page in entry["pages"].values() for chunk_id in page["chunk_ids"]}
@@ -1,4 +1,5 @@
 from .clients import *
+from .cache import *
 
 def main() -> None:
     print("Hello from tts!")
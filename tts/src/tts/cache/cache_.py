@@ -0,0 +1,264 @@
+import os
+import mmap
+import json
+import base64
+import asyncio
+import hashlib
+import unicodedata
+
+from collections import OrderedDict
+
+from ..clients import TTS
+
+def normalize_text(text : str) -> str :
+    '''
+    Unicode (NFC) and whitespace normalised text. Case and punctuation are kept , they change the prosody.
+    '''
+
+    return ' '.join(unicodedata.normalize('NFC' , text).split())
+
+class TTS_CACHE :
+    '''
+    Two tier store of synthesized audio , keyed by the voice key of the client
+    and the normalised text.
+
+    - memory : LRU of ready to send base64 chunks , bounded by entries and bytes
+    - disk : one raw audio file per key plus a small json sidecar with the chunk
+      lengths , read back through mmap and re-chunked exactly as synthesized
+
+    Args:
+        - config (dict): Cache configuration
+            - max-entries (int): Memory tier entry limit.
+            - max-bytes (int): Memory tier limit on the decoded audio size.
+            - directory (str): Disk tier directory.
+    '''
+
+    def __init__(self , config : dict) -> None :
+
+        self.config : dict = config
+
+        self.max_entries : int = config['max-entries']
+        self.max_bytes : int = config['max-bytes']
+        self.directory : str = config['directory']
+
+        os.makedirs(self.directory , exist_ok = True)
+
+        self.memory : OrderedDict[str , tuple[str , ...]] = OrderedDict()
+        self.memory_bytes : int = 0
+        self.sizes : dict[str , int] = {}
+
+        self.memory_hits : int = 0
+        self.disk_hits : int = 0
+        self.misses : int = 0
+
+    @staticmethod
+    def key(voice_key : tuple , text : str) -> str :
+
+        return hashlib.sha256('\x1f'.join(map(str , (*voice_key , normalize_text(text)))).encode('utf-8')).hexdigest()
+
+    def paths(self , key : str) -> tuple[str , str] :
+
+        base : str = os.path.join(self.directory , key)
+
+        return f'{base}.audio' , f'{base}.json'
+
+    def get_memory(self , key : str) -> tuple[str , ...] | None :
+
+        chunks : tuple[str , ...] | None = self.memory.get(key)
+
+        if chunks is not None : self.memory.move_to_end(key)
+
+        return chunks
+
+    def put_memory(self , key : str , chunks : tuple[str , ...] , size : int) -> None :
+
+        if key in self.memory : self.memory_bytes -= self.sizes[key]
+
+        self.memory[key] = chunks
+        self.memory.move_to_end(key)
+
+        self.sizes[key] = size
+        self.memory_bytes += size
+
+        while self.memory and (len(self.memory) > self.max_entries or self.memory_bytes > self.max_bytes) :
+
+            evicted , _ = self.memory.popitem(last = False)
+            self.memory_bytes -= self.sizes.pop(evicted)
+
+    def read_disk(self , key : str) -> tuple[tuple[str , ...] , int] | None :
+
+        audio_path , index_path = self.paths(key)
+
+        try :
+
+            with open(index_path) as index_file : lengths : list[int] = json.load(index_file)['chunks']
+
+            with open(audio_path , 'rb') as audio_file , mmap.mmap(audio_file.fileno() , 0 , access = mmap.ACCESS_READ) as audio :
+
+                chunks : list[str] = []
+                offset : int = 0
+
+                for length in lengths :
+
+                    chunks.append(base64.b64encode(audio[offset : offset + length]).decode('utf-8'))
+                    offset += length
+
+                return tuple(chunks) , offset
+
+        except (FileNotFoundError , ValueError , KeyError , json.JSONDecodeError) : return None
+
+    def write_disk(self , key : str , text : str , voice_key : tuple , audio_chunks : list[bytes]) -> None :
+
+        audio_path , index_path = self.paths(key)
+
+        # written under temporary names and renamed so a reader never sees a partial entry
+        with open(f'{audio_path}.tmp' , 'wb') as audio_file :
+            for chunk in audio_chunks : audio_file.write(chunk)
+
+        with open(f'{index_path}.tmp' , 'w') as index_file : json.dump(
+            {
+                'voice' : list(voice_key) ,
+                'text' : normalize_text(text) ,
+                'chunks' : [len(chunk) for chunk in audio_chunks]
+            } ,
+            index_file ,
+            ensure_ascii = False
+        )
+
+        os.replace(f'{audio_path}.tmp' , audio_path)
+        os.replace(f'{index_path}.tmp' , index_path)
+
+    async def get(self , key : str , disk : bool = True) -> tuple[str , ...] | None :
+        '''
+        Memory tier first , then the disk tier unless `disk` is False.
+        '''
+
+        chunks : tuple[str , ...] | None = self.get_memory(key)
+
+        if chunks is not None :
+
+            self.memory_hits += 1
+
+            return chunks
+
+        entry = await asyncio.to_thread(self.read_disk , key) if disk else None
+
+        if entry is not None :
+
+            self.disk_hits += 1
+
+            chunks , size = entry
+            self.put_memory(key , chunks , size)
+
+            return chunks
+
+        self.misses += 1
+
+        return None
+
+    def snapshot(self) -> dict :
+
+        lookups : int = self.memory_hits + self.disk_hits + self.misses
+
+        return {
+            'memory_entries' : len(self.memory) ,
+            'memory_bytes' : self.memory_bytes ,
+            'memory_hits' : self.memory_hits ,
+            'disk_hits' : self.disk_hits ,
+            'misses' : self.misses ,
+            'hit_rate' : round((self.memory_hits + self.disk_hits) / lookups , 4) if lookups else None
+        }
+
+class CACHED_TTS(TTS) :
+    '''
+    Serves fixed prompts (greeting , inactivity and hangup lines , pre-responses)
+    from a TTS_CACHE and falls through to the wrapped client for everything else.
+
+    Misses are streamed through as they are synthesized , so a miss costs no more
+    than before ; a fully synthesized text is kept in the memory tier and , for the
+    pinned (pre-warmed) prompts , written to the disk tier so a restart does not
+    pay the vendor again.
+
+    Args:
+        - client (TTS): Wrapped TTS client , must implement `voice_key`.
+        - config (dict): TTS_CACHE configuration.
+    '''
+
+    def __init__(self , client : TTS , config : dict) -> None :
+
+        super().__init__()
+
+        self.client : TTS = client
+        self.config : dict = config
+
+        self.cache : TTS_CACHE = TTS_CACHE(config = config)
+
+        self.pinned : set[str] = set()
+
+    async def stream(self , text : str) :
+
+        voice_key : tuple = self.client.voice_key()
+        key : str = self.cache.key(voice_key , text)
+
+        # only pinned prompts are ever written to disk , skip the file lookup for the rest
+        chunks : tuple[str , ...] | None = await self.cache.get(key , disk = key in self.pinned)
+
+        if chunks is not None :
+
+            for chunk in chunks : yield chunk
+
+            return
+
+        async for chunk in self.synthesize(key , voice_key , text) : yield chunk
+
+    async def synthesize(self , key : str , voice_key : tuple , text : str) :
+
+        encoded : list[str] = []
+
+        async for chunk in self.client(text) :
+
+            encoded.append(chunk)
+
+            yield chunk
+
+        # only reached when the caller consumed the whole utterance (no barge-in)
+        self.cache.put_memory(key , tuple(encoded) , sum(len(chunk) * 3 // 4 for chunk in encoded))
+
+        if key in self.pinned :
+
+            audio : list[bytes] = [base64.b64decode(chunk) for chunk in encoded]
+
+            await asyncio.to_thread(self.cache.write_disk , key , text , voice_key , audio)
+
+    async def __call__(self , text : str) :
+
+        async for chunk in self.stream(text = text) : yield chunk
+
+    async def warm(self , texts : list[str]) -> dict :
+        '''
+        Pin `texts` and make sure each one is cached , synthesizing only what neither tier holds.
+
+        Returns how many texts were already cached , synthesized or failed to synthesize.
+        '''
+
+        counts : dict = {'cached' : 0 , 'synthesized' : 0 , 'failed' : 0}
+
+        for text in dict.fromkeys(normalize_text(text) for text in texts if text.strip()) :
+
+            voice_key : tuple = self.client.voice_key()
+            key : str = self.cache.key(voice_key , text)
+            self.pinned.add(key)
+
+            if await self.cache.get(key) is not None : counts['cached'] += 1 ; continue
+
+            try :
+
+                async for _ in self.synthesize(key , voice_key , text) : pass
+
+                counts['synthesized'] += 1
+
+            except Exception : counts['failed'] += 1
+
+        return counts
+
+    def snapshot(self) -> dict : return {**self.cache.snapshot() , 'pinned' : len(self.pinned)}
@@ -1,57 +1,77 @@
 import base64
-import asyncio
 
 from .tts import TTS
 
 from google.cloud.texttospeech import (
-    AudioEncoding , 
-    SsmlVoiceGender , 
-    TextToSpeechClient , 
-    VoiceSelectionParams , 
-    StreamingSynthesizeConfig , 
-    StreamingSynthesizeRequest , 
-    StreamingSynthesisInput , 
+    AudioEncoding ,
+    SsmlVoiceGender ,
+    TextToSpeechAsyncClient ,
+    VoiceSelectionParams ,
+    StreamingSynthesizeConfig ,
+    StreamingSynthesizeRequest ,
+    StreamingSynthesisInput ,
     StreamingAudioConfig
 )
 
-class GOOGLE_TTS(TTS) : 
+class GOOGLE_TTS(TTS) :
+    '''
+    Google Chirp 3 HD streaming TTS over the async gRPC client.
 
-    def __init__(self , config : dict) -> None : 
+    Responses are pulled with `async for` , so waiting for audio never blocks the
+    event loop and a slow consumer (the websocket sender) holds back the stream
+    through gRPC flow control instead of buffering it.
+
+    The async client binds to the event loop it is created in , so it is built
+    lazily on the first `stream()` , inside the loop that uses it , wherever
+    this object itself was constructed.
+    '''
+
+    def __init__(self , config : dict) -> None :
 
         super().__init__()
 
         self.config : dict = config
 
-        self.client : TextToSpeechClient = TextToSpeechClient.from_service_account_file(filename = self.config['service-file-path'])
+        self.client : TextToSpeechAsyncClient | None = None
 
-    async def stream(self , text : str) : 
+        self.voice_name : str = f'{self.config["language"]}-Chirp3-HD-{self.config["name"]}'
+        self.audio_encoding : AudioEncoding = AudioEncoding.MULAW
+        self.sample_rate : int = 8000
 
-        streaming_config : StreamingSynthesizeConfig = StreamingSynthesizeConfig(
+        self.streaming_config : StreamingSynthesizeConfig = StreamingSynthesizeConfig(
             voice = VoiceSelectionParams(
-                language_code = self.config['language'] , 
-                ssml_gender = SsmlVoiceGender.FEMALE , 
-                name = f'{self.config["language"]}-Chirp3-HD-{self.config["name"]}'
-            ) , 
+                language_code = self.config['language'] ,
+                ssml_gender = SsmlVoiceGender.FEMALE ,
+                name = self.voice_name
+            ) ,
             streaming_audio_config = StreamingAudioConfig(
-                audio_encoding = AudioEncoding.MULAW , 
-                sample_rate_hertz = 8000
+                audio_encoding = self.audio_encoding ,
+                sample_rate_hertz = self.sample_rate
             )
         )
 
-        def request_generator() : 
+    def voice_key(self) -> tuple : return (self.voice_name , self.config['language'] , self.audio_encoding.name , self.sample_rate)
+
+    async def stream(self , text : str) :
+
+        if self.client is None : self.client = TextToSpeechAsyncClient.from_service_account_file(filename = self.config['service-file-path'])
 
-            yield StreamingSynthesizeRequest(streaming_config = streaming_config)
+        async def request_generator() :
+
+            yield StreamingSynthesizeRequest(streaming_config = self.streaming_config)
             yield StreamingSynthesizeRequest(input = StreamingSynthesisInput(text = text))
 
-        streaming_responses = await asyncio.to_thread(
-            self.client.streaming_synthesize , 
-            request_generator()
-        )
+        streaming_responses = await self.client.streaming_synthesize(requests = request_generator())
+
+        try :
+
+            async for response in streaming_responses :
 
-        for response in streaming_responses : 
+                if response.audio_content : yield base64.b64encode(response.audio_content).decode('utf-8')
 
-            if response.audio_content : yield base64.b64encode(response.audio_content).decode('utf-8')
+        # the consumer stopped early (barge-in , hangup) , release the RPC instead of leaving it to GC
+        finally : streaming_responses.cancel()
 
-    async def __call__(self , text : str) : 
+    async def __call__(self , text : str) :
 
-        async for chunk in self.stream(text = text) : yield chunk
\ No newline at end of file
+        async for chunk in self.stream(text = text) : yield chunk
@@ -16,11 +16,8 @@ class MURF_TTS(TTS) :
 
         self.url : str = 'https://global.api.murf.ai/v1/speech/stream'
 
-    async def stream(self , text : str) : 
-
-        data = {
+        self.voice : dict = {
             'voice_id' : 'en-IN-anisha' , 
-            'text' : text , 
             'multi_native_locale' : 'en-IN' , 
             'model' : 'FALCON' , 
             'format' : 'WAV' , 
@@ -28,6 +25,12 @@ class MURF_TTS(TTS) :
             'channelType' : 'MONO'
         }
 
+    def voice_key(self) -> tuple : return tuple(sorted(self.voice.items()))
+
+    async def stream(self , text : str) : 
+
+        data = {**self.voice , 'text' : text}
+
         headers = {
             'api-key' : os.environ['MURF_AI_API_KEY'] , 
             'Content-Type' : 'application/json'
@@ -15,6 +15,20 @@ class SMALLESTAI_TTS(TTS) :
 
         self.client : WavesClient = WavesClient(api_key = os.environ['SMALLEST_API_KEY'])
 
+        self.voice : dict = {
+            'output_format' : 'pcm' , 
+            'sample_rate' : 16000 , 
+            'language' : 'hi' , 
+            'voice_id' : 'maya' , 
+            'model' : 'lightning-large' , 
+            'speed' : 1.1 , 
+            'similarity' : 0.7 , 
+            'enhancement' : 1
+            # 'pronounciation_dicts' : ['695df353558162d9120875aa']
+        }
+
+    def voice_key(self) -> tuple : return tuple(sorted(self.voice.items()))
+
     async def stream(self , text : str) : 
 
         words : list[str] = text.split()
@@ -23,15 +37,7 @@ class SMALLESTAI_TTS(TTS) :
 
             audio_bytes : bytes = self.client.synthesize(
                 ' '.join(words[index : index + 15]) , 
-                output_format = 'pcm' , 
-                sample_rate = 16000 , 
-                language = 'hi' , 
-                voice_id = 'maya' , 
-                model = 'lightning-large' , 
-                speed = 1.1 , 
-                similarity = 0.7 , 
-                enhancement = 1
-                # pronounciation_dicts = ['695df353558162d9120875aa']
+                **self.voice
             ) 
 
             yield base64.b64encode(audio_bytes).decode('utf-8')
@@ -17,6 +17,13 @@ class TTS :
 
     def __init__(self) -> None : pass
 
+    def voice_key(self) -> tuple : 
+        '''
+        Everything besides the text that changes the synthesized audio (voice , language , encoding , sample rate) , used as part of the cache key.
+        '''
+
+        raise NotImplementedError
+
     async def calculate_audio_duration(
         self , 
         num_bytes : int , 